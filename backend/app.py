@@ -1,13 +1,16 @@
 import sys
 import os
 import logging
+from datetime import datetime, timedelta
 from logging.handlers import RotatingFileHandler
 
+import click
+
 # Adicionar o diretório atual ao path para que os imports funcionem
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Imports padrão
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, session
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 from flasgger import Swagger
@@ -17,16 +20,30 @@ from flask_migrate import Migrate
 
 # Imports locais (após sys.path.insert)
 from database import db, init_db
+from cache import menu_cache
+from pubsub import criar_gerenciador
+from outbox import drenador
+from payment.reconciler import reconciliador
+from payment.webhooks import fila_webhooks
+from reports import relatorios_cache
 from routes.auth import auth_bp
 from routes.orders import orders_bp
 from routes.menu import menu_bp
 from routes.payment import payment_bp
 from routes.tables import mesas_bp
+from routes.dashboard import dashboard_bp
+from routes.kitchen import cozinha_bp
+from routes.export import export_bp
+from routes.reports import relatorios_bp
+from routes.webhooks import webhooks_bp
 from events import (
     emitir_pedido_novo,
     emitir_pedido_atualizado,
     emitir_pagamento_recebido,
     emitir_mesa_status,
+    feed,
+    registrar_handlers,
+    token_equipe_valido,
 )
 from config import config
 
@@ -62,7 +79,7 @@ def create_app(config_name=None):
         app.logger.info("Comandas startup")
 
     # Configurar rate limiting
-    Limiter(
+    limiter = Limiter(
         app=app,
         key_func=get_remote_address,
         default_limits=["200 per day", "50 per hour"],
@@ -70,11 +87,24 @@ def create_app(config_name=None):
 
     db.init_app(app)
     Migrate(app, db)
+    menu_cache.init_app(app)
+    feed.init_app(app)
+    relatorios_cache.init_app(app)
+    fila_webhooks.init_app(app)
     app.register_blueprint(auth_bp, url_prefix="/api")
     app.register_blueprint(orders_bp, url_prefix="/api")
     app.register_blueprint(menu_bp, url_prefix="/api")
     app.register_blueprint(payment_bp, url_prefix="/api")
     app.register_blueprint(mesas_bp, url_prefix="/api")
+    app.register_blueprint(dashboard_bp, url_prefix="/api")
+    # Telas da cozinha em long-polling refazem a requisição continuamente
+    limiter.exempt(cozinha_bp)
+    app.register_blueprint(cozinha_bp, url_prefix="/api")
+    app.register_blueprint(export_bp, url_prefix="/api")
+    app.register_blueprint(relatorios_bp, url_prefix="/api")
+    # O gateway reenvia notificações em rajadas; a fila deduplica
+    limiter.exempt(webhooks_bp)
+    app.register_blueprint(webhooks_bp, url_prefix="/api")
     Swagger(app)  # Inicializa Swagger UI
 
     @app.route("/")
@@ -99,6 +129,8 @@ def create_app(config_name=None):
                     "GET /api/itens/<id>": "Obter item por ID",
                     "PUT /api/itens/<id>": "Atualizar item",
                     "DELETE /api/itens/<id>": "Remover item",
+                    "POST /api/itens/importar": "Importar itens em lote (CSV/NDJSON)",
+                    "GET /api/itens/exportar": "Exportar itens (CSV/NDJSON)",
                 },
                 "pedidos": {
                     "POST /api/pedidos": "Criar novo pedido",
@@ -106,10 +138,24 @@ def create_app(config_name=None):
                     "PUT /api/pedidos/<id>/status": "Atualizar status do pedido",
                     "GET /api/pedidos/cliente/<id>": "Obter pedidos de um cliente",
                 },
+                "cozinha": {
+                    "GET /api/cozinha/fila": "Fila da cozinha (long-polling com desde/wait)",
+                },
+                "exportacao": {
+                    "GET /api/export/pedidos": "Exportar pedidos (CSV/NDJSON, streaming)",
+                    "GET /api/export/pagamentos": "Exportar pagamentos (CSV/NDJSON)",
+                },
+                "relatorios": {
+                    "GET /api/relatorios": "Listar relatórios disponíveis",
+                    "GET /api/relatorios/<nome>": "Relatório do período (de/ate)",
+                },
                 "pagamentos": {
                     "POST /api/pagamentos": "Criar novo pagamento",
+                    "POST /api/pagamentos/pix": "Criar cobrança PIX no gateway",
+                    "POST /api/pagamentos/webhook": "Notificações do gateway",
                     "GET /api/pagamentos/<id>": "Obter pagamento por ID",
-                    "GET /api/pagamentos/pedido/<id>": "Obter pagamento por pedido",
+                    "GET /api/pagamentos/pedido/<id>": "Pagamentos e saldo do pedido",
+                    "POST /api/pagamentos/pedido/<id>/divisao": "Dividir a conta",
                 },
             },
             "exemplos": {
@@ -138,12 +184,71 @@ def create_app(config_name=None):
             },
         }
 
+    @app.cli.command("reconstruir-resumos")
+    @click.option("--dias", default=30, help="Dias a recalcular, terminando hoje.")
+    def reconstruir_resumos_command(dias):
+        """Recalcula os resumos diários do dashboard a partir do histórico."""
+        from rollups import reconstruir_resumos
+
+        hoje = datetime.utcnow().date()
+        reconstruir_resumos(hoje - timedelta(days=dias - 1), hoje)
+        db.session.commit()
+        click.echo(f"Resumos recalculados para os últimos {dias} dias.")
+
+    @app.cli.command("recalcular-totais")
+    @click.option(
+        "--verificar", is_flag=True, help="Apenas conta os pedidos divergentes."
+    )
+    def recalcular_totais_command(verificar):
+        """Recalcula os totais de todos os pedidos abertos a partir das linhas."""
+        from totals import contar_divergencias, recalcular_pedidos_abertos
+
+        divergentes = contar_divergencias()
+        click.echo(f"Pedidos abertos com total divergente: {divergentes}")
+        if verificar:
+            return
+        recalculados = recalcular_pedidos_abertos()
+        db.session.commit()
+        click.echo(f"Totais recalculados para {recalculados} pedidos abertos.")
+
+    @app.cli.command("limpar-idempotencia")
+    def limpar_idempotencia_command():
+        """Remove as chaves de idempotência expiradas."""
+        from idempotency import limpar_expiradas
+
+        removidas = limpar_expiradas()
+        click.echo(f"Chaves de idempotência removidas: {removidas}")
+
+    @app.cli.command("reconciliar-pix")
+    @click.option("--uma-vez", is_flag=True, help="Executa um único ciclo e sai.")
+    def reconciliar_pix_command(uma_vez):
+        """Consulta no gateway os pagamentos PIX pendentes (processo dedicado)."""
+        import time
+        from payment.factory import get_establishment_gateway
+        from payment.reconciler import reconciliador, reconciliar_lote
+
+        if uma_vez:
+            consultados = reconciliar_lote(get_establishment_gateway)
+            click.echo(f"Pagamentos pendentes consultados: {consultados}")
+            return
+        reconciliador.executar(app, time.sleep)
+
     return app
 
 
 app = create_app()
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Com vários workers os emits passam pela fila (Redis) para chegar a todos os sockets
+socketio = SocketIO(
+    app, cors_allowed_origins="*", client_manager=criar_gerenciador(app)
+)
 app.socketio = socketio  # Permite acesso via current_app.socketio
+registrar_handlers(socketio)
+if app.config["OUTBOX_DRENAGEM_AUTOMATICA"]:
+    drenador.iniciar(app, socketio)
+if app.config["WEBHOOKS_PROCESSAMENTO_AUTOMATICO"]:
+    fila_webhooks.iniciar(app, socketio)
+if app.config["RECONCILIACAO_PIX_AUTOMATICA"]:
+    reconciliador.iniciar(app, socketio)
 
 # Expor para o Flask CLI
 db = db
@@ -151,10 +256,13 @@ migrate = Migrate(app, db)
 
 
 @socketio.on("connect")
-def handle_connect():
+def handle_connect(auth=None):
     """Evento de conexão WebSocket."""
     print("Cliente conectado")
-    emit("mensagem", {"msg": "Conectado ao WebSocket!"})
+    # A sessão do socket guarda se ele é da equipe (salas de cozinha, caixa...)
+    session["equipe"] = token_equipe_valido((auth or {}).get("token"))
+    # seq permite ao cliente pedir só os eventos perdidos ao reconectar ("retomar")
+    emit("mensagem", {"msg": "Conectado ao WebSocket!", "seq": feed.seq_atual()})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+"""
+Benchmark de latência emit -> recebimento entre workers do Socket.IO.
+
+Simula N workers (um servidor Socket.IO por worker, como no gunicorn), cada
+um com telas de cozinha conectadas, e emite eventos a partir de workers
+aleatórios. Mede quantas telas recebem cada evento e em quanto tempo.
+
+Exemplos:
+    python benchmark_socketio.py --workers 4 --eventos 2000
+    python benchmark_socketio.py --fila redis://localhost:6379/0
+    python benchmark_socketio.py --fila ""   # sem fila: mostra eventos perdidos
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+
+import socketio
+
+from pubsub import BarramentoMemoria, GerenciadorFilaMemoria, PREFIXO_MEMORIA
+
+
+class WorkerSimulado:
+    """Servidor Socket.IO com telas falsas que registram o instante de chegada."""
+
+    def __init__(self, indice, gerenciador, telas, metricas):
+        self.indice = indice
+        self.servidor = socketio.Server(
+            async_mode="threading", client_manager=gerenciador
+        )
+        self.servidor.manager_initialized = True
+        self.servidor.manager.initialize()
+        self.servidor._send_eio_packet = self._receber
+        self.metricas = metricas
+        for tela in range(telas):
+            eio_sid = f"w{indice}-tela{tela}"
+            sid = self.servidor.manager.connect(eio_sid, "/")
+            self.servidor.manager.enter_room(sid, "/", "cozinha", eio_sid=eio_sid)
+
+    def _receber(self, eio_sid, pacote_eio):
+        chegada = time.perf_counter()
+        pacote = socketio.packet.Packet(encoded_packet=pacote_eio.data)
+        _, dados = pacote.data
+        self.metricas.registrar(dados["seq"], chegada - dados["emitido_em"])
+
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = []
+        self.entregas = {}
+
+    def registrar(self, seq, latencia):
+        with self._lock:
+            self.latencias.append(latencia)
+            self.entregas[seq] = self.entregas.get(seq, 0) + 1
+
+    def total(self):
+        with self._lock:
+            return len(self.latencias)
+
+
+def criar_gerenciador(fila, barramento):
+    if not fila:
+        return None
+    if fila.startswith(PREFIXO_MEMORIA):
+        return GerenciadorFilaMemoria(barramento)
+    return socketio.RedisManager(fila, channel="comandas-benchmark")
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def executar(workers, telas, eventos, intervalo, fila, timeout):
+    barramento = BarramentoMemoria()
+    metricas = Metricas()
+    servidores = [
+        WorkerSimulado(i, criar_gerenciador(fila, barramento), telas, metricas)
+        for i in range(workers)
+    ]
+    time.sleep(0.2)  # tempo para as threads de escuta assinarem a fila
+
+    esperado = eventos * workers * telas
+    inicio = time.perf_counter()
+    for seq in range(eventos):
+        origem = random.choice(servidores)
+        origem.servidor.emit(
+            "pedido_novo",
+            {"seq": seq, "emitido_em": time.perf_counter()},
+            to="cozinha",
+        )
+        if intervalo:
+            time.sleep(intervalo)
+    limite = time.monotonic() + timeout
+    while metricas.total() < esperado and time.monotonic() < limite:
+        time.sleep(0.01)
+    duracao = time.perf_counter() - inicio
+
+    recebidos = metricas.total()
+    print(f"fila: {fila or '(nenhuma)'}")
+    print(f"workers: {workers}  telas por worker: {telas}  eventos: {eventos}")
+    print(
+        f"entregas: {recebidos}/{esperado} "
+        f"({100.0 * recebidos / esperado:.1f}%) em {duracao:.2f}s"
+    )
+    if metricas.latencias:
+        ms = [latencia * 1000 for latencia in metricas.latencias]
+        print(
+            "latência (ms): "
+            f"p50={percentil(ms, 50):.3f} p95={percentil(ms, 95):.3f} "
+            f"p99={percentil(ms, 99):.3f} max={max(ms):.3f} "
+            f"média={statistics.mean(ms):.3f}"
+        )
+    return recebidos == esperado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--telas", type=int, default=5, help="Telas por worker")
+    parser.add_argument("--eventos", type=int, default=1000)
+    parser.add_argument(
+        "--intervalo", type=float, default=0.0, help="Segundos entre emits"
+    )
+    parser.add_argument(
+        "--fila", default=PREFIXO_MEMORIA, help="memoria://, redis://... ou vazio"
+    )
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args(argv)
+    completo = executar(
+        args.workers, args.telas, args.eventos, args.intervalo, args.fila, args.timeout
+    )
+    return 0 if completo else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
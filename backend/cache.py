@@ -0,0 +1,112 @@
+"""
+Cache de respostas versionadas.
+
+Cada cache guarda snapshots JSON já codificados (bytes) associados a um
+número de versão. Escritas incrementam a versão; leituras comparam a versão
+corrente com a do snapshot e só reconstroem quando ela mudou. Com REDIS_URL
+configurado o contador é compartilhado entre os workers do gunicorn; sem ele
+cada processo mantém o seu próprio contador em memória.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ContadorVersaoMemoria:
+    """Contador de versão local ao processo (fallback sem Redis)."""
+
+    def __init__(self):
+        # Semente baseada no relógio: um worker reiniciado não reutiliza ETags antigos
+        self._valor = int(time.time() * 1000)
+        self._lock = threading.Lock()
+
+    def atual(self):
+        return self._valor
+
+    def incrementar(self):
+        with self._lock:
+            self._valor += 1
+            return self._valor
+
+
+class ContadorVersaoRedis:
+    """Contador de versão compartilhado entre processos via INCR do Redis."""
+
+    def __init__(self, cliente, chave):
+        self._cliente = cliente
+        self._chave = chave
+
+    def atual(self):
+        valor = self._cliente.get(self._chave)
+        if valor is None:
+            # Semente baseada no relógio para sobreviver a um Redis reiniciado/vazio
+            self._cliente.set(self._chave, int(time.time() * 1000), nx=True)
+            valor = self._cliente.get(self._chave)
+        return int(valor)
+
+    def incrementar(self):
+        self.atual()
+        return int(self._cliente.incr(self._chave))
+
+
+def criar_contador(app, chave):
+    """Cria o contador de versão adequado à configuração da aplicação."""
+    url = app.config.get("REDIS_URL")
+    if url:
+        import redis
+
+        return ContadorVersaoRedis(redis.Redis.from_url(url), chave)
+    return ContadorVersaoMemoria()
+
+
+class CacheSnapshots:
+    """Snapshots JSON pré-codificados, válidos enquanto a versão não mudar."""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self._contador = ContadorVersaoMemoria()
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._contador = criar_contador(app, f"comandas:{self.nome}:versao")
+        self._snapshots = {}
+        app.extensions[f"cache_{self.nome}"] = self
+
+    def versao(self):
+        """Versão corrente, ou None se o contador compartilhado estiver indisponível."""
+        try:
+            return self._contador.atual()
+        except Exception:
+            logger.exception("Falha ao ler versão do cache %s", self.nome)
+            return None
+
+    def etag(self, versao):
+        return f"{self.nome}-{versao}"
+
+    def invalidar(self):
+        """Incrementa a versão; snapshots anteriores deixam de ser servidos."""
+        try:
+            self._contador.incrementar()
+        except Exception:
+            logger.exception("Falha ao invalidar cache %s", self.nome)
+        with self._lock:
+            self._snapshots.clear()
+
+    def obter(self, chave, versao, construir):
+        """Retorna os bytes do snapshot `chave` na `versao`, construindo se necessário."""
+        if versao is None:
+            return construir()
+        snapshot = self._snapshots.get(chave)
+        if snapshot and snapshot[0] == versao:
+            return snapshot[1]
+        corpo = construir()
+        with self._lock:
+            self._snapshots[chave] = (versao, corpo)
+        return corpo
+
+
+menu_cache = CacheSnapshots("menu")
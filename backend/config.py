@@ -1,5 +1,6 @@
 import os
 from datetime import timedelta
+from decimal import Decimal
 
 
 class Config:
@@ -21,6 +22,53 @@ class Config:
     RATELIMIT_ENABLED = True
     RATELIMIT_STORAGE_URL = os.environ.get("REDIS_URL", "memory://")
 
+    # Taxa de serviço (%) aplicada aos novos pedidos
+    TAXA_SERVICO_PERCENTUAL = Decimal(os.environ.get("TAXA_SERVICO_PERCENTUAL", "0"))
+
+    # Redis compartilhado entre workers (cache do menu); ausente usa memória local
+    REDIS_URL = os.environ.get("REDIS_URL")
+
+    # Fila do Socket.IO entre workers (redis://... ou memoria://); vazio = sem fila
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE", REDIS_URL)
+
+    # Gateway de pagamento (Mercado Pago): credencial e limites das chamadas HTTP
+    GATEWAY_PAGAMENTO = os.environ.get("GATEWAY_PAGAMENTO", "mercadopago")
+    MERCADOPAGO_ACCESS_TOKEN = os.environ.get("MERCADOPAGO_ACCESS_TOKEN")
+    MERCADOPAGO_URL_BASE = os.environ.get(
+        "MERCADOPAGO_URL_BASE", "https://api.mercadopago.com"
+    )
+    GATEWAY_TIMEOUT_CONEXAO = float(os.environ.get("GATEWAY_TIMEOUT_CONEXAO", "3.05"))
+    GATEWAY_TIMEOUT_LEITURA = float(os.environ.get("GATEWAY_TIMEOUT_LEITURA", "10"))
+    GATEWAY_TENTATIVAS = int(os.environ.get("GATEWAY_TENTATIVAS", "3"))
+    # Cobranças PIX: pagador padrão, URL de notificação e segredo das assinaturas
+    MERCADOPAGO_EMAIL_PAGADOR = os.environ.get(
+        "MERCADOPAGO_EMAIL_PAGADOR", "pagador@comandas.local"
+    )
+    MERCADOPAGO_URL_NOTIFICACAO = os.environ.get("MERCADOPAGO_URL_NOTIFICACAO")
+    MERCADOPAGO_WEBHOOK_SECRET = os.environ.get("MERCADOPAGO_WEBHOOK_SECRET")
+
+    # Reconciliação dos PIX pendentes dentro do processo web. Desligada por
+    # padrão: com vários workers cada um iniciaria o seu reconciliador; em
+    # produção ela roda no serviço dedicado `flask reconciliar-pix`
+    RECONCILIACAO_PIX_AUTOMATICA = (
+        os.environ.get("RECONCILIACAO_PIX_AUTOMATICA", "0") == "1"
+    )
+
+    # Workers que processam a fila de webhooks do gateway (desligados nos testes)
+    WEBHOOKS_PROCESSAMENTO_AUTOMATICO = (
+        os.environ.get("WEBHOOKS_PROCESSAMENTO_AUTOMATICO", "1") == "1"
+    )
+
+    # Token da equipe nas conexões Socket.IO (auth {"token": ...}): salas de
+    # cozinha, caixa e estabelecimento e de qualquer mesa
+    TOKEN_EQUIPE_SOCKET = os.environ.get("TOKEN_EQUIPE_SOCKET")
+    SOCKET_EQUIPE_SEM_TOKEN = False
+
+    # Drenagem do outbox de eventos em segundo plano (desligada nos testes)
+    OUTBOX_DRENAGEM_AUTOMATICA = (
+        os.environ.get("OUTBOX_DRENAGEM_AUTOMATICA", "1") == "1"
+    )
+
 
 class DevelopmentConfig(Config):
     """Configuração para desenvolvimento."""
@@ -28,6 +76,8 @@ class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL") or "sqlite:///comandas.db"
     CORS_ORIGINS = ["http://localhost:5173", "http://127.0.0.1:5173"]
+    # Sem TOKEN_EQUIPE_SOCKET, todo socket local é tratado como equipe
+    SOCKET_EQUIPE_SEM_TOKEN = True
 
 
 class StagingConfig(Config):
@@ -16,31 +16,75 @@ def init_db():
     - Remove e recria todas as tabelas (drop_all + create_all).
     - Insere itens e mesas de exemplo se não existirem.
     """
-    from models import Cliente, Pedido, Item, PedidoItem, Pagamento, Mesa
+    from models import Cliente, Pedido, Item, PedidoItem, Pagamento, Mesa, Categoria
 
     db.drop_all()
     db.create_all()
+    _inserir_categorias_exemplo()
     _inserir_itens_exemplo()
     _inserir_mesas_exemplo()
+    # O menu foi recriado: ETags emitidos antes do reset não valem mais
+    from cache import menu_cache
+    from reports import relatorios_cache
+
+    menu_cache.invalidar()
+    relatorios_cache.limpar()
+
+
+def _inserir_categorias_exemplo():
+    """Insere as categorias padrão do menu se não existirem."""
+    from models import Categoria
+
+    if not Categoria.query.first():
+        categorias_exemplo = [
+            Categoria(nome="Entradas", descricao="Pratos de entrada"),
+            Categoria(nome="Pratos Principais", descricao="Pratos principais"),
+            Categoria(nome="Sobremesas", descricao="Sobremesas e doces"),
+            Categoria(nome="Bebidas", descricao="Bebidas e refrigerantes"),
+            Categoria(nome="Acompanhamentos", descricao="Acompanhamentos e extras"),
+        ]
+        for categoria in categorias_exemplo:
+            db.session.add(categoria)
+        db.session.commit()
 
 
 def _inserir_itens_exemplo():
     """Insere itens de exemplo no banco se não existirem."""
-    from models import Item
+    from models import Item, Categoria
 
     if not Item.query.first():
+        categorias = {c.nome: c.categoria_id for c in Categoria.query.all()}
         itens_exemplo = [
             Item(
-                nome="X-Burger", descricao="Hambúrguer com queijo e salada", preco=15.90
+                nome="X-Burger",
+                descricao="Hambúrguer com queijo e salada",
+                preco=15.90,
+                categoria_id=categorias.get("Pratos Principais"),
             ),
             Item(
                 nome="X-Salada",
                 descricao="Hambúrguer com queijo, salada e tomate",
                 preco=17.90,
+                categoria_id=categorias.get("Pratos Principais"),
+            ),
+            Item(
+                nome="Refrigerante",
+                descricao="Coca-Cola 350ml",
+                preco=6.50,
+                categoria_id=categorias.get("Bebidas"),
+            ),
+            Item(
+                nome="Batata Frita",
+                descricao="Porção de batata frita",
+                preco=12.90,
+                categoria_id=categorias.get("Acompanhamentos"),
+            ),
+            Item(
+                nome="Sorvete",
+                descricao="Sorvete de chocolate",
+                preco=8.50,
+                categoria_id=categorias.get("Sobremesas"),
             ),
-            Item(nome="Refrigerante", descricao="Coca-Cola 350ml", preco=6.50),
-            Item(nome="Batata Frita", descricao="Porção de batata frita", preco=12.90),
-            Item(nome="Sorvete", descricao="Sorvete de chocolate", preco=8.50),
         ]
         for item in itens_exemplo:
             db.session.add(item)
@@ -1,19 +1,366 @@
-from flask_socketio import SocketIO
+import hmac
+import json
+import threading
+from collections import OrderedDict, deque
+
+from flask import current_app, session
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
+
+from database import db
+from models import Cliente
 
 # As funções abaixo recebem o socketio como argumento para evitar import circular
 
+# --- Feed de eventos ---
+TAMANHO_BUFFER_EVENTOS = 1000  # Eventos guardados para clientes que reconectam
+LIMITE_ESTADOS_PEDIDO = 5000  # Últimos estados de pedidos usados no cálculo de deltas
+TTL_ESTADO_PEDIDO = (
+    24 * 3600
+)  # Segundos que o Redis guarda o último estado de um pedido
+
+# --- Salas (rooms) ---
+SALA_COZINHA = "cozinha"
+SALA_CAIXA = "caixa"
+SALA_ESTABELECIMENTO = "estabelecimento"
+SALAS_FIXAS = (SALA_COZINHA, SALA_CAIXA, SALA_ESTABELECIMENTO)
+SALAS_COM_ID = ("mesa", "cliente")
+
+
+def nome_sala(tipo, identificador=None):
+    """Nome da sala Socket.IO para o tipo informado. Lança ValueError se inválido."""
+    if tipo in SALAS_FIXAS:
+        return tipo
+    if tipo in SALAS_COM_ID:
+        if not isinstance(identificador, int) or isinstance(identificador, bool):
+            raise ValueError(f"Sala {tipo} exige um id inteiro")
+        return f"{tipo}:{identificador}"
+    raise ValueError(f"Sala desconhecida: {tipo}")
+
+
+def token_equipe_valido(token):
+    """
+    Confere o token da equipe (TOKEN_EQUIPE_SOCKET). Sem token configurado, só
+    SOCKET_EQUIPE_SEM_TOKEN (desenvolvimento) trata todo socket como equipe.
+    """
+    esperado = current_app.config.get("TOKEN_EQUIPE_SOCKET")
+    if not esperado:
+        return bool(current_app.config.get("SOCKET_EQUIPE_SEM_TOKEN"))
+    return isinstance(token, str) and hmac.compare_digest(token, esperado)
+
+
+def sala_permitida(tipo, identificador, equipe, cliente_id=None):
+    """
+    A equipe entra em qualquer sala. Um cliente só entra na própria sala e na
+    da mesa que ocupa, identificado pelo cliente_id como nas rotas /api/cliente.
+    """
+    if equipe:
+        return True
+    if tipo not in SALAS_COM_ID or not isinstance(cliente_id, int):
+        return False
+    cliente = db.session.get(Cliente, cliente_id)
+    if cliente is None:
+        return False
+    return identificador == (cliente.cliente_id if tipo == "cliente" else cliente.mesa)
+
+
+def salas_do_pedido(pedido):
+    """Salas interessadas em um pedido: a mesa e o cliente dele, cozinha e caixa."""
+    salas = [SALA_COZINHA, SALA_CAIXA, SALA_ESTABELECIMENTO]
+    salas.append(nome_sala("cliente", pedido["cliente_id"]))
+    if pedido.get("cliente"):
+        salas.append(nome_sala("mesa", pedido["cliente"]["mesa"]))
+    return salas
+
+
+def calcular_delta_pedido(anterior, atual):
+    """
+    Compara dois estados (to_dict) de um pedido e retorna só o que mudou.
+    Sem estado anterior, o delta é o pedido completo (completo=True).
+    """
+    campos = {k: v for k, v in atual.items() if k != "itens"}
+    linhas = {linha["item_id"]: linha for linha in atual.get("itens", [])}
+    if anterior is None:
+        return {
+            "pedido_id": atual["pedido_id"],
+            "completo": True,
+            "campos": campos,
+            "itens": list(linhas.values()),
+            "itens_removidos": [],
+        }
+    linhas_anteriores = {linha["item_id"]: linha for linha in anterior.get("itens", [])}
+    return {
+        "pedido_id": atual["pedido_id"],
+        "completo": False,
+        "campos": {k: v for k, v in campos.items() if anterior.get(k) != v},
+        "itens": [
+            linha
+            for item_id, linha in linhas.items()
+            if linhas_anteriores.get(item_id) != linha
+        ],
+        "itens_removidos": [
+            item_id for item_id in linhas_anteriores if item_id not in linhas
+        ],
+    }
+
+
+class ArmazenamentoFeedMemoria:
+    """Sequência, buffer e últimos estados dos pedidos locais ao processo."""
+
+    def __init__(self, tamanho):
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._buffer = deque(maxlen=tamanho)
+        self._estados = OrderedDict()
+
+    def seq_atual(self):
+        return self._seq
+
+    def registrar(self, evento, salas, montar, pedido=None):
+        with self._lock:
+            anterior = None
+            if pedido is not None:
+                anterior = self._estados.pop(pedido["pedido_id"], None)
+                self._estados[pedido["pedido_id"]] = pedido
+                if len(self._estados) > LIMITE_ESTADOS_PEDIDO:
+                    self._estados.popitem(last=False)
+            self._seq += 1
+            envelope = {"seq": self._seq, **montar(anterior)}
+            self._buffer.append((evento, envelope, frozenset(salas)))
+            return envelope
+
+    def eventos_apos(self, seq):
+        """(seq atual, menor seq no buffer, eventos com seq maior que `seq`)."""
+        with self._lock:
+            eventos = list(self._buffer)
+            atual = self._seq
+        primeiro = eventos[0][1]["seq"] if eventos else None
+        return atual, primeiro, [e for e in eventos if e[1]["seq"] > seq]
+
+
+# Grava o evento com o próximo número de sequência em uma única operação: a
+# sequência nunca avança sem o evento correspondente no buffer. Com estado de
+# pedido (KEYS[3]) só grava se o estado anterior ainda for o usado no delta
+# (ARGV[3]); senão devolve {0, estado atual} para o delta ser recalculado.
+SCRIPT_REGISTRAR_EVENTO = """
+if KEYS[3] then
+    local atual = redis.call('GET', KEYS[3]) or ''
+    if atual ~= ARGV[3] then
+        return {0, atual}
+    end
+    redis.call('SET', KEYS[3], ARGV[4], 'EX', ARGV[5])
+end
+local seq = redis.call('INCR', KEYS[1])
+redis.call('ZADD', KEYS[2], seq, seq .. ':' .. ARGV[1])
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[2]) - 1)
+return {seq}
+"""
+
+
+class ArmazenamentoFeedRedis:
+    """
+    Sequência, buffer e estados compartilhados entre workers: a numeração é
+    única no cluster e um cliente pode retomar em qualquer worker. Cada membro
+    do buffer é "<seq>:<json>", com a sequência também como score.
+    """
+
+    def __init__(self, cliente, tamanho, prefixo="comandas:feed"):
+        self._cliente = cliente
+        self._tamanho = tamanho
+        self._chave_seq = f"{prefixo}:seq"
+        self._chave_eventos = f"{prefixo}:eventos"
+        self._prefixo_estado = f"{prefixo}:pedido:"
+        self._registrar = cliente.register_script(SCRIPT_REGISTRAR_EVENTO)
+
+    def seq_atual(self):
+        return int(self._cliente.get(self._chave_seq) or 0)
+
+    def registrar(self, evento, salas, montar, pedido=None):
+        chaves = [self._chave_seq, self._chave_eventos]
+        anterior = estado = b""
+        if pedido is not None:
+            chaves.append(f"{self._prefixo_estado}{pedido['pedido_id']}")
+            anterior = self._cliente.get(chaves[2]) or b""
+            estado = json.dumps(pedido, default=str)
+        while True:
+            corpo = montar(json.loads(anterior) if anterior else None)
+            membro = json.dumps([evento, corpo, sorted(salas)], default=str)
+            argumentos = [membro, self._tamanho]
+            if pedido is not None:
+                argumentos += [anterior, estado, TTL_ESTADO_PEDIDO]
+            resultado = self._registrar(keys=chaves, args=argumentos)
+            if int(resultado[0]):
+                return {"seq": int(resultado[0]), **corpo}
+            # Outro worker emitiu o mesmo pedido nesse meio tempo
+            anterior = resultado[1]
+
+    def eventos_apos(self, seq):
+        pipe = self._cliente.pipeline()
+        pipe.get(self._chave_seq)
+        pipe.zrange(self._chave_eventos, 0, 0, withscores=True)
+        pipe.zrangebyscore(self._chave_eventos, f"({seq}", "+inf")
+        atual, primeiro, membros = pipe.execute()
+        eventos = []
+        for membro in membros:
+            seq_evento, _, conteudo = membro.partition(b":")
+            evento, corpo, salas = json.loads(conteudo)
+            envelope = {"seq": int(seq_evento), **corpo}
+            eventos.append((evento, envelope, frozenset(salas)))
+        primeiro = int(primeiro[0][1]) if primeiro else None
+        return int(atual or 0), primeiro, eventos
+
+
+class FeedEventos:
+    """
+    Numera os eventos emitidos com uma sequência monotônica e guarda os mais
+    recentes em um buffer circular, para que um cliente que reconecta receba
+    apenas o que perdeu. Com REDIS_URL o feed é compartilhado pelos workers.
+    """
+
+    def __init__(self, tamanho=TAMANHO_BUFFER_EVENTOS):
+        self.tamanho = tamanho
+        self._armazenamento = ArmazenamentoFeedMemoria(tamanho)
+
+    def init_app(self, app):
+        url = app.config.get("REDIS_URL")
+        if url:
+            import redis
+
+            self._armazenamento = ArmazenamentoFeedRedis(
+                redis.Redis.from_url(url), self.tamanho
+            )
+        app.extensions["feed_eventos"] = self
+
+    def seq_atual(self):
+        return self._armazenamento.seq_atual()
+
+    def registrar(self, evento, dados, salas):
+        """Atribui o próximo número de sequência a `dados` e guarda no buffer."""
+        return self._armazenamento.registrar(evento, salas, lambda _: dados)
+
+    def registrar_pedido(self, evento, pedido, salas):
+        """
+        Registra o delta do pedido em relação ao último estado emitido; delta
+        e sequência são atribuídos juntos, de forma atômica.
+        """
+        return self._armazenamento.registrar(
+            evento,
+            salas,
+            lambda anterior: calcular_delta_pedido(anterior, pedido),
+            pedido=pedido,
+        )
+
+    def desde(self, seq, salas=None):
+        """
+        Eventos com sequência maior que `seq`, em ordem, limitados aos
+        destinados a alguma de `salas` (todas se None). Retorna None se algum
+        deles já saiu do buffer ou se `seq` é de antes de um reinício do
+        servidor (o cliente precisa recarregar tudo).
+        """
+        atual, primeiro, eventos = self._armazenamento.eventos_apos(seq)
+        if seq > atual:
+            return None
+        if seq == atual:
+            return []
+        if primeiro is None or primeiro > seq + 1:
+            return None
+        return [
+            (evento, envelope)
+            for evento, envelope, destino in eventos
+            if salas is None or destino & salas
+        ]
+
+
+feed = FeedEventos()
+
+
+def _emitir(socketio: SocketIO, evento, envelope, salas):
+    socketio.emit(evento, envelope, to=salas)
+
+
+def _emitir_pedido(socketio: SocketIO, evento, pedido):
+    salas = salas_do_pedido(pedido)
+    _emitir(socketio, evento, feed.registrar_pedido(evento, pedido, salas), salas)
+
 
 def emitir_pedido_novo(socketio: SocketIO, pedido):
-    socketio.emit("pedido_novo", pedido)
+    _emitir_pedido(socketio, "pedido_novo", pedido)
 
 
 def emitir_pedido_atualizado(socketio: SocketIO, pedido):
-    socketio.emit("pedido_atualizado", pedido)
+    _emitir_pedido(socketio, "pedido_atualizado", pedido)
+
 
+def emitir_linha_pedido_atualizada(socketio: SocketIO, linha, cliente_id, mesa=None):
+    """Emite só a linha alterada (status de um prato), sem o pedido inteiro."""
+    salas = [SALA_COZINHA, SALA_CAIXA, SALA_ESTABELECIMENTO]
+    salas.append(nome_sala("cliente", cliente_id))
+    if mesa is not None:
+        salas.append(nome_sala("mesa", mesa))
+    envelope = feed.registrar("pedido_item_atualizado", linha, salas)
+    _emitir(socketio, "pedido_item_atualizado", envelope, salas)
 
-def emitir_pagamento_recebido(socketio: SocketIO, pagamento):
-    socketio.emit("pagamento_recebido", pagamento)
+
+def emitir_pagamento_recebido(socketio: SocketIO, pagamento, mesa=None):
+    salas = [SALA_CAIXA, SALA_ESTABELECIMENTO]
+    if mesa is not None:
+        salas.append(nome_sala("mesa", mesa))
+    envelope = feed.registrar("pagamento_recebido", pagamento, salas)
+    _emitir(socketio, "pagamento_recebido", envelope, salas)
 
 
 def emitir_mesa_status(socketio: SocketIO, mesa):
-    socketio.emit("mesa_status", mesa)
+    salas = [SALA_CAIXA, SALA_ESTABELECIMENTO, nome_sala("mesa", mesa["numero"])]
+    _emitir(socketio, "mesa_status", feed.registrar("mesa_status", mesa, salas), salas)
+
+
+def registrar_handlers(socketio: SocketIO):
+    """Registra os handlers de salas e de retomada do feed no servidor Socket.IO."""
+
+    @socketio.on("entrar_sala")
+    def entrar_sala(dados):
+        """
+        Inscreve o socket em uma sala: {"tipo": "mesa", "id": 3, "cliente_id": 12}.
+        A equipe se identifica na conexão (auth {"token": ...}).
+        """
+        dados = dados or {}
+        try:
+            sala = nome_sala(dados.get("tipo"), dados.get("id"))
+        except ValueError as e:
+            return {"error": str(e)}
+        if not sala_permitida(
+            dados["tipo"],
+            dados.get("id"),
+            session.get("equipe", False),
+            dados.get("cliente_id"),
+        ):
+            return {"error": "Acesso negado à sala"}
+        join_room(sala)
+        return {"sala": sala}
+
+    @socketio.on("sair_sala")
+    def sair_sala(dados):
+        """Remove o cliente de uma sala em que ele entrou."""
+        dados = dados or {}
+        try:
+            sala = nome_sala(dados.get("tipo"), dados.get("id"))
+        except ValueError as e:
+            return {"error": str(e)}
+        leave_room(sala)
+        return {"sala": sala}
+
+    @socketio.on("retomar")
+    def retomar(dados):
+        """
+        Reenvia ao cliente os eventos após `seq` destinados às salas em que ele
+        está (entrar nas salas antes de retomar), ou pede ressincronização.
+        """
+        seq = (dados or {}).get("seq")
+        if not isinstance(seq, int):
+            emit("resincronizar", {"seq": feed.seq_atual()})
+            return
+        eventos = feed.desde(seq, salas=set(rooms()))
+        if eventos is None:
+            emit("resincronizar", {"seq": feed.seq_atual()})
+            return
+        for evento, envelope in eventos:
+            emit(evento, envelope)
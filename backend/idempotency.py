@@ -0,0 +1,255 @@
+"""
+Idempotência das rotas de escrita via cabeçalho Idempotency-Key.
+
+Tablets em Wi-Fi instável repetem POSTs cuja resposta se perdeu. Com o
+cabeçalho, a primeira requisição reserva a chave (escopo = método + rota),
+executa normalmente e grava a resposta; as repetições com a mesma chave
+recebem a resposta gravada, buscada pela chave primária, sem tocar nas
+tabelas de pedidos e pagamentos. Regras:
+
+- chave em andamento (reservada, sem resposta ainda): 409;
+- mesma chave com corpo diferente: 422;
+- respostas 5xx e 409 (conflitos transitórios) não são gravadas: a reserva
+  é liberada e o cliente pode repetir;
+- uma reserva sem resposta só é considerada abandonada depois do pior prazo
+  de uma chamada ao gateway (validade_reserva), para que a repetição não
+  assuma a reserva de uma cobrança ainda em andamento;
+- a resposta gravada leva o SHA-256 do corpo (cabeçalho Repr-Digest na
+  resposta original e nas repetições), conferido antes de cada repetição;
+- chaves expiram após VALIDADE_CHAVE; as expiradas são removidas de tempos
+  em tempos pelas próprias requisições e pelo comando `limpar-idempotencia`.
+"""
+
+import base64
+import functools
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app, jsonify, make_response, request
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models import ChaveIdempotencia
+from payment.client import opcoes_da_configuracao, prazo_maximo
+
+logger = logging.getLogger(__name__)
+
+CABECALHO_CHAVE = "Idempotency-Key"
+CABECALHO_REPETICAO = "Idempotent-Replayed"
+TAMANHO_MAXIMO_CHAVE = 255
+VALIDADE_CHAVE = timedelta(hours=24)
+# Reserva sem resposta além do pior prazo do gateway + margem: worker caiu
+MARGEM_RESERVA = timedelta(seconds=60)
+CABECALHO_DIGEST = "Repr-Digest"
+STATUS_NAO_ARMAZENADOS = {409}
+# Reservas entre remoções oportunistas de chaves expiradas (por processo)
+RESERVAS_ENTRE_LIMPEZAS = 100
+
+
+def hash_requisicao():
+    """SHA-256 do corpo; JSON é normalizado para ignorar ordem das chaves."""
+    dados = request.get_json(silent=True)
+    if dados is not None:
+        bruto = json.dumps(dados, sort_keys=True, separators=(",", ":")).encode()
+    else:
+        bruto = request.get_data()
+    return hashlib.sha256(bruto).hexdigest()
+
+
+def hash_corpo(corpo):
+    return hashlib.sha256(corpo or b"").hexdigest()
+
+
+def _digest(hash_hex):
+    """Valor do cabeçalho Repr-Digest (RFC 9530) a partir do SHA-256 em hex."""
+    return f"sha-256=:{base64.b64encode(bytes.fromhex(hash_hex)).decode()}:"
+
+
+def validade_reserva():
+    """
+    Tempo até uma reserva sem resposta ser considerada abandonada: sempre
+    maior que a chamada mais lenta possível ao gateway (com repetições).
+    """
+    prazo = prazo_maximo(**opcoes_da_configuracao(current_app.config))
+    return timedelta(seconds=prazo) + MARGEM_RESERVA
+
+
+def limpar_expiradas(agora=None):
+    """Remove as chaves expiradas (guiado pelo índice em expira_em)."""
+    resultado = db.session.execute(
+        delete(ChaveIdempotencia).where(
+            ChaveIdempotencia.expira_em <= (agora or datetime.utcnow())
+        )
+    )
+    db.session.commit()
+    return resultado.rowcount
+
+
+class _Contador:
+    def __init__(self):
+        self._valor = 0
+        self._lock = threading.Lock()
+
+    def incrementar(self):
+        with self._lock:
+            self._valor += 1
+            return self._valor
+
+
+_reservas = _Contador()
+
+
+def _vigente(registro, agora):
+    if registro.expira_em <= agora:
+        return False
+    if registro.status_code is None:
+        return registro.criado_em + validade_reserva() > agora
+    return True
+
+
+def _reservar(escopo, chave, hash_req):
+    """
+    Reserva a chave. Retorna (True, None) se reservou, ou (False, registro)
+    com o registro vigente dela (em andamento ou com resposta gravada).
+    """
+    agora = datetime.utcnow()
+    try:
+        registro = db.session.get(ChaveIdempotencia, (escopo, chave))
+        if registro is not None:
+            if _vigente(registro, agora):
+                return False, registro
+            db.session.delete(registro)
+            db.session.flush()
+        db.session.add(
+            ChaveIdempotencia(
+                escopo=escopo,
+                chave=chave,
+                hash_requisicao=hash_req,
+                criado_em=agora,
+                expira_em=agora + VALIDADE_CHAVE,
+            )
+        )
+        db.session.commit()
+        return True, None
+    except IntegrityError:
+        # Outra requisição com a mesma chave reservou primeiro
+        db.session.rollback()
+        return False, db.session.get(ChaveIdempotencia, (escopo, chave))
+
+
+def _filtro(escopo, chave):
+    return (ChaveIdempotencia.escopo == escopo, ChaveIdempotencia.chave == chave)
+
+
+def _gravar_resposta(escopo, chave, resposta):
+    db.session.rollback()  # descarta o que a rota possa ter deixado pendente
+    if resposta.status_code >= 500 or resposta.status_code in STATUS_NAO_ARMAZENADOS:
+        db.session.execute(delete(ChaveIdempotencia).where(*_filtro(escopo, chave)))
+    else:
+        corpo = resposta.get_data()
+        hash_resp = hash_corpo(corpo)
+        db.session.execute(
+            update(ChaveIdempotencia)
+            .where(*_filtro(escopo, chave))
+            .values(
+                status_code=resposta.status_code,
+                corpo=corpo,
+                hash_resposta=hash_resp,
+                mimetype=resposta.mimetype,
+                expira_em=datetime.utcnow() + VALIDADE_CHAVE,
+            )
+        )
+        resposta.headers[CABECALHO_DIGEST] = _digest(hash_resp)
+    db.session.commit()
+
+
+def _liberar(escopo, chave):
+    try:
+        db.session.rollback()
+        db.session.execute(delete(ChaveIdempotencia).where(*_filtro(escopo, chave)))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception("Falha ao liberar chave de idempotência %s", chave)
+
+
+def _repetir(registro):
+    hash_resp = hash_corpo(registro.corpo)
+    # Sem hash: resposta gravada antes da coluna hash_resposta
+    if registro.hash_resposta is not None and hash_resp != registro.hash_resposta:
+        raise ValueError("Resposta gravada não confere com o hash original")
+    resposta = make_response(registro.corpo, registro.status_code)
+    resposta.mimetype = registro.mimetype
+    resposta.headers[CABECALHO_REPETICAO] = "true"
+    resposta.headers[CABECALHO_DIGEST] = _digest(hash_resp)
+    return resposta
+
+
+def idempotente(view):
+    """Decorator: honra o cabeçalho Idempotency-Key na rota decorada."""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        chave = request.headers.get(CABECALHO_CHAVE)
+        if chave is None:
+            return view(*args, **kwargs)
+        chave = chave.strip()
+        if not chave or len(chave) > TAMANHO_MAXIMO_CHAVE:
+            return (
+                jsonify(
+                    {
+                        "error": f"{CABECALHO_CHAVE} deve ter entre 1 e "
+                        f"{TAMANHO_MAXIMO_CHAVE} caracteres"
+                    }
+                ),
+                400,
+            )
+        escopo = f"{request.method} {request.path}"
+        hash_req = hash_requisicao()
+        try:
+            reservado, registro = _reservar(escopo, chave, hash_req)
+            if _reservas.incrementar() % RESERVAS_ENTRE_LIMPEZAS == 0:
+                limpar_expiradas()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), 500
+        if not reservado:
+            if registro is not None and registro.hash_requisicao != hash_req:
+                return (
+                    jsonify(
+                        {
+                            "error": f"{CABECALHO_CHAVE} já usado com outro corpo "
+                            "de requisição"
+                        }
+                    ),
+                    422,
+                )
+            if registro is None or registro.status_code is None:
+                return (
+                    jsonify({"error": "Requisição com esta chave ainda em andamento"}),
+                    409,
+                )
+            try:
+                return _repetir(registro)
+            except ValueError as e:
+                logger.error("Chave de idempotência %s: %s", chave, e)
+                return jsonify({"error": str(e)}), 500
+
+        try:
+            resposta = make_response(view(*args, **kwargs))
+        except Exception:
+            _liberar(escopo, chave)
+            raise
+        try:
+            _gravar_resposta(escopo, chave, resposta)
+        except Exception:
+            # A operação já foi confirmada; sem a gravação a chave só deixa de proteger
+            logger.exception("Falha ao gravar resposta idempotente %s", chave)
+            _liberar(escopo, chave)
+        return resposta
+
+    return wrapper
@@ -0,0 +1,208 @@
+"""
+Importação e exportação do menu em lote.
+
+A importação lê o arquivo (CSV ou NDJSON) incrementalmente, valida cada
+linha e grava em lotes de TAMANHO_LOTE_IMPORTACAO com um único INSERT ...
+ON CONFLICT (sku) DO UPDATE por lote. Linhas inválidas são relatadas com o
+número da linha e não interrompem o restante do arquivo. Mudanças de preço
+de itens existentes passam pelo motor de totais, como no PUT /api/itens.
+
+A exportação percorre os itens em blocos (yield_per) e gera a resposta
+linha a linha, nas mesmas colunas aceitas pela importação.
+"""
+
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import db
+from models import Categoria, Item
+from outbox import registrar_evento
+from totals import arredondar, variar_preco_item
+
+TAMANHO_LOTE_IMPORTACAO = 500
+# Erros além deste limite são só contados, para a resposta não crescer sem limite
+MAXIMO_ERROS_RELATADOS = 1000
+TAMANHO_MAXIMO_SKU = 64
+TAMANHO_MAXIMO_NOME = 255
+COLUNAS_EXPORTACAO = ("item_id", "sku", "nome", "descricao", "preco", "categoria_id")
+
+
+# --- Leitura incremental ---
+def ler_csv(fluxo):
+    """Gera (número da linha, registro, erro) para cada linha do CSV."""
+    leitor = csv.DictReader(fluxo)
+    for registro in leitor:
+        yield leitor.line_num, registro, None
+
+
+def ler_ndjson(fluxo):
+    """Gera (número da linha, registro, erro) para cada linha não vazia do NDJSON."""
+    for numero, linha in enumerate(fluxo, start=1):
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            yield numero, json.loads(linha), None
+        except ValueError:
+            yield numero, None, "JSON inválido"
+
+
+LEITORES = {"csv": ler_csv, "ndjson": ler_ndjson}
+FORMATOS = tuple(LEITORES)
+
+
+# --- Validação ---
+def _texto(registro, campo):
+    valor = registro.get(campo)
+    return "" if valor is None else str(valor).strip()
+
+
+def validar_registro(registro, categorias):
+    """
+    Valida e normaliza um registro importado. Retorna (valores, None) ou
+    (None, mensagem de erro). `categorias` é o conjunto de ids existentes.
+    """
+    if not isinstance(registro, dict):
+        return None, "registro deve ser um objeto"
+    sku = _texto(registro, "sku")
+    if not sku or len(sku) > TAMANHO_MAXIMO_SKU:
+        return None, f"sku é obrigatório (até {TAMANHO_MAXIMO_SKU} caracteres)"
+    nome = _texto(registro, "nome")
+    if not nome or len(nome) > TAMANHO_MAXIMO_NOME:
+        return None, f"nome é obrigatório (até {TAMANHO_MAXIMO_NOME} caracteres)"
+    try:
+        preco = arredondar(_texto(registro, "preco"))
+    except InvalidOperation:
+        return None, "preco deve ser um número"
+    if not preco.is_finite() or preco < 0:
+        return None, "preco deve ser um número não negativo"
+    categoria_id = _texto(registro, "categoria_id")
+    if categoria_id:
+        try:
+            categoria_id = int(categoria_id)
+        except ValueError:
+            return None, "categoria_id deve ser um inteiro"
+        if categoria_id not in categorias:
+            return None, f"Categoria {categoria_id} não encontrada"
+    else:
+        categoria_id = None
+    return {
+        "sku": sku,
+        "nome": nome,
+        "descricao": _texto(registro, "descricao"),
+        "preco": preco,
+        "categoria_id": categoria_id,
+    }, None
+
+
+# --- Gravação ---
+def _upsert_itens(valores):
+    """Um único INSERT ... ON CONFLICT (sku) DO UPDATE para o lote."""
+    dialeto = db.session.get_bind().dialect.name
+    if dialeto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialeto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        _upsert_itens_sem_on_conflict(valores)
+        return
+    comando = insert(Item).values(valores)
+    comando = comando.on_conflict_do_update(
+        index_elements=[Item.sku],
+        set_={
+            campo: comando.excluded[campo]
+            for campo in ("nome", "descricao", "preco", "categoria_id")
+        },
+    )
+    db.session.execute(comando)
+
+
+def _upsert_itens_sem_on_conflict(valores):
+    # Bancos sem ON CONFLICT: itens existentes carregados em uma consulta
+    existentes = {
+        item.sku: item
+        for item in Item.query.filter(Item.sku.in_([v["sku"] for v in valores]))
+    }
+    for registro in valores:
+        item = existentes.get(registro["sku"])
+        if item is None:
+            db.session.add(Item(**registro))
+        else:
+            for campo, valor in registro.items():
+                setattr(item, campo, valor)
+    db.session.flush()
+
+
+def _registrar_erro(resultado, numero, registro, erro):
+    resultado["total_erros"] += 1
+    if len(resultado["erros"]) < MAXIMO_ERROS_RELATADOS:
+        sku = registro.get("sku") if isinstance(registro, dict) else None
+        resultado["erros"].append({"linha": numero, "sku": sku, "erro": erro})
+
+
+def _gravar_lote(lote, resultado):
+    """Grava o lote {sku: (linha, valores)} em uma transação."""
+    existentes = {
+        sku: (item_id, preco)
+        for sku, item_id, preco in db.session.execute(
+            select(Item.sku, Item.item_id, Item.preco).where(Item.sku.in_(list(lote)))
+        )
+    }
+    try:
+        # Pedidos abertos acompanham as mudanças de preço, como no PUT /itens
+        afetados = set()
+        for sku, (item_id, preco) in existentes.items():
+            variacao = lote[sku][1]["preco"] - Decimal(str(preco))
+            if variacao:
+                afetados.update(variar_preco_item(item_id, variacao))
+        _upsert_itens([valores for _, valores in lote.values()])
+        for pedido_id in sorted(afetados):
+            registrar_evento("pedido_atualizado", pedido_id=pedido_id)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        for numero, valores in lote.values():
+            _registrar_erro(resultado, numero, valores, f"Falha ao gravar o lote: {e}")
+        return
+    resultado["criados"] += len(lote) - len(existentes)
+    resultado["atualizados"] += len(existentes)
+
+
+def importar_itens(linhas, tamanho_lote=TAMANHO_LOTE_IMPORTACAO):
+    """
+    Importa as linhas de ler_csv/ler_ndjson. Cada lote é confirmado
+    separadamente; um SKU repetido no mesmo lote fica com a última linha.
+    Retorna {"criados", "atualizados", "erros", "total_erros"}.
+    """
+    resultado = {"criados": 0, "atualizados": 0, "erros": [], "total_erros": 0}
+    categorias = set(db.session.scalars(select(Categoria.categoria_id)))
+    lote = {}
+    for numero, registro, erro in linhas:
+        valores = None
+        if erro is None:
+            valores, erro = validar_registro(registro, categorias)
+        if erro is not None:
+            _registrar_erro(resultado, numero, registro, erro)
+            continue
+        lote[valores["sku"]] = (numero, valores)
+        if len(lote) >= tamanho_lote:
+            _gravar_lote(lote, resultado)
+            lote = {}
+    if lote:
+        _gravar_lote(lote, resultado)
+    return resultado
+
+
+# --- Exportação ---
+def tuplas_itens():
+    """Itens nas COLUNAS_EXPORTACAO, lidos do banco em blocos (yield_per)."""
+    consulta = (
+        select(*(getattr(Item, coluna) for coluna in COLUNAS_EXPORTACAO))
+        .order_by(Item.item_id)
+        .execution_options(yield_per=TAMANHO_LOTE_IMPORTACAO)
+    )
+    return db.session.execute(consulta)
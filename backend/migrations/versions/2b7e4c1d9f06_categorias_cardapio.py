@@ -0,0 +1,44 @@
+"""categorias do cardapio e categoria_id do item
+
+Revision ID: 2b7e4c1d9f06
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+Primeira revisão: parte do esquema criado por init_db (db.create_all) antes
+das categorias persistidas e cria a tabela categoria e a chave item.categoria_id.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2b7e4c1d9f06"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "categoria",
+        sa.Column("categoria_id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("nome", sa.String(length=100), nullable=False),
+        sa.Column("descricao", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("categoria_id"),
+        sa.UniqueConstraint("nome"),
+    )
+    with op.batch_alter_table("item") as batch_op:
+        batch_op.add_column(sa.Column("categoria_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_item_categoria", "categoria", ["categoria_id"], ["categoria_id"]
+        )
+    op.create_index("ix_item_categoria_id", "item", ["categoria_id"])
+
+
+def downgrade():
+    op.drop_index("ix_item_categoria_id", table_name="item")
+    with op.batch_alter_table("item") as batch_op:
+        batch_op.drop_constraint("fk_item_categoria", type_="foreignkey")
+        batch_op.drop_column("categoria_id")
+    op.drop_table("categoria")
@@ -0,0 +1,47 @@
+"""indices para as consultas frequentes das rotas
+
+Revision ID: 3f1c2a9b7d10
+Revises: 2b7e4c1d9f06
+Create Date: 2026-10-18 10:00:00.000000
+
+Adiciona os índices secundários usados pelas rotas.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3f1c2a9b7d10"
+down_revision = "2b7e4c1d9f06"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_cliente_mesa", "cliente", ["mesa"])
+    op.create_index("ix_mesa_status", "mesa", ["status"])
+    op.create_index("ix_pedido_cliente_fechado", "pedido", ["cliente_id", "fechado"])
+    op.create_index(
+        "uq_pedido_cliente_aberto",
+        "pedido",
+        ["cliente_id"],
+        unique=True,
+        sqlite_where=sa.text("fechado = 0"),
+        postgresql_where=sa.text("fechado = false"),
+    )
+    op.create_index("ix_pedido_data_hora", "pedido", ["data_hora", "pedido_id"])
+    op.create_index("ix_pedido_status_data_hora", "pedido", ["status", "data_hora"])
+    op.create_index("ix_pedido_item_item", "pedido_item", ["item_id"])
+    op.create_index("uq_pagamento_pedido", "pagamento", ["pedido_id"], unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_pagamento_pedido", table_name="pagamento")
+    op.drop_index("ix_pedido_item_item", table_name="pedido_item")
+    op.drop_index("ix_pedido_status_data_hora", table_name="pedido")
+    op.drop_index("ix_pedido_data_hora", table_name="pedido")
+    op.drop_index("uq_pedido_cliente_aberto", table_name="pedido")
+    op.drop_index("ix_pedido_cliente_fechado", table_name="pedido")
+    op.drop_index("ix_mesa_status", table_name="mesa")
+    op.drop_index("ix_cliente_mesa", table_name="cliente")
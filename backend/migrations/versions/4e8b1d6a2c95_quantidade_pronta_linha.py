@@ -0,0 +1,35 @@
+"""porcoes ja preparadas por linha do pedido
+
+Revision ID: 4e8b1d6a2c95
+Revises: 9c4a2e7f1b83
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4e8b1d6a2c95"
+down_revision = "9c4a2e7f1b83"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("pedido_item") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "quantidade_pronta", sa.Integer(), nullable=False, server_default="0"
+            )
+        )
+    # Linhas já prontas: todas as porções foram preparadas
+    op.execute(
+        "UPDATE pedido_item SET quantidade_pronta = quantidade WHERE status = 'Pronto'"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("pedido_item") as batch_op:
+        batch_op.drop_column("quantidade_pronta")
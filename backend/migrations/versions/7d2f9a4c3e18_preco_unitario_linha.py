@@ -0,0 +1,36 @@
+"""preco unitario gravado na linha do pedido
+
+Revision ID: 7d2f9a4c3e18
+Revises: 4e8b1d6a2c95
+Create Date: 2026-10-19 03:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7d2f9a4c3e18"
+down_revision = "4e8b1d6a2c95"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("pedido_item") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "preco_unitario", sa.Numeric(precision=10, scale=2), nullable=True
+            )
+        )
+    # Linhas existentes: melhor aproximação é o preço atual do cardápio
+    op.execute(
+        "UPDATE pedido_item SET preco_unitario = "
+        "(SELECT preco FROM item WHERE item.item_id = pedido_item.item_id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("pedido_item") as batch_op:
+        batch_op.drop_column("preco_unitario")
@@ -0,0 +1,41 @@
+"""resumos diarios do dashboard
+
+Revision ID: 8a4e6d2c1b57
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8a4e6d2c1b57"
+down_revision = "3f1c2a9b7d10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "resumo_diario",
+        sa.Column("dia", sa.Date(), primary_key=True),
+        sa.Column("pedidos", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("itens_vendidos", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("pagamentos", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("receita", sa.Numeric(12, 2), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "resumo_diario_item",
+        sa.Column("dia", sa.Date(), primary_key=True),
+        sa.Column("item_id", sa.Integer(), primary_key=True),
+        sa.Column("quantidade", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("receita", sa.Numeric(12, 2), nullable=False, server_default="0"),
+    )
+    # Carga inicial: rode `flask reconstruir-resumos --dias N` após a migração
+
+
+def downgrade():
+    op.drop_table("resumo_diario_item")
+    op.drop_table("resumo_diario")
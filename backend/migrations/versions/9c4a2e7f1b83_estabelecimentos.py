@@ -0,0 +1,33 @@
+"""estabelecimentos e suas credenciais de gateway
+
+Revision ID: 9c4a2e7f1b83
+Revises: f2c8b6d4a917
+Create Date: 2026-10-19 01:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9c4a2e7f1b83"
+down_revision = "f2c8b6d4a917"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "establishments",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("payment_gateway", sa.String(), nullable=True),
+        sa.Column("mp_access_token", sa.String(), nullable=True),
+        sa.Column("mp_public_key", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("establishments")
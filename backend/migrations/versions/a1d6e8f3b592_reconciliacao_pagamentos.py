@@ -0,0 +1,37 @@
+"""agenda de reconciliacao dos pagamentos pendentes
+
+Revision ID: a1d6e8f3b592
+Revises: e7b2c5a9f130
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a1d6e8f3b592"
+down_revision = "e7b2c5a9f130"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("pagamento") as batch_op:
+        batch_op.add_column(sa.Column("proxima_consulta", sa.DateTime()))
+        batch_op.add_column(
+            sa.Column(
+                "consultas_gateway", sa.Integer(), nullable=False, server_default="0"
+            )
+        )
+    op.create_index(
+        "ix_pagamento_status_consulta", "pagamento", ["status", "proxima_consulta"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_pagamento_status_consulta", table_name="pagamento")
+    with op.batch_alter_table("pagamento") as batch_op:
+        batch_op.drop_column("consultas_gateway")
+        batch_op.drop_column("proxima_consulta")
@@ -0,0 +1,40 @@
+"""chaves de idempotencia das rotas de escrita
+
+Revision ID: a7c3e9d15b28
+Revises: f61d2b8e4c07
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7c3e9d15b28"
+down_revision = "f61d2b8e4c07"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "chave_idempotencia",
+        sa.Column("escopo", sa.String(length=100), nullable=False),
+        sa.Column("chave", sa.String(length=255), nullable=False),
+        sa.Column("hash_requisicao", sa.String(length=64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("corpo", sa.LargeBinary(), nullable=True),
+        sa.Column("mimetype", sa.String(length=100), nullable=True),
+        sa.Column("criado_em", sa.DateTime(), nullable=False),
+        sa.Column("expira_em", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("escopo", "chave"),
+    )
+    op.create_index(
+        "ix_chave_idempotencia_expira_em", "chave_idempotencia", ["expira_em"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_chave_idempotencia_expira_em", table_name="chave_idempotencia")
+    op.drop_table("chave_idempotencia")
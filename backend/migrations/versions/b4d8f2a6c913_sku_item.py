@@ -0,0 +1,29 @@
+"""sku do item para importacao em lote
+
+Revision ID: b4d8f2a6c913
+Revises: a7c3e9d15b28
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b4d8f2a6c913"
+down_revision = "a7c3e9d15b28"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("item") as batch_op:
+        batch_op.add_column(sa.Column("sku", sa.String(length=64), nullable=True))
+    op.create_index("uq_item_sku", "item", ["sku"], unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_item_sku", table_name="item")
+    with op.batch_alter_table("item") as batch_op:
+        batch_op.drop_column("sku")
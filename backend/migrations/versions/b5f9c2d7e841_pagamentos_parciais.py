@@ -0,0 +1,43 @@
+"""pagamentos parciais: varios pagamentos por pedido e valor pago acumulado
+
+Revision ID: b5f9c2d7e841
+Revises: a1d6e8f3b592
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b5f9c2d7e841"
+down_revision = "a1d6e8f3b592"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index("uq_pagamento_pedido", table_name="pagamento")
+    op.create_index("ix_pagamento_pedido", "pagamento", ["pedido_id"])
+    with op.batch_alter_table("pedido") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "valor_pago", sa.Numeric(10, 2), nullable=False, server_default="0"
+            )
+        )
+    # Saldo dos pedidos existentes a partir dos pagamentos já aprovados
+    op.execute(
+        "UPDATE pedido SET valor_pago = COALESCE(("
+        "SELECT SUM(pagamento.valor) FROM pagamento "
+        "WHERE pagamento.pedido_id = pedido.pedido_id "
+        "AND pagamento.status = 'aprovado'), 0)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("pedido") as batch_op:
+        batch_op.drop_column("valor_pago")
+    op.drop_index("ix_pagamento_pedido", table_name="pagamento")
+    # Volta a um pagamento por pedido; falha se já houver pagamentos parciais
+    op.create_index("uq_pagamento_pedido", "pagamento", ["pedido_id"], unique=True)
@@ -0,0 +1,32 @@
+"""outbox de eventos socket.io
+
+Revision ID: c52e7f0a9d31
+Revises: 8a4e6d2c1b57
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c52e7f0a9d31"
+down_revision = "8a4e6d2c1b57"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "evento_outbox",
+        sa.Column("evento_id", sa.Integer(), primary_key=True),
+        sa.Column("tipo", sa.String(length=50), nullable=False),
+        sa.Column("pedido_id", sa.Integer(), nullable=True),
+        sa.Column("dados", sa.JSON(), nullable=True),
+        sa.Column("criado_em", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("evento_outbox")
@@ -0,0 +1,24 @@
+"""indice de pagamentos por data para os relatorios
+
+Revision ID: c9e1a4b7d362
+Revises: b4d8f2a6c913
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "c9e1a4b7d362"
+down_revision = "b4d8f2a6c913"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_pagamento_data_hora", "pagamento", ["data_hora"])
+
+
+def downgrade():
+    op.drop_index("ix_pagamento_data_hora", table_name="pagamento")
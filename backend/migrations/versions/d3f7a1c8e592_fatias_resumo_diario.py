@@ -0,0 +1,50 @@
+"""fatias do resumo diario
+
+Revision ID: d3f7a1c8e592
+Revises: b5f9c2d7e841
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d3f7a1c8e592"
+down_revision = "b5f9c2d7e841"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # As linhas existentes ficam na fatia 0
+    with op.batch_alter_table("resumo_diario", recreate="always") as batch_op:
+        batch_op.add_column(
+            sa.Column("fatia", sa.SmallInteger(), nullable=False, server_default="0")
+        )
+        batch_op.create_primary_key("pk_resumo_diario", ["dia", "fatia"])
+
+
+def downgrade():
+    # Junta as fatias de cada dia na fatia 0 antes de remover a coluna
+    op.execute(
+        "UPDATE resumo_diario SET"
+        " pedidos = (SELECT SUM(r.pedidos) FROM resumo_diario r"
+        " WHERE r.dia = resumo_diario.dia),"
+        " itens_vendidos = (SELECT SUM(r.itens_vendidos) FROM resumo_diario r"
+        " WHERE r.dia = resumo_diario.dia),"
+        " pagamentos = (SELECT SUM(r.pagamentos) FROM resumo_diario r"
+        " WHERE r.dia = resumo_diario.dia),"
+        " receita = (SELECT SUM(r.receita) FROM resumo_diario r"
+        " WHERE r.dia = resumo_diario.dia)"
+        " WHERE fatia = 0"
+    )
+    op.execute(
+        "DELETE FROM resumo_diario WHERE fatia <> 0 AND dia IN"
+        " (SELECT dia FROM resumo_diario WHERE fatia = 0)"
+    )
+    op.execute("UPDATE resumo_diario SET fatia = 0")
+    with op.batch_alter_table("resumo_diario", recreate="always") as batch_op:
+        batch_op.drop_column("fatia")
+        batch_op.create_primary_key("pk_resumo_diario", ["dia"])
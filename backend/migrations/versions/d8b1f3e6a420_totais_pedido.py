@@ -0,0 +1,50 @@
+"""subtotal, desconto e taxa de servico do pedido
+
+Revision ID: d8b1f3e6a420
+Revises: c52e7f0a9d31
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d8b1f3e6a420"
+down_revision = "c52e7f0a9d31"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("pedido") as batch_op:
+        batch_op.add_column(
+            sa.Column("subtotal", sa.Numeric(10, 2), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("desconto", sa.Numeric(10, 2), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column(
+                "percentual_servico",
+                sa.Numeric(5, 2),
+                nullable=False,
+                server_default="0",
+            )
+        )
+        batch_op.add_column(
+            sa.Column(
+                "taxa_servico", sa.Numeric(10, 2), nullable=False, server_default="0"
+            )
+        )
+    # Pedidos existentes não têm desconto nem taxa: o subtotal é o total atual
+    op.execute("UPDATE pedido SET subtotal = total")
+
+
+def downgrade():
+    with op.batch_alter_table("pedido") as batch_op:
+        batch_op.drop_column("taxa_servico")
+        batch_op.drop_column("percentual_servico")
+        batch_op.drop_column("desconto")
+        batch_op.drop_column("subtotal")
@@ -0,0 +1,42 @@
+"""status e horarios por linha do pedido
+
+Revision ID: e3a9c7b2f154
+Revises: d8b1f3e6a420
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e3a9c7b2f154"
+down_revision = "d8b1f3e6a420"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("pedido_item") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "status", sa.String(length=20), nullable=False, server_default="Na fila"
+            )
+        )
+        batch_op.add_column(sa.Column("enfileirado_em", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("iniciado_em", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("pronto_em", sa.DateTime(), nullable=True))
+    # Linhas existentes: enfileiradas quando o pedido foi aberto
+    op.execute(
+        "UPDATE pedido_item SET enfileirado_em = "
+        "(SELECT data_hora FROM pedido WHERE pedido.pedido_id = pedido_item.pedido_id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("pedido_item") as batch_op:
+        batch_op.drop_column("pronto_em")
+        batch_op.drop_column("iniciado_em")
+        batch_op.drop_column("enfileirado_em")
+        batch_op.drop_column("status")
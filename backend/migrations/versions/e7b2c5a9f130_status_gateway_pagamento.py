@@ -0,0 +1,39 @@
+"""status e id no gateway dos pagamentos
+
+Revision ID: e7b2c5a9f130
+Revises: c9e1a4b7d362
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e7b2c5a9f130"
+down_revision = "c9e1a4b7d362"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Pagamentos já gravados foram confirmados no caixa
+    with op.batch_alter_table("pagamento") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "status",
+                sa.String(length=20),
+                nullable=False,
+                server_default="aprovado",
+            )
+        )
+        batch_op.add_column(sa.Column("gateway_id", sa.String(length=64)))
+    op.create_index("uq_pagamento_gateway", "pagamento", ["gateway_id"], unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_pagamento_gateway", table_name="pagamento")
+    with op.batch_alter_table("pagamento") as batch_op:
+        batch_op.drop_column("gateway_id")
+        batch_op.drop_column("status")
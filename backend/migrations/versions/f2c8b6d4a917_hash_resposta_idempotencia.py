@@ -0,0 +1,30 @@
+"""hash da resposta gravada das chaves de idempotencia
+
+Revision ID: f2c8b6d4a917
+Revises: d3f7a1c8e592
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f2c8b6d4a917"
+down_revision = "d3f7a1c8e592"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("chave_idempotencia") as batch_op:
+        batch_op.add_column(
+            sa.Column("hash_resposta", sa.String(length=64), nullable=True)
+        )
+    # Respostas gravadas antes da coluna ficam sem hash e são repetidas sem conferência
+
+
+def downgrade():
+    with op.batch_alter_table("chave_idempotencia") as batch_op:
+        batch_op.drop_column("hash_resposta")
@@ -0,0 +1,29 @@
+"""versao do pedido para concorrencia otimista
+
+Revision ID: f61d2b8e4c07
+Revises: e3a9c7b2f154
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f61d2b8e4c07"
+down_revision = "e3a9c7b2f154"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("pedido") as batch_op:
+        batch_op.add_column(
+            sa.Column("versao", sa.Integer(), nullable=False, server_default="1")
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("pedido") as batch_op:
+        batch_op.drop_column("versao")
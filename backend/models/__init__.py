@@ -4,5 +4,23 @@ from .item import Item
 from .pedido_item import PedidoItem
 from .pagamento import Pagamento
 from .mesa import Mesa
+from .categoria import Categoria
+from .resumo_diario import ResumoDiario, ResumoDiarioItem
+from .evento_outbox import EventoOutbox
+from .chave_idempotencia import ChaveIdempotencia
+from .establishment import Establishment
 
-__all__ = ["Cliente", "Pedido", "Item", "PedidoItem", "Pagamento", "Mesa"]
+__all__ = [
+    "Cliente",
+    "Pedido",
+    "Item",
+    "PedidoItem",
+    "Pagamento",
+    "Mesa",
+    "Categoria",
+    "ResumoDiario",
+    "ResumoDiarioItem",
+    "EventoOutbox",
+    "ChaveIdempotencia",
+    "Establishment",
+]
@@ -0,0 +1,26 @@
+from database import db
+
+
+class Categoria(db.Model):
+    """Modelo de Categoria, agrupa os itens do menu."""
+
+    __tablename__ = "categoria"
+
+    categoria_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    nome = db.Column(db.String(100), nullable=False, unique=True)
+    descricao = db.Column(db.Text)
+
+    # Relacionamentos
+    itens = db.relationship("Item", backref="categoria")
+
+    def __repr__(self):
+        """Retorna representação legível da categoria."""
+        return f"<Categoria {self.nome}>"
+
+    def to_dict(self):
+        """Converte a categoria para dicionário serializável."""
+        return {
+            "id": self.categoria_id,
+            "nome": self.nome,
+            "descricao": self.descricao,
+        }
@@ -0,0 +1,28 @@
+from datetime import datetime
+from database import db
+
+
+class ChaveIdempotencia(db.Model):
+    """
+    Resposta gravada para um Idempotency-Key (idempotency.py). Enquanto a
+    requisição original está em andamento status_code é nulo; depois guarda
+    a resposta que é devolvida a cada repetição até expirar.
+    """
+
+    __tablename__ = "chave_idempotencia"
+
+    # Rota ("POST /api/pedidos") + chave enviada pelo cliente
+    escopo = db.Column(db.String(100), primary_key=True)
+    chave = db.Column(db.String(255), primary_key=True)
+    hash_requisicao = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)
+    corpo = db.Column(db.LargeBinary, nullable=True)
+    # SHA-256 do corpo gravado: a repetição é conferida contra a resposta original
+    hash_resposta = db.Column(db.String(64), nullable=True)
+    mimetype = db.Column(db.String(100), nullable=True)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expira_em = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        """Retorna representação legível da chave."""
+        return f"<ChaveIdempotencia {self.escopo} {self.chave}>"
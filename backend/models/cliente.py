@@ -10,7 +10,7 @@ class Cliente(db.Model):
 
     cliente_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     nome = db.Column(db.String(255), nullable=False)
-    mesa = db.Column(db.Integer, nullable=False)
+    mesa = db.Column(db.Integer, nullable=False, index=True)
 
     # Relacionamentos
     pedidos = db.relationship("Pedido", backref="cliente")
@@ -0,0 +1,22 @@
+from datetime import datetime
+from database import db
+
+
+class EventoOutbox(db.Model):
+    """
+    Evento Socket.IO pendente, gravado na mesma transação da alteração que o
+    originou e emitido depois do commit pelo drenador (outbox.py).
+    """
+
+    __tablename__ = "evento_outbox"
+
+    evento_id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    # Eventos de pedido guardam só o id: o payload é montado na drenagem
+    pedido_id = db.Column(db.Integer, nullable=True)
+    dados = db.Column(db.JSON, nullable=True)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        """Retorna representação legível do evento."""
+        return f"<EventoOutbox {self.evento_id} {self.tipo}>"
@@ -6,11 +6,17 @@ class Item(db.Model):
     """Modelo de Item, representa um produto do menu."""
 
     __tablename__ = "item"
+    __table_args__ = (db.Index("uq_item_sku", "sku", unique=True),)
 
     item_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    # Código externo do item (ERP/planilha); chave da importação em lote
+    sku = db.Column(db.String(64), nullable=True)
     nome = db.Column(db.String(255), nullable=False)
     descricao = db.Column(db.Text)
     preco = db.Column(db.Numeric(10, 2), nullable=False)
+    categoria_id = db.Column(
+        db.Integer, db.ForeignKey("categoria.categoria_id"), nullable=True, index=True
+    )
 
     # Relacionamentos
     pedido_itens = db.relationship(
@@ -25,7 +31,9 @@ class Item(db.Model):
         """Converte o item para dicionário serializável."""
         return {
             "item_id": self.item_id,
+            "sku": self.sku,
             "nome": self.nome,
             "descricao": self.descricao,
             "preco": float(self.preco),
+            "categoria_id": self.categoria_id,
         }
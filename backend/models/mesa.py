@@ -9,7 +9,7 @@ class Mesa(db.Model):
     mesa_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     numero = db.Column(db.Integer, nullable=False, unique=True)
     capacidade = db.Column(db.Integer, nullable=False)
-    status = db.Column(db.String(50), nullable=False, default="livre")
+    status = db.Column(db.String(50), nullable=False, default="livre", index=True)
 
     def __repr__(self):
         """Retorna representação legível da mesa."""
@@ -2,11 +2,26 @@ from datetime import datetime
 from decimal import Decimal
 from database import db
 
+# Status do pagamento
+STATUS_PENDENTE = "pendente"
+STATUS_APROVADO = "aprovado"
+STATUS_RECUSADO = "recusado"
+STATUS_CANCELADO = "cancelado"
+STATUS_ESTORNADO = "estornado"
+
 
 class Pagamento(db.Model):
     """Modelo de Pagamento, representa um pagamento realizado para um pedido."""
 
     __tablename__ = "pagamento"
+    __table_args__ = (
+        # Vários pagamentos (parciais) por pedido
+        db.Index("ix_pagamento_pedido", "pedido_id"),
+        db.Index("ix_pagamento_data_hora", "data_hora"),
+        db.Index("uq_pagamento_gateway", "gateway_id", unique=True),
+        # Reconciliação: pendentes com consulta vencida
+        db.Index("ix_pagamento_status_consulta", "status", "proxima_consulta"),
+    )
 
     pagamento_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     pedido_id = db.Column(db.Integer, db.ForeignKey("pedido.pedido_id"), nullable=False)
@@ -17,6 +32,12 @@ class Pagamento(db.Model):
     )  # Para pagamentos em dinheiro
     troco = db.Column(db.Numeric(10, 2), nullable=True)  # Troco calculado
     data_hora = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Pagamentos via gateway (PIX) nascem pendentes e são confirmados pelo webhook
+    status = db.Column(db.String(20), nullable=False, default=STATUS_APROVADO)
+    gateway_id = db.Column(db.String(64), nullable=True)  # ID no gateway
+    # Agenda da reconciliação de pendentes (payment/reconciler.py)
+    proxima_consulta = db.Column(db.DateTime, nullable=True)
+    consultas_gateway = db.Column(db.Integer, nullable=False, default=0)
 
     def __repr__(self):
         """Retorna representação legível do pagamento."""
@@ -32,4 +53,6 @@ class Pagamento(db.Model):
             "valor_pago": float(self.valor_pago) if self.valor_pago else None,
             "troco": float(self.troco) if self.troco else None,
             "data_hora": self.data_hora.isoformat() if self.data_hora else None,
+            "status": self.status,
+            "gateway_id": self.gateway_id,
         }
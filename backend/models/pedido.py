@@ -7,6 +7,21 @@ class Pedido(db.Model):
     """Modelo de Pedido, representa um pedido realizado por um cliente."""
 
     __tablename__ = "pedido"
+    __table_args__ = (
+        # Pedido aberto do cliente: filter_by(cliente_id=..., fechado=False)
+        db.Index("ix_pedido_cliente_fechado", "cliente_id", "fechado"),
+        # No máximo um pedido aberto por cliente (índice parcial, só pedidos abertos)
+        db.Index(
+            "uq_pedido_cliente_aberto",
+            "cliente_id",
+            unique=True,
+            sqlite_where=db.text("fechado = 0"),
+            postgresql_where=db.text("fechado = false"),
+        ),
+        # Listagem paginada por (data_hora, pedido_id) e filas por status
+        db.Index("ix_pedido_data_hora", "data_hora", "pedido_id"),
+        db.Index("ix_pedido_status_data_hora", "status", "data_hora"),
+    )
 
     pedido_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     cliente_id = db.Column(
@@ -14,20 +29,37 @@ class Pedido(db.Model):
     )
     status = db.Column(db.String(50), nullable=False, default="Aguardando Seleção")
     data_hora = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Totais mantidos pelo motor de totais (totals.py)
+    subtotal = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    desconto = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    percentual_servico = db.Column(db.Numeric(5, 2), nullable=False, default=0)
+    taxa_servico = db.Column(db.Numeric(10, 2), nullable=False, default=0)
     total = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    # Soma dos pagamentos aprovados, mantida a cada confirmação (payment/ledger.py)
+    valor_pago = db.Column(db.Numeric(10, 2), nullable=False, default=0)
     fechado = db.Column(
         db.Boolean, default=False
     )  # Indica se o pedido foi fechado para pagamento
 
+    # Controle de concorrência otimista: todo UPDATE do ORM compara e incrementa
+    versao = db.Column(db.Integer, nullable=False, default=1)
+
     # Relacionamentos
     itens = db.relationship(
         "PedidoItem", backref="pedido", cascade="all, delete-orphan"
     )
 
+    __mapper_args__ = {"version_id_col": versao}
+
     def __repr__(self):
         """Retorna representação legível do pedido."""
         return f"<Pedido {self.pedido_id}>"
 
+    @property
+    def saldo(self):
+        """Quanto falta pagar do total do pedido."""
+        return Decimal(str(self.total or 0)) - Decimal(str(self.valor_pago or 0))
+
     def to_dict(self):
         """Converte o pedido para dicionário serializável."""
         return {
@@ -35,7 +67,15 @@ class Pedido(db.Model):
             "cliente_id": self.cliente_id,
             "status": self.status,
             "data_hora": self.data_hora.isoformat() if self.data_hora else None,
+            "subtotal": float(self.subtotal) if self.subtotal else 0.0,
+            "desconto": float(self.desconto) if self.desconto else 0.0,
+            "percentual_servico": (
+                float(self.percentual_servico) if self.percentual_servico else 0.0
+            ),
+            "taxa_servico": float(self.taxa_servico) if self.taxa_servico else 0.0,
             "total": float(self.total) if self.total else 0.0,
+            "valor_pago": float(self.valor_pago) if self.valor_pago else 0.0,
+            "saldo": float(self.saldo),
             "fechado": self.fechado,
             "itens": [item.to_dict() for item in self.itens],  # type: ignore
             "cliente": self.cliente.to_dict() if self.cliente else None,
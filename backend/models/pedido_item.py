@@ -6,22 +6,48 @@ class PedidoItem(db.Model):
     """Modelo de PedidoItem, representa a associação de um item a um pedido com quantidade."""
 
     __tablename__ = "pedido_item"
+    # A chave primária (pedido_id, item_id) já atende buscas por pedido
+    __table_args__ = (db.Index("ix_pedido_item_item", "item_id"),)
 
     pedido_id = db.Column(
         db.Integer, db.ForeignKey("pedido.pedido_id"), primary_key=True
     )
     item_id = db.Column(db.Integer, db.ForeignKey("item.item_id"), primary_key=True)
     quantidade = db.Column(db.Integer, nullable=False)
+    # Porções que a cozinha já tratou; só quantidade - quantidade_pronta vai à fila
+    quantidade_pronta = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # Preço do item ao lançar a linha; segue o cardápio só enquanto o pedido está aberto
+    preco_unitario = db.Column(db.Numeric(10, 2), nullable=True)
+    # Andamento da linha na cozinha (ver STATUS_LINHA_* em routes/orders.py)
+    status = db.Column(db.String(20), nullable=False, default="Na fila")
+    enfileirado_em = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)
+    iniciado_em = db.Column(db.DateTime, nullable=True)
+    pronto_em = db.Column(db.DateTime, nullable=True)
 
     def __repr__(self):
         """Retorna representação legível do item do pedido."""
         return f"<PedidoItem {self.pedido_id}-{self.item_id}>"
 
-    def to_dict(self):
-        """Converte o item do pedido para dicionário serializável."""
+    def to_dict_linha(self):
+        """Campos próprios da linha, sem o item do menu (usado nos eventos de linha)."""
         return {
             "pedido_id": self.pedido_id,
             "item_id": self.item_id,
             "quantidade": self.quantidade,
+            "quantidade_pronta": self.quantidade_pronta or 0,
+            "status": self.status,
+            "enfileirado_em": (
+                self.enfileirado_em.isoformat() if self.enfileirado_em else None
+            ),
+            "iniciado_em": self.iniciado_em.isoformat() if self.iniciado_em else None,
+            "pronto_em": self.pronto_em.isoformat() if self.pronto_em else None,
+        }
+
+    def to_dict(self):
+        """Converte o item do pedido para dicionário serializável."""
+        return {
+            **self.to_dict_linha(),
             "item": self.item.to_dict() if self.item else None,
         }
@@ -0,0 +1,49 @@
+from decimal import Decimal
+from database import db
+
+
+class ResumoDiario(db.Model):
+    """
+    Totais do dia mantidos incrementalmente (pedidos, itens, pagamentos e receita).
+    Cada dia tem até FATIAS_RESUMO linhas, somadas na leitura.
+    """
+
+    __tablename__ = "resumo_diario"
+
+    dia = db.Column(db.Date, primary_key=True)
+    # Fatia do contador: escritas simultâneas atualizam linhas diferentes do dia
+    fatia = db.Column(db.SmallInteger, primary_key=True, default=0)
+    pedidos = db.Column(db.Integer, nullable=False, default=0)
+    itens_vendidos = db.Column(db.Integer, nullable=False, default=0)
+    pagamentos = db.Column(db.Integer, nullable=False, default=0)
+    receita = db.Column(db.Numeric(12, 2), nullable=False, default=Decimal("0.00"))
+
+    def __repr__(self):
+        """Retorna representação legível do resumo."""
+        return f"<ResumoDiario {self.dia}-{self.fatia}>"
+
+    def to_dict(self):
+        """Converte o resumo para dicionário serializável."""
+        return {
+            "dia": self.dia.isoformat(),
+            "pedidos": self.pedidos,
+            "itens_vendidos": self.itens_vendidos,
+            "pagamentos": self.pagamentos,
+            "receita": float(self.receita) if self.receita else 0.0,
+        }
+
+
+class ResumoDiarioItem(db.Model):
+    """Quantidade e valor vendidos de um item no dia (base do ranking de mais vendidos)."""
+
+    __tablename__ = "resumo_diario_item"
+
+    dia = db.Column(db.Date, primary_key=True)
+    # Sem chave estrangeira: o histórico sobrevive à remoção do item do menu
+    item_id = db.Column(db.Integer, primary_key=True)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    receita = db.Column(db.Numeric(12, 2), nullable=False, default=Decimal("0.00"))
+
+    def __repr__(self):
+        """Retorna representação legível do resumo do item."""
+        return f"<ResumoDiarioItem {self.dia}-{self.item_id}>"
@@ -0,0 +1,172 @@
+"""
+Outbox transacional de eventos Socket.IO.
+
+As rotas chamam registrar_evento antes do commit: o evento é gravado na
+mesma transação que a alteração, então um rollback também descarta o
+evento. Um drenador em segundo plano (um por worker) lê os eventos em lote,
+agrupa as atualizações do mesmo pedido em um único evento, monta os
+payloads com carga em lote das relações e emite. A requisição HTTP não
+espera pelo Socket.IO.
+"""
+
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import db
+from models import EventoOutbox, Pedido
+from events import (
+    emitir_pedido_novo,
+    emitir_pedido_atualizado,
+    emitir_pagamento_recebido,
+    emitir_mesa_status,
+    emitir_linha_pedido_atualizada,
+)
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE_OUTBOX = 200
+# Segundos entre drenagens; atualizações do mesmo pedido nesse intervalo são agrupadas
+JANELA_COALESCENCIA = 0.05
+# Segundos entre varreduras sem aviso (eventos gravados por outros processos)
+INTERVALO_VARREDURA = 2.0
+CHAVE_PENDENTE = "outbox_pendente"
+
+EMISSORES_PEDIDO = {
+    "pedido_novo": emitir_pedido_novo,
+    "pedido_atualizado": emitir_pedido_atualizado,
+}
+EMISSORES = {
+    "pagamento_recebido": lambda socketio, dados: emitir_pagamento_recebido(
+        socketio, dados["pagamento"], dados.get("mesa")
+    ),
+    "mesa_status": emitir_mesa_status,
+    "pedido_item_atualizado": lambda socketio, dados: emitir_linha_pedido_atualizada(
+        socketio, dados["linha"], dados["cliente_id"], dados.get("mesa")
+    ),
+}
+
+
+def registrar_evento(tipo, pedido_id=None, dados=None):
+    """
+    Grava o evento na transação corrente; ele só é emitido após o commit.
+    Eventos de pedido informam `pedido_id`, os demais o payload em `dados`.
+    """
+    if tipo not in EMISSORES_PEDIDO and tipo not in EMISSORES:
+        raise ValueError(f"Evento desconhecido: {tipo}")
+    db.session.add(EventoOutbox(tipo=tipo, pedido_id=pedido_id, dados=dados))
+    db.session.info[CHAVE_PENDENTE] = True
+
+
+def coalescer(eventos):
+    """
+    Reduz o lote a um evento por pedido, na posição da primeira ocorrência.
+    Se alguma ocorrência for "pedido_novo" o evento resultante também é.
+    Retorna tuplas (tipo, pedido_id, dados).
+    """
+    resultado = []
+    posicoes = {}
+    for evento in eventos:
+        if evento.pedido_id is None:
+            resultado.append((evento.tipo, None, evento.dados))
+            continue
+        posicao = posicoes.get(evento.pedido_id)
+        if posicao is None:
+            posicoes[evento.pedido_id] = len(resultado)
+            resultado.append((evento.tipo, evento.pedido_id, None))
+        elif evento.tipo == "pedido_novo":
+            resultado[posicao] = ("pedido_novo", evento.pedido_id, None)
+    return resultado
+
+
+def drenar(socketio, limite=TAMANHO_LOTE_OUTBOX):
+    """
+    Emite e remove até `limite` eventos pendentes. Retorna quantos foram lidos.
+    Com PostgreSQL as linhas são travadas com SKIP LOCKED, então vários
+    workers drenam em paralelo sem emitir o mesmo evento duas vezes.
+    """
+    from routes.orders import opcoes_carga_pedido
+
+    eventos = (
+        EventoOutbox.query.order_by(EventoOutbox.evento_id)
+        .limit(limite)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not eventos:
+        db.session.rollback()
+        return 0
+    lote = coalescer(eventos)
+    ids_pedidos = [pedido_id for _, pedido_id, _ in lote if pedido_id is not None]
+    pedidos = {}
+    if ids_pedidos:
+        pedidos = {
+            pedido.pedido_id: pedido
+            for pedido in Pedido.query.options(*opcoes_carga_pedido()).filter(
+                Pedido.pedido_id.in_(ids_pedidos)
+            )
+        }
+    for tipo, pedido_id, dados in lote:
+        try:
+            if pedido_id is None:
+                EMISSORES[tipo](socketio, dados)
+            elif pedido_id in pedidos:
+                EMISSORES_PEDIDO[tipo](socketio, pedidos[pedido_id].to_dict())
+        except Exception:
+            logger.exception("Falha ao emitir evento %s do outbox", tipo)
+    EventoOutbox.query.filter(
+        EventoOutbox.evento_id.in_([evento.evento_id for evento in eventos])
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return len(eventos)
+
+
+class DrenadorOutbox:
+    """Tarefa de segundo plano que drena o outbox quando avisada ou periodicamente."""
+
+    def __init__(self):
+        self._pendente = False
+        self._ativo = False
+
+    def avisar(self):
+        """Sinaliza que há eventos novos (chamado após o commit)."""
+        self._pendente = True
+
+    def iniciar(self, app, socketio):
+        if self._ativo:
+            return
+        self._ativo = True
+        socketio.start_background_task(self._executar, app, socketio)
+
+    def _executar(self, app, socketio):
+        ultima_varredura = 0.0
+        while True:
+            socketio.sleep(JANELA_COALESCENCIA)
+            agora = time.monotonic()
+            if not self._pendente and agora - ultima_varredura < INTERVALO_VARREDURA:
+                continue
+            self._pendente = False
+            ultima_varredura = agora
+            with app.app_context():
+                try:
+                    while drenar(socketio) >= TAMANHO_LOTE_OUTBOX:
+                        pass
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Falha ao drenar o outbox de eventos")
+
+
+drenador = DrenadorOutbox()
+
+
+@event.listens_for(Session, "after_commit")
+def _avisar_apos_commit(session):
+    if session.info.pop(CHAVE_PENDENTE, False):
+        drenador.avisar()
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_aviso(session):
+    session.info.pop(CHAVE_PENDENTE, None)
@@ -0,0 +1,20 @@
+from .client import (
+    CircuitoAberto,
+    ClienteHTTPGateway,
+    ClienteHTTPGatewayAsync,
+    DisjuntorCircuito,
+    ErroGateway,
+)
+from .base import PaymentGatewayBase
+from .mp_adapter import AsyncMercadoPagoAdapter, MercadoPagoAdapter
+
+__all__ = [
+    "CircuitoAberto",
+    "ClienteHTTPGateway",
+    "ClienteHTTPGatewayAsync",
+    "DisjuntorCircuito",
+    "ErroGateway",
+    "AsyncMercadoPagoAdapter",
+    "MercadoPagoAdapter",
+    "PaymentGatewayBase",
+]
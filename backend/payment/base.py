@@ -1,6 +1,9 @@
 class PaymentGatewayBase:
     """Classe base para gateways de pagamento. Define a interface esperada."""
-    def create_payment(self, amount, currency, **kwargs):
+
+    nome = None
+
+    def create_payment(self, amount, currency="BRL", **kwargs):
         """Cria um pagamento. Deve ser implementado pelas subclasses."""
         raise NotImplementedError
 
@@ -10,4 +13,4 @@ class PaymentGatewayBase:
 
     def handle_webhook(self, data):
         """Trata notificações/webhooks do gateway. Deve ser implementado pelas subclasses."""
-        raise NotImplementedError 
\ No newline at end of file
+        raise NotImplementedError
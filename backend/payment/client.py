@@ -0,0 +1,338 @@
+"""
+Cliente HTTP dos gateways de pagamento.
+
+- Uma requests.Session (pool keep-alive) por (URL base, token): pagamentos
+  seguidos reutilizam a conexão TLS em vez de abrir uma nova a cada chamada.
+- Timeouts de conexão e leitura em toda requisição: um gateway lento não
+  prende o worker eventlet indefinidamente.
+- Repetições com backoff exponencial e jitter apenas para chamadas
+  idempotentes (GET, ou POST com chave de idempotência), em erros de rede,
+  429 e 5xx.
+- Disjuntor (circuit breaker) por gateway: após falhas seguidas as chamadas
+  falham imediatamente por um tempo, sem esperar timeouts.
+
+ClienteHTTPGatewayAsync oferece a mesma interface para asyncio, com aiohttp
+quando instalado e, sem ele, executando o cliente síncrono em uma thread.
+"""
+
+import asyncio
+import json as jsonlib
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - aiohttp é opcional
+    aiohttp = None
+
+TIMEOUT_CONEXAO = 3.05
+TIMEOUT_LEITURA = 10.0
+TENTATIVAS = 3
+ESPERA_BASE = 0.2  # Segundos; dobra a cada tentativa, com jitter
+TAMANHO_POOL = 10
+LIMITE_FALHAS_DISJUNTOR = 5
+TEMPO_ABERTURA_DISJUNTOR = 30.0  # Segundos até deixar passar uma chamada de teste
+STATUS_REPETIVEIS = {429, 500, 502, 503, 504}
+METODOS_IDEMPOTENTES = {"GET", "HEAD", "PUT", "DELETE"}
+CABECALHO_IDEMPOTENCIA = "X-Idempotency-Key"
+
+
+class ErroGateway(Exception):
+    """Falha ao falar com o gateway. `status` é None em erros de rede."""
+
+    def __init__(self, mensagem, status=None, corpo=None):
+        super().__init__(mensagem)
+        self.status = status
+        self.corpo = corpo
+
+
+class CircuitoAberto(ErroGateway):
+    """O disjuntor está aberto: a chamada nem foi enviada ao gateway."""
+
+
+class DisjuntorCircuito:
+    """
+    Disjuntor fechado -> aberto após `limite_falhas` falhas seguidas. Aberto,
+    recusa chamadas até passar `tempo_abertura`; então deixa passar uma
+    chamada de teste (meio aberto) que fecha o circuito se tiver sucesso.
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(
+        self,
+        limite_falhas=LIMITE_FALHAS_DISJUNTOR,
+        tempo_abertura=TEMPO_ABERTURA_DISJUNTOR,
+        relogio=time.monotonic,
+    ):
+        self.limite_falhas = limite_falhas
+        self.tempo_abertura = tempo_abertura
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._falhas = 0
+        self._aberto_em = None
+        self._teste_em_andamento = False
+
+    @property
+    def estado(self):
+        with self._lock:
+            return self._estado()
+
+    def _estado(self):
+        if self._aberto_em is None:
+            return self.FECHADO
+        if self._relogio() - self._aberto_em >= self.tempo_abertura:
+            return self.MEIO_ABERTO
+        return self.ABERTO
+
+    def permitir(self):
+        """True se a chamada pode ser enviada; no meio aberto, só uma por vez."""
+        with self._lock:
+            estado = self._estado()
+            if estado == self.FECHADO:
+                return True
+            if estado == self.MEIO_ABERTO and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return True
+            return False
+
+    def registrar_sucesso(self):
+        with self._lock:
+            self._falhas = 0
+            self._aberto_em = None
+            self._teste_em_andamento = False
+
+    def registrar_falha(self):
+        with self._lock:
+            self._falhas += 1
+            if self._teste_em_andamento or self._falhas >= self.limite_falhas:
+                self._aberto_em = self._relogio()
+            self._teste_em_andamento = False
+
+
+def opcoes_da_configuracao(config):
+    """Parâmetros do cliente a partir da configuração da aplicação."""
+    return {
+        "timeout_conexao": config.get("GATEWAY_TIMEOUT_CONEXAO", TIMEOUT_CONEXAO),
+        "timeout_leitura": config.get("GATEWAY_TIMEOUT_LEITURA", TIMEOUT_LEITURA),
+        "tentativas": config.get("GATEWAY_TENTATIVAS", TENTATIVAS),
+    }
+
+
+def prazo_maximo(
+    timeout_conexao=TIMEOUT_CONEXAO,
+    timeout_leitura=TIMEOUT_LEITURA,
+    tentativas=TENTATIVAS,
+    espera_base=ESPERA_BASE,
+):
+    """
+    Pior duração, em segundos, de uma chamada com repetições: todas as
+    tentativas esgotando os timeouts e as esperas máximas entre elas.
+    """
+    esperas = sum(espera_base * 2**tentativa for tentativa in range(tentativas - 1))
+    return tentativas * (timeout_conexao + timeout_leitura) + esperas
+
+
+def espera_com_jitter(tentativa, espera_base=ESPERA_BASE):
+    """Backoff exponencial com jitter completo para a `tentativa` (0, 1, ...)."""
+    return random.uniform(0, espera_base * 2**tentativa)
+
+
+def pode_repetir(metodo, chave_idempotencia):
+    return metodo.upper() in METODOS_IDEMPOTENTES or chave_idempotencia is not None
+
+
+class ClienteHTTPGateway:
+    """Cliente síncrono com pool por token, timeouts, repetições e disjuntor."""
+
+    _sessoes = {}
+    _disjuntores = {}
+    _lock_sessoes = threading.Lock()
+
+    def __init__(
+        self,
+        url_base,
+        token,
+        timeout_conexao=TIMEOUT_CONEXAO,
+        timeout_leitura=TIMEOUT_LEITURA,
+        tentativas=TENTATIVAS,
+        espera_base=ESPERA_BASE,
+        disjuntor=None,
+        dormir=time.sleep,
+    ):
+        self.url_base = url_base.rstrip("/")
+        self.token = token
+        self.timeout = (timeout_conexao, timeout_leitura)
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.disjuntor = disjuntor or self.disjuntor_para(self.url_base, token)
+        self._dormir = dormir
+
+    @classmethod
+    def disjuntor_para(cls, url_base, token):
+        """Disjuntor compartilhado por todos os clientes do mesmo gateway/token."""
+        with cls._lock_sessoes:
+            return cls._disjuntores.setdefault((url_base, token), DisjuntorCircuito())
+
+    @classmethod
+    def sessao_para(cls, url_base, token):
+        """Sessão compartilhada (pool de conexões) para o par URL base/token."""
+        chave = (url_base, token)
+        with cls._lock_sessoes:
+            sessao = cls._sessoes.get(chave)
+            if sessao is None:
+                sessao = requests.Session()
+                adaptador = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=TAMANHO_POOL, max_retries=0
+                )
+                sessao.mount("http://", adaptador)
+                sessao.mount("https://", adaptador)
+                sessao.headers["Authorization"] = f"Bearer {token}"
+                cls._sessoes[chave] = sessao
+            return sessao
+
+    @classmethod
+    def fechar_sessoes(cls, token=None):
+        """Fecha as sessões (todas, ou só as do `token`, ex.: credencial trocada)."""
+        with cls._lock_sessoes:
+            for chave in [c for c in cls._sessoes if token is None or c[1] == token]:
+                cls._sessoes.pop(chave).close()
+            for chave in [
+                c for c in cls._disjuntores if token is None or c[1] == token
+            ]:
+                del cls._disjuntores[chave]
+
+    @property
+    def sessao(self):
+        return self.sessao_para(self.url_base, self.token)
+
+    def requisitar(self, metodo, caminho, json=None, chave_idempotencia=None):
+        """
+        Envia a requisição e retorna o corpo JSON. Lança CircuitoAberto se o
+        disjuntor estiver aberto e ErroGateway em falha definitiva.
+        """
+        repetir = pode_repetir(metodo, chave_idempotencia)
+        cabecalhos = {}
+        if chave_idempotencia is not None:
+            cabecalhos[CABECALHO_IDEMPOTENCIA] = chave_idempotencia
+        tentativas = self.tentativas if repetir else 1
+        for tentativa in range(tentativas):
+            if not self.disjuntor.permitir():
+                raise CircuitoAberto("Gateway indisponível (circuito aberto)")
+            try:
+                resposta = self.sessao.request(
+                    metodo,
+                    f"{self.url_base}{caminho}",
+                    json=json,
+                    headers=cabecalhos,
+                    timeout=self.timeout,
+                )
+            except requests.RequestException as e:
+                self.disjuntor.registrar_falha()
+                erro = ErroGateway(f"Falha de comunicação com o gateway: {e}")
+            else:
+                if resposta.status_code < 500:
+                    self.disjuntor.registrar_sucesso()
+                else:
+                    self.disjuntor.registrar_falha()
+                if resposta.ok:
+                    return resposta.json() if resposta.content else {}
+                erro = ErroGateway(
+                    f"Gateway respondeu {resposta.status_code}",
+                    status=resposta.status_code,
+                    corpo=resposta.text,
+                )
+                if resposta.status_code not in STATUS_REPETIVEIS:
+                    raise erro
+            if tentativa < tentativas - 1:
+                self._dormir(espera_com_jitter(tentativa, self.espera_base))
+        raise erro
+
+
+class ClienteHTTPGatewayAsync:
+    """
+    Versão asyncio do cliente. Com aiohttp usa uma ClientSession por token
+    (e por event loop); sem aiohttp delega ao cliente síncrono em uma thread.
+    O disjuntor é o mesmo objeto do cliente síncrono correspondente.
+    """
+
+    def __init__(self, url_base, token, **opcoes):
+        self._sincrono = ClienteHTTPGateway(url_base, token, **opcoes)
+        self._sessoes = {}
+
+    @property
+    def disjuntor(self):
+        return self._sincrono.disjuntor
+
+    async def requisitar(self, metodo, caminho, json=None, chave_idempotencia=None):
+        if aiohttp is None:
+            return await asyncio.to_thread(
+                self._sincrono.requisitar,
+                metodo,
+                caminho,
+                json=json,
+                chave_idempotencia=chave_idempotencia,
+            )
+        return await self._requisitar_aiohttp(metodo, caminho, json, chave_idempotencia)
+
+    def _sessao_aiohttp(self):
+        laco = asyncio.get_running_loop()
+        sessao = self._sessoes.get(laco)
+        if sessao is None or sessao.closed:
+            conexao, leitura = self._sincrono.timeout
+            sessao = aiohttp.ClientSession(
+                headers={"Authorization": f"Bearer {self._sincrono.token}"},
+                timeout=aiohttp.ClientTimeout(sock_connect=conexao, sock_read=leitura),
+                connector=aiohttp.TCPConnector(limit=TAMANHO_POOL),
+            )
+            self._sessoes[laco] = sessao
+        return sessao
+
+    async def _requisitar_aiohttp(self, metodo, caminho, json, chave_idempotencia):
+        cliente = self._sincrono
+        repetir = pode_repetir(metodo, chave_idempotencia)
+        cabecalhos = {}
+        if chave_idempotencia is not None:
+            cabecalhos[CABECALHO_IDEMPOTENCIA] = chave_idempotencia
+        tentativas = cliente.tentativas if repetir else 1
+        for tentativa in range(tentativas):
+            if not cliente.disjuntor.permitir():
+                raise CircuitoAberto("Gateway indisponível (circuito aberto)")
+            try:
+                async with self._sessao_aiohttp().request(
+                    metodo,
+                    f"{cliente.url_base}{caminho}",
+                    json=json,
+                    headers=cabecalhos,
+                ) as resposta:
+                    texto = await resposta.text()
+                    status = resposta.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                cliente.disjuntor.registrar_falha()
+                erro = ErroGateway(f"Falha de comunicação com o gateway: {e}")
+            else:
+                if status < 500:
+                    cliente.disjuntor.registrar_sucesso()
+                else:
+                    cliente.disjuntor.registrar_falha()
+                if 200 <= status < 300:
+                    return jsonlib.loads(texto) if texto else {}
+                erro = ErroGateway(
+                    f"Gateway respondeu {status}", status=status, corpo=texto
+                )
+                if status not in STATUS_REPETIVEIS:
+                    raise erro
+            if tentativa < tentativas - 1:
+                await asyncio.sleep(espera_com_jitter(tentativa, cliente.espera_base))
+        raise erro
+
+    async def fechar(self):
+        for sessao in self._sessoes.values():
+            await sessao.close()
+        self._sessoes.clear()
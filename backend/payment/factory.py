@@ -0,0 +1,147 @@
+"""
+Resolução do gateway de pagamento por estabelecimento.
+
+RegistroGateways guarda o adaptador já construído (e, com ele, o pool de
+conexões do token) por estabelecimento durante TTL_GATEWAYS: criar um
+pagamento não consulta credenciais nem constrói cliente a cada chamada. Ao
+trocar a credencial, invalidar() descarta o adaptador e fecha as conexões
+do token antigo.
+
+Os gateways são plugáveis: registrar(nome, construtor) associa um nome
+("mercadopago", ...) a uma função que recebe a credencial e devolve o
+adaptador. A credencial vem de `fonte_credenciais`: por padrão, da
+tabela establishments para o estabelecimento informado, ou da configuração
+da aplicação quando a chamada não indica estabelecimento (instalação com um
+único estabelecimento).
+"""
+
+import threading
+import time
+
+from flask import current_app
+
+from database import db
+from models import Establishment
+from payment.client import ClienteHTTPGateway, ErroGateway, opcoes_da_configuracao
+from payment.mp_adapter import MercadoPagoAdapter
+
+TTL_GATEWAYS = 300.0  # Segundos até reler a credencial do estabelecimento
+
+
+class GatewayNaoConfigurado(ErroGateway):
+    """Não há credencial (ou gateway registrado) para o estabelecimento."""
+
+
+def credenciais_da_configuracao():
+    """
+    Credencial da instalação a partir da configuração: {"gateway", "token",
+    "url_base", "opcoes"}.
+    """
+    config = current_app.config
+    return {
+        "gateway": config.get("GATEWAY_PAGAMENTO", "mercadopago"),
+        "token": config.get("MERCADOPAGO_ACCESS_TOKEN"),
+        "url_base": config.get("MERCADOPAGO_URL_BASE"),
+        "opcoes": opcoes_da_configuracao(config),
+    }
+
+
+def credenciais_do_estabelecimento(estabelecimento_id=None):
+    """
+    Credencial do estabelecimento `estabelecimento_id` lida de establishments
+    (None se não existe); sem id, a da configuração. URL e opções do cliente
+    HTTP vêm sempre da configuração.
+    """
+    credencial = credenciais_da_configuracao()
+    if estabelecimento_id is None:
+        return credencial
+    estabelecimento = db.session.get(Establishment, estabelecimento_id)
+    if estabelecimento is None:
+        return None
+    return {
+        **credencial,
+        "gateway": estabelecimento.payment_gateway,
+        "token": estabelecimento.mp_access_token,
+    }
+
+
+def _construir_mercadopago(credencial):
+    return MercadoPagoAdapter(
+        credencial["token"], url_base=credencial["url_base"], **credencial["opcoes"]
+    )
+
+
+class RegistroGateways:
+    """Construtores de gateway por nome e adaptadores em cache por estabelecimento."""
+
+    def __init__(self, ttl=TTL_GATEWAYS, relogio=time.monotonic):
+        self.ttl = ttl
+        self.fonte_credenciais = credenciais_do_estabelecimento
+        self._relogio = relogio
+        self._construtores = {}
+        self._adaptadores = {}  # estabelecimento_id -> (adaptador, token, expira_em)
+        self._lock = threading.Lock()
+
+    def registrar(self, nome, construtor):
+        """Associa `nome` a construtor(credencial) -> adaptador."""
+        self._construtores[nome] = construtor
+
+    @property
+    def nomes(self):
+        return tuple(self._construtores)
+
+    def obter(self, estabelecimento_id=None):
+        """Adaptador do estabelecimento; só consulta a credencial se expirou."""
+        agora = self._relogio()
+        with self._lock:
+            entrada = self._adaptadores.get(estabelecimento_id)
+        if entrada is not None and entrada[2] > agora:
+            return entrada[0]
+        credencial = self.fonte_credenciais(estabelecimento_id)
+        if not credencial or not credencial.get("token"):
+            raise GatewayNaoConfigurado("Gateway de pagamento não configurado")
+        construtor = self._construtores.get(credencial.get("gateway"))
+        if construtor is None:
+            raise GatewayNaoConfigurado(
+                f"Gateway desconhecido: {credencial.get('gateway')}"
+            )
+        adaptador = construtor(credencial)
+        with self._lock:
+            self._adaptadores[estabelecimento_id] = (
+                adaptador,
+                credencial["token"],
+                agora + self.ttl,
+            )
+        if entrada is not None and entrada[1] != credencial["token"]:
+            # Credencial trocada: as conexões do token antigo não servem mais
+            self._fechar_sem_uso([entrada[1]])
+        return adaptador
+
+    def _fechar_sem_uso(self, tokens):
+        with self._lock:
+            em_uso = {token for _, token, _ in self._adaptadores.values()}
+        for token in set(tokens) - em_uso:
+            ClienteHTTPGateway.fechar_sessoes(token)
+
+    def invalidar(self, estabelecimento_id=None):
+        """
+        Descarta o adaptador do estabelecimento (ou todos, sem argumento) e fecha
+        as conexões da credencial antiga. Chamar ao trocar a credencial.
+        """
+        with self._lock:
+            if estabelecimento_id is None:
+                removidos = list(self._adaptadores.values())
+                self._adaptadores.clear()
+            else:
+                entrada = self._adaptadores.pop(estabelecimento_id, None)
+                removidos = [entrada] if entrada else []
+        self._fechar_sem_uso([token for _, token, _ in removidos])
+
+
+gateways = RegistroGateways()
+gateways.registrar("mercadopago", _construir_mercadopago)
+
+
+def get_establishment_gateway(estabelecimento_id=None):
+    """Adaptador do gateway do estabelecimento, via cache do registro."""
+    return gateways.obter(estabelecimento_id)
@@ -0,0 +1,124 @@
+"""
+Conta do pedido: saldo, pagamentos parciais e divisão.
+
+Um pedido recebe vários pagamentos. Pedido.valor_pago acumula os aprovados
+(incrementado na confirmação, em settlement.confirmar_pagamento), então o
+saldo é total - valor_pago sem somar os pagamentos a cada leitura. Só a
+parte ainda pendente (PIX aguardando confirmação) é somada, e apenas ao
+registrar um novo pagamento, para não cobrar duas vezes o mesmo saldo.
+
+As divisões apenas calculam quanto cabe a cada parte; cada parte é paga
+depois com um pagamento comum do valor indicado. A divisão igual reparte o
+que ainda está disponível (saldo menos PIX pendentes); a divisão por itens
+só vale antes do primeiro pagamento e usa o preço gravado em cada linha,
+não o do cardápio atual.
+"""
+
+from sqlalchemy import func, select
+
+from database import db
+from models import Item, Pagamento, PedidoItem
+from models.pagamento import STATUS_PENDENTE
+from totals import CENTAVO, ZERO, arredondar
+
+PARTES_MAXIMO_DIVISAO = 50
+
+
+def valor_pendente(pedido_id):
+    """Soma dos pagamentos do pedido aguardando confirmação do gateway."""
+    return arredondar(
+        db.session.scalar(
+            select(func.coalesce(func.sum(Pagamento.valor), 0)).where(
+                Pagamento.pedido_id == pedido_id,
+                Pagamento.status == STATUS_PENDENTE,
+            )
+        )
+    )
+
+
+def valor_disponivel(pedido):
+    """Saldo que ainda pode receber novos pagamentos (sem os PIX pendentes)."""
+    return pedido.saldo - valor_pendente(pedido.pedido_id)
+
+
+def valor_a_receber(pedido, valor=None):
+    """
+    Valor de um novo pagamento do pedido (padrão: todo o saldo em aberto).
+    Lança ValueError se o pedido já está quitado ou se o valor excede o saldo.
+    """
+    disponivel = valor_disponivel(pedido)
+    if disponivel <= ZERO:
+        if pedido.saldo <= ZERO:
+            raise ValueError("Pedido já está quitado")
+        raise ValueError("O saldo do pedido aguarda confirmação de pagamentos")
+    valor = disponivel if valor is None else arredondar(valor)
+    if valor <= ZERO or valor > disponivel:
+        raise ValueError(f"valor deve estar entre 0.01 e {disponivel}")
+    return valor
+
+
+def dividir_igualmente(valor, partes):
+    """Divide `valor` em `partes` quase iguais; os centavos restantes vão às primeiras."""
+    if not isinstance(partes, int) or not 1 <= partes <= PARTES_MAXIMO_DIVISAO:
+        raise ValueError(
+            f"partes deve ser um inteiro entre 1 e {PARTES_MAXIMO_DIVISAO}"
+        )
+    if arredondar(valor) <= ZERO:
+        raise ValueError("Não há saldo a dividir")
+    centavos = int(arredondar(valor) / CENTAVO)
+    base, resto = divmod(centavos, partes)
+    return [(base + (1 if i < resto else 0)) * CENTAVO for i in range(partes)]
+
+
+def dividir_por_itens(pedido, grupos):
+    """
+    Valor de cada grupo de itens ([{item_id, quantidade}], um grupo por pessoa),
+    com desconto e taxa de serviço rateados pelo valor dos itens. Retorna
+    (partes, restante): `restante` cobre itens não atribuídos e arredondamentos.
+    Lança ValueError se o pedido já recebeu pagamentos (aprovados ou pendentes).
+    """
+    if arredondar(pedido.valor_pago or 0) > ZERO or valor_pendente(pedido.pedido_id):
+        raise ValueError(
+            "Pedido já tem pagamentos: divida o saldo restante em partes iguais"
+        )
+    linhas = {
+        item_id: (quantidade, arredondar(preco))
+        for item_id, quantidade, preco in db.session.execute(
+            select(
+                PedidoItem.item_id,
+                PedidoItem.quantidade,
+                func.coalesce(PedidoItem.preco_unitario, Item.preco),
+            )
+            .outerjoin(Item, Item.item_id == PedidoItem.item_id)
+            .where(PedidoItem.pedido_id == pedido.pedido_id)
+        )
+    }
+    subtotal = arredondar(pedido.subtotal or 0)
+    atribuidos = {}
+    valores = []
+    for grupo in grupos:
+        if not isinstance(grupo, list) or not grupo:
+            raise ValueError("Cada grupo deve ser uma lista de itens")
+        valor = ZERO
+        for entrada in grupo:
+            item_id = entrada.get("item_id") if isinstance(entrada, dict) else None
+            quantidade = entrada.get("quantidade", 1) if item_id is not None else 0
+            if item_id not in linhas:
+                raise ValueError(f"Item {item_id} não está no pedido")
+            if not isinstance(quantidade, int) or quantidade < 1:
+                raise ValueError("quantidade deve ser um inteiro positivo")
+            atribuidos[item_id] = atribuidos.get(item_id, 0) + quantidade
+            if atribuidos[item_id] > linhas[item_id][0]:
+                raise ValueError(f"Item {item_id} atribuído além da quantidade pedida")
+            valor += linhas[item_id][1] * quantidade
+        valores.append(valor)
+    total = arredondar(pedido.total or 0)
+    partes = [
+        arredondar(total * valor / subtotal) if subtotal else ZERO for valor in valores
+    ]
+    restante = total - sum(partes, ZERO)
+    if partes and all(atribuidos.get(i, 0) == q for i, (q, _) in linhas.items()):
+        # Todos os itens atribuídos: o arredondamento fica com a última parte
+        partes[-1] += restante
+        restante = ZERO
+    return partes, restante
@@ -0,0 +1,207 @@
+"""
+Adaptador do Mercado Pago (API /v1/payments).
+
+MercadoPagoAdapter usa o cliente HTTP síncrono (pool por token, timeouts,
+repetições e disjuntor); AsyncMercadoPagoAdapter expõe os mesmos métodos
+como corrotinas, para reconciliações que consultam muitos pagamentos de uma
+vez. Erros do gateway sobem como ErroGateway/CircuitoAberto.
+"""
+
+from payment.base import PaymentGatewayBase
+from payment.client import ClienteHTTPGateway, ClienteHTTPGatewayAsync
+
+URL_BASE_MERCADOPAGO = "https://api.mercadopago.com"
+# Status do Mercado Pago que encerram o pagamento
+STATUS_APROVADO = "approved"
+STATUS_FINAIS = {"approved", "rejected", "cancelled", "refunded", "charged_back"}
+# A conta do Mercado Pago recebe apenas em reais
+MOEDA_MERCADOPAGO = "BRL"
+
+
+def _corpo_pagamento(amount, currency, opcoes):
+    """Corpo do POST /v1/payments a partir dos parâmetros de create_payment."""
+    if currency != MOEDA_MERCADOPAGO:
+        raise ValueError(f"Moeda não suportada pelo Mercado Pago: {currency}")
+    pagador = {"email": opcoes.get("payer_email")}
+    for campo, chave in (("first_name", "payer_name"), ("last_name", "payer_lastname")):
+        if opcoes.get(chave):
+            pagador[campo] = opcoes[chave]
+    corpo = {
+        "transaction_amount": round(float(amount), 2),
+        "description": opcoes.get("description") or "Pagamento de comanda",
+        "payment_method_id": opcoes.get("payment_method_id", "pix"),
+        "payer": pagador,
+        "external_reference": str(opcoes.get("external_reference", "")),
+    }
+    if opcoes.get("card_token"):
+        corpo["token"] = opcoes["card_token"]
+        corpo["installments"] = int(opcoes.get("installments") or 1)
+    if opcoes.get("notification_url"):
+        corpo["notification_url"] = opcoes["notification_url"]
+    return corpo
+
+
+def _opcoes_pix(descricao, email_pagador, referencia_externa, url_notificacao):
+    return {
+        "payment_method_id": "pix",
+        "description": descricao,
+        "payer_email": email_pagador,
+        "external_reference": referencia_externa,
+        "notification_url": url_notificacao,
+    }
+
+
+def _opcoes_cartao(card_token, installments, description, opcoes):
+    return {
+        "payment_method_id": "credit_card",
+        **opcoes,
+        "description": description,
+        "card_token": card_token,
+        "installments": installments,
+    }
+
+
+def resumir_pagamento(dados):
+    """Campos do pagamento do Mercado Pago usados pelo sistema."""
+    transacao = (dados.get("point_of_interaction") or {}).get("transaction_data") or {}
+    return {
+        "gateway_id": str(dados["id"]),
+        "status": dados.get("status"),
+        "valor": dados.get("transaction_amount"),
+        "referencia_externa": dados.get("external_reference"),
+        "qr_code": transacao.get("qr_code"),
+        "qr_code_base64": transacao.get("qr_code_base64"),
+    }
+
+
+class MercadoPagoAdapter(PaymentGatewayBase):
+    """Pagamentos PIX e cartão no Mercado Pago."""
+
+    nome = "mercadopago"
+
+    def __init__(self, access_token, url_base=URL_BASE_MERCADOPAGO, **opcoes_cliente):
+        self.cliente = ClienteHTTPGateway(url_base, access_token, **opcoes_cliente)
+
+    def create_payment(
+        self, amount, currency=MOEDA_MERCADOPAGO, chave_idempotencia=None, **kwargs
+    ):
+        """
+        Cria um pagamento (payment_method_id, description, payer_email,
+        external_reference, notification_url, card_token, installments em
+        kwargs). Com `chave_idempotencia` o POST pode ser repetido com segurança
+        em falhas de rede (o gateway não cobra duas vezes).
+        """
+        dados = self.cliente.requisitar(
+            "POST",
+            "/v1/payments",
+            json=_corpo_pagamento(amount, currency, kwargs),
+            chave_idempotencia=chave_idempotencia,
+        )
+        return resumir_pagamento(dados)
+
+    def create_pix_payment(
+        self,
+        valor,
+        descricao,
+        email_pagador,
+        referencia_externa,
+        chave_idempotencia=None,
+        url_notificacao=None,
+    ):
+        """Cria uma cobrança PIX; o QR code vem no resumo retornado."""
+        return self.create_payment(
+            valor,
+            chave_idempotencia=chave_idempotencia,
+            **_opcoes_pix(
+                descricao, email_pagador, referencia_externa, url_notificacao
+            ),
+        )
+
+    def create_credit_card_payment(
+        self, amount, card_token, installments=1, description="", **kwargs
+    ):
+        """Cria um pagamento com o cartão tokenizado no front (`card_token`)."""
+        return self.create_payment(
+            amount, **_opcoes_cartao(card_token, installments, description, kwargs)
+        )
+
+    def get_payment(self, gateway_id):
+        return resumir_pagamento(
+            self.cliente.requisitar("GET", f"/v1/payments/{gateway_id}")
+        )
+
+    def get_payment_status(self, gateway_id):
+        return self.get_payment(gateway_id)["status"]
+
+    def handle_webhook(self, data):
+        """
+        Interpreta uma notificação do Mercado Pago; para notificações de
+        pagamento consulta o status atual no gateway (o corpo não o traz).
+        """
+        if not isinstance(data, dict) or "type" not in data or "data" not in data:
+            return {"status": "error", "message": "Formato de webhook inválido"}
+        tipo = data["type"]
+        gateway_id = (data["data"] or {}).get("id")
+        if tipo == "payment" and gateway_id:
+            return {
+                "status": "processed",
+                "notification_type": tipo,
+                "payment_id": str(gateway_id),
+                "payment_status": self.get_payment_status(gateway_id),
+            }
+        return {"status": "processed", "notification_type": tipo, "data": data}
+
+
+class AsyncMercadoPagoAdapter:
+    """Versão asyncio do MercadoPagoAdapter."""
+
+    nome = "mercadopago"
+
+    def __init__(self, access_token, url_base=URL_BASE_MERCADOPAGO, **opcoes_cliente):
+        self.cliente = ClienteHTTPGatewayAsync(url_base, access_token, **opcoes_cliente)
+
+    async def create_payment(
+        self, amount, currency=MOEDA_MERCADOPAGO, chave_idempotencia=None, **kwargs
+    ):
+        dados = await self.cliente.requisitar(
+            "POST",
+            "/v1/payments",
+            json=_corpo_pagamento(amount, currency, kwargs),
+            chave_idempotencia=chave_idempotencia,
+        )
+        return resumir_pagamento(dados)
+
+    async def create_pix_payment(
+        self,
+        valor,
+        descricao,
+        email_pagador,
+        referencia_externa,
+        chave_idempotencia=None,
+        url_notificacao=None,
+    ):
+        return await self.create_payment(
+            valor,
+            chave_idempotencia=chave_idempotencia,
+            **_opcoes_pix(
+                descricao, email_pagador, referencia_externa, url_notificacao
+            ),
+        )
+
+    async def create_credit_card_payment(
+        self, amount, card_token, installments=1, description="", **kwargs
+    ):
+        return await self.create_payment(
+            amount, **_opcoes_cartao(card_token, installments, description, kwargs)
+        )
+
+    async def get_payment(self, gateway_id):
+        return resumir_pagamento(
+            await self.cliente.requisitar("GET", f"/v1/payments/{gateway_id}")
+        )
+
+    async def get_payment_status(self, gateway_id):
+        return (await self.get_payment(gateway_id))["status"]
+
+    async def fechar(self):
+        await self.cliente.fechar()
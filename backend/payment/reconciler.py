@@ -0,0 +1,155 @@
+"""
+Reconciliação dos pagamentos PIX pendentes.
+
+Se o webhook se perde, o pagamento ficaria pendente (e a mesa ocupada)
+indefinidamente. O reconciliador consulta no gateway os pendentes cuja
+`proxima_consulta` venceu, com intervalo adaptativo: a primeira consulta
+sai poucos segundos após a cobrança (o cliente costuma pagar logo) e as
+seguintes dobram o intervalo até INTERVALO_MAXIMO_CONSULTA.
+
+Cada ciclo reserva um lote: as linhas são lidas com SKIP LOCKED e a
+próxima consulta é reagendada e gravada antes das chamadas HTTP. Assim
+vários processos reconciliam em paralelo sem consultar o mesmo pagamento,
+e nenhuma transação fica aberta durante o HTTP. As consultas do lote usam
+no máximo CONSULTAS_SIMULTANEAS conexões; com o lote cheio o próximo ciclo
+começa em seguida.
+
+Roda em um processo próprio com `flask reconciliar-pix` (o serviço
+`reconciliador` do docker-compose). RECONCILIACAO_PIX_AUTOMATICA=1 o inicia
+dentro do processo web, útil em desenvolvimento com um único worker.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from database import db
+from models import Pagamento
+from models.pagamento import STATUS_PENDENTE
+from payment.client import ErroGateway
+from payment.settlement import aplicar_status
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_INICIAL_CONSULTA = 5.0  # Segundos
+FATOR_INTERVALO_CONSULTA = 2
+INTERVALO_MAXIMO_CONSULTA = 300.0
+TAMANHO_LOTE_RECONCILIACAO = 100
+CONSULTAS_SIMULTANEAS = 8
+# Segundos entre ciclos quando não há pagamentos com consulta vencida
+INTERVALO_VARREDURA_PENDENTES = 1.0
+
+
+def intervalo_consulta(consultas):
+    """Segundos até a próxima consulta, após `consultas` consultas já feitas."""
+    return min(
+        INTERVALO_INICIAL_CONSULTA * FATOR_INTERVALO_CONSULTA**consultas,
+        INTERVALO_MAXIMO_CONSULTA,
+    )
+
+
+def agendar_primeira_consulta(pagamento, agora=None):
+    """Chamado ao criar a cobrança no gateway."""
+    agora = agora or datetime.utcnow()
+    pagamento.consultas_gateway = 0
+    pagamento.proxima_consulta = agora + timedelta(seconds=intervalo_consulta(0))
+
+
+def reservar_lote(agora, tamanho=TAMANHO_LOTE_RECONCILIACAO):
+    """
+    Reagenda e grava (commit) até `tamanho` pendentes com consulta vencida.
+    Retorna [(pagamento_id, gateway_id)] reservados para este processo.
+    """
+    pagamentos = (
+        Pagamento.query.filter(
+            Pagamento.status == STATUS_PENDENTE,
+            Pagamento.proxima_consulta <= agora,
+            Pagamento.gateway_id.isnot(None),
+        )
+        .order_by(Pagamento.proxima_consulta)
+        .limit(tamanho)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for pagamento in pagamentos:
+        pagamento.consultas_gateway += 1
+        pagamento.proxima_consulta = agora + timedelta(
+            seconds=intervalo_consulta(pagamento.consultas_gateway)
+        )
+    reservados = [(p.pagamento_id, p.gateway_id) for p in pagamentos]
+    db.session.commit()
+    return reservados
+
+
+def consultar_status(gateway, gateway_ids, simultaneas=CONSULTAS_SIMULTANEAS):
+    """{gateway_id: status} consultando até `simultaneas` por vez; falhas ficam de fora."""
+
+    def consultar(gateway_id):
+        try:
+            return gateway_id, gateway.get_payment_status(gateway_id)
+        except ErroGateway as e:
+            logger.warning("Falha ao consultar pagamento %s: %s", gateway_id, e)
+            return gateway_id, None
+
+    with ThreadPoolExecutor(max_workers=min(simultaneas, len(gateway_ids))) as pool:
+        return {
+            gateway_id: status
+            for gateway_id, status in pool.map(consultar, gateway_ids)
+            if status is not None
+        }
+
+
+def reconciliar_lote(
+    obter_gateway,
+    agora=None,
+    tamanho=TAMANHO_LOTE_RECONCILIACAO,
+    simultaneas=CONSULTAS_SIMULTANEAS,
+):
+    """
+    Um ciclo de reconciliação (requer contexto da aplicação). Retorna quantos
+    pagamentos foram consultados.
+    """
+    reservados = reservar_lote(agora or datetime.utcnow(), tamanho)
+    if not reservados:
+        return 0
+    status = consultar_status(
+        obter_gateway(), [gateway_id for _, gateway_id in reservados], simultaneas
+    )
+    if status:
+        for pagamento in Pagamento.query.filter(
+            Pagamento.pagamento_id.in_([pagamento_id for pagamento_id, _ in reservados])
+        ):
+            if pagamento.gateway_id in status:
+                aplicar_status(pagamento, status[pagamento.gateway_id])
+        db.session.commit()
+    return len(reservados)
+
+
+class ReconciliadorPix:
+    """Tarefa de segundo plano que reconcilia os pendentes continuamente."""
+
+    def __init__(self):
+        self._ativo = False
+
+    def iniciar(self, app, socketio):
+        if self._ativo:
+            return
+        self._ativo = True
+        socketio.start_background_task(self.executar, app, socketio.sleep)
+
+    def executar(self, app, dormir):
+        from payment.factory import get_establishment_gateway
+
+        while True:
+            with app.app_context():
+                try:
+                    consultados = reconciliar_lote(get_establishment_gateway)
+                except Exception:
+                    db.session.rollback()
+                    consultados = 0
+                    logger.exception("Falha ao reconciliar pagamentos pendentes")
+            if consultados < TAMANHO_LOTE_RECONCILIACAO:
+                dormir(INTERVALO_VARREDURA_PENDENTES)
+
+
+reconciliador = ReconciliadorPix()
@@ -0,0 +1,141 @@
+"""
+Efeitos de um pagamento confirmado e tradução dos status do gateway.
+
+O caixa confirma pagamentos na hora; pagamentos via gateway (PIX) ficam
+pendentes até o webhook ou a reconciliação trazerem o status final. Nos
+dois casos a confirmação passa por confirmar_pagamento, na mesma transação:
+valor abatido do saldo do pedido, resumo do dia e evento
+pagamento_recebido; quando o saldo zera, pedido pago e mesa liberada. Um
+estorno desfaz os mesmos efeitos em estornar_pagamento.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from database import db
+from models import Pagamento, Pedido
+from models.pagamento import (
+    STATUS_APROVADO,
+    STATUS_CANCELADO,
+    STATUS_ESTORNADO,
+    STATUS_PENDENTE,
+    STATUS_RECUSADO,
+)
+from outbox import registrar_evento
+from rollups import registrar_estorno, registrar_pagamento
+from totals import arredondar
+
+
+# Status do Mercado Pago -> status local; desconhecidos contam como pendentes
+STATUS_GATEWAY = {
+    "pending": STATUS_PENDENTE,
+    "authorized": STATUS_PENDENTE,
+    "in_process": STATUS_PENDENTE,
+    "in_mediation": STATUS_PENDENTE,
+    "approved": STATUS_APROVADO,
+    "rejected": STATUS_RECUSADO,
+    "cancelled": STATUS_CANCELADO,
+    "refunded": STATUS_ESTORNADO,
+    "charged_back": STATUS_ESTORNADO,
+}
+
+
+def status_local(status_gateway):
+    return STATUS_GATEWAY.get(status_gateway, STATUS_PENDENTE)
+
+
+def travar_pedido(pedido_id):
+    """Pedido relido com FOR UPDATE: pagamentos simultâneos abatem o saldo em série."""
+    return db.session.get(
+        Pedido, pedido_id, with_for_update=True, populate_existing=True
+    )
+
+
+def confirmar_pagamento(pagamento):
+    """
+    Abate o pagamento do saldo do pedido e registra o recebimento; com o saldo
+    zerado, marca o pedido como pago e libera a mesa. Sem commit.
+    """
+    from routes.payment import STATUS_PEDIDO_PAGO, liberar_mesa
+
+    pagamento.status = STATUS_APROVADO
+    pagamento.data_hora = datetime.utcnow()
+    db.session.flush()
+    pedido = travar_pedido(pagamento.pedido_id)
+    pedido.valor_pago = arredondar(pedido.valor_pago or 0) + arredondar(pagamento.valor)
+    registrar_pagamento(pagamento.data_hora.date(), pagamento.valor)
+    if pedido.saldo <= 0:
+        pedido.status = STATUS_PEDIDO_PAGO
+        liberar_mesa(pedido.cliente)
+    registrar_evento(
+        "pagamento_recebido",
+        dados={
+            "pagamento": {**pagamento.to_dict(), "saldo_pedido": float(pedido.saldo)},
+            "mesa": pedido.cliente.mesa if pedido.cliente else None,
+        },
+    )
+
+
+def estornar_pagamento(pagamento):
+    """
+    Devolve ao saldo do pedido um pagamento aprovado que foi estornado e o
+    retira do resumo do dia; se o pedido estava pago, volta a aguardar
+    pagamento e a mesa volta a ficar ocupada. Sem commit.
+    """
+    from routes.payment import (
+        STATUS_PEDIDO_AGUARDANDO_PAGAMENTO,
+        STATUS_PEDIDO_PAGO,
+        ocupar_mesa,
+    )
+
+    pedido = travar_pedido(pagamento.pedido_id)
+    pedido.valor_pago = arredondar(pedido.valor_pago or 0) - arredondar(pagamento.valor)
+    registrar_estorno(pagamento.data_hora.date(), pagamento.valor)
+    if pedido.saldo > 0 and pedido.status == STATUS_PEDIDO_PAGO:
+        pedido.status = STATUS_PEDIDO_AGUARDANDO_PAGAMENTO
+        ocupar_mesa(pedido.cliente)
+        registrar_evento("pedido_atualizado", pedido_id=pedido.pedido_id)
+
+
+def aplicar_status(pagamento, status_gateway):
+    """
+    Aplica ao pagamento o status informado pelo gateway. Idempotente: repetir
+    o mesmo status (webhook reenviado) não muda nada. Retorna True se mudou.
+    """
+    novo = status_local(status_gateway)
+    if novo == pagamento.status or novo == STATUS_PENDENTE:
+        return False
+    # De um status final só se sai por estorno
+    if pagamento.status != STATUS_PENDENTE and novo != STATUS_ESTORNADO:
+        return False
+    anterior = pagamento.status
+    if not _transicionar(pagamento, novo):
+        return False
+    if novo == STATUS_APROVADO:
+        confirmar_pagamento(pagamento)
+    elif anterior == STATUS_APROVADO:
+        estornar_pagamento(pagamento)
+    return True
+
+
+def _transicionar(pagamento, novo):
+    """
+    UPDATE condicional ao status lido: se o webhook e a reconciliação tratam o
+    mesmo pagamento ao mesmo tempo, só um deles aplica os efeitos.
+    """
+    resultado = db.session.execute(
+        update(Pagamento)
+        .where(
+            Pagamento.pagamento_id == pagamento.pagamento_id,
+            Pagamento.status == pagamento.status,
+        )
+        .values(status=novo)
+        .execution_options(synchronize_session=False)
+    )
+    if resultado.rowcount != 1:
+        db.session.refresh(pagamento)
+        return False
+    set_committed_value(pagamento, "status", novo)
+    return True
@@ -0,0 +1,303 @@
+"""
+Fila de notificações (webhooks) do gateway de pagamento.
+
+A rota do webhook só valida e enfileira a notificação, em O(1): a consulta
+do status ao gateway (HTTP de saída) sai do caminho da requisição. O
+gateway reenvia a mesma notificação várias vezes, então a fila ignora
+(tipo, id) já vistos dentro de TTL_DEDUPLICACAO. Um pool de workers em
+segundo plano retira as notificações em lotes e, como o reconciliador,
+consulta os status no gateway sem transação aberta; depois relê os
+pagamentos do lote com uma consulta e aplica tudo em uma transação curta,
+de modo que os FOR UPDATE de aplicar_status não esperam pelo HTTP.
+
+Uma notificação cujo pagamento continua pendente (ou cuja consulta falhou)
+sai do conjunto de vistos, para que o próximo reenvio seja processado.
+
+Com REDIS_URL configurado a fila (uma lista) e os vistos (chaves com SET NX
+EX) ficam no Redis, compartilhados pelos workers do gunicorn: um reenvio que
+cai em outro worker continua deduplicado e nenhuma notificação se perde com
+o reinício de um processo. Sem ele cada processo mantém os seus em memória.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import select
+
+from database import db
+from models import Pagamento
+from payment.reconciler import consultar_status
+from payment.settlement import STATUS_PENDENTE, aplicar_status
+
+logger = logging.getLogger(__name__)
+
+TIPOS_SUPORTADOS = {"payment"}
+TTL_DEDUPLICACAO = 600.0  # Segundos
+CAPACIDADE_FILA_WEBHOOKS = 10000
+TAMANHO_LOTE_WEBHOOKS = 50
+WORKERS_WEBHOOKS = 4
+INTERVALO_OCIOSO = 0.1  # Segundos entre verificações com a fila vazia
+
+
+class FilaCheia(Exception):
+    """A fila atingiu a capacidade; o gateway deve reenviar mais tarde."""
+
+
+class ConjuntoTTL:
+    """
+    Conjunto cujas chaves expiram após `ttl` segundos. Como todas têm o mesmo
+    TTL, a ordem de inserção é a ordem de expiração e a limpeza só olha o início.
+    """
+
+    def __init__(self, ttl, relogio=time.monotonic):
+        self.ttl = ttl
+        self._relogio = relogio
+        self._expira_em = OrderedDict()
+
+    def _expirar(self, agora):
+        while self._expira_em:
+            chave, expira_em = next(iter(self._expira_em.items()))
+            if expira_em > agora:
+                break
+            del self._expira_em[chave]
+
+    def adicionar(self, chave):
+        """Adiciona a chave; False se ela já estava presente (e não expirada)."""
+        agora = self._relogio()
+        self._expirar(agora)
+        if chave in self._expira_em:
+            return False
+        self._expira_em[chave] = agora + self.ttl
+        return True
+
+    def descartar(self, chave):
+        self._expira_em.pop(chave, None)
+
+    def limpar(self):
+        self._expira_em.clear()
+
+    def __contains__(self, chave):
+        self._expirar(self._relogio())
+        return chave in self._expira_em
+
+    def __len__(self):
+        return len(self._expira_em)
+
+
+def assinatura_valida(segredo, assinatura, id_requisicao, recurso_id):
+    """
+    Valida o cabeçalho x-signature do Mercado Pago ("ts=...,v1=..."): HMAC-SHA256
+    de "id:<data.id>;request-id:<x-request-id>;ts:<ts>;" com o segredo do webhook.
+    """
+    partes = dict(
+        parte.strip().split("=", 1)
+        for parte in (assinatura or "").split(",")
+        if "=" in parte
+    )
+    if "ts" not in partes or "v1" not in partes:
+        return False
+    manifesto = f"id:{str(recurso_id).lower()};"
+    if id_requisicao:
+        manifesto += f"request-id:{id_requisicao};"
+    manifesto += f"ts:{partes['ts']};"
+    esperado = hmac.new(
+        segredo.encode(), manifesto.encode(), hashlib.sha256
+    ).hexdigest()
+    return hmac.compare_digest(esperado, partes["v1"])
+
+
+class ArmazenamentoFilaMemoria:
+    """Fila e vistos locais ao processo (fallback sem Redis)."""
+
+    def __init__(self, capacidade, ttl):
+        self.capacidade = capacidade
+        self._fila = queue.Queue(maxsize=capacidade)
+        self._vistos = ConjuntoTTL(ttl)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._fila.qsize()
+
+    def marcar(self, chave):
+        with self._lock:
+            return self._vistos.adicionar(chave)
+
+    def esquecer(self, chaves):
+        with self._lock:
+            for chave in chaves:
+                self._vistos.descartar(chave)
+
+    def empurrar(self, chave):
+        try:
+            self._fila.put_nowait(chave)
+        except queue.Full:
+            raise FilaCheia("Fila de webhooks cheia")
+
+    def retirar(self, tamanho):
+        lote = []
+        while len(lote) < tamanho:
+            try:
+                lote.append(self._fila.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def limpar(self):
+        self.retirar(self.capacidade)
+        with self._lock:
+            self._vistos.limpar()
+
+
+class ArmazenamentoFilaRedis:
+    """
+    Fila e vistos compartilhados entre workers. A fila é uma lista (RPUSH na
+    entrada, LPOP em lote na saída) e cada chave vista é uma string com TTL
+    criada com SET NX EX, que deduplica sem ler antes de escrever.
+    """
+
+    def __init__(self, cliente, capacidade, ttl, prefixo="comandas:webhooks"):
+        self.capacidade = capacidade
+        self._cliente = cliente
+        self._ttl = max(1, int(ttl))
+        self._chave_fila = f"{prefixo}:fila"
+        self._prefixo_visto = f"{prefixo}:visto:"
+
+    def __len__(self):
+        return int(self._cliente.llen(self._chave_fila))
+
+    def _chave_visto(self, chave):
+        tipo, recurso_id = chave
+        return f"{self._prefixo_visto}{tipo}:{recurso_id}"
+
+    def marcar(self, chave):
+        return bool(
+            self._cliente.set(self._chave_visto(chave), 1, nx=True, ex=self._ttl)
+        )
+
+    def esquecer(self, chaves):
+        if chaves:
+            self._cliente.delete(*(self._chave_visto(chave) for chave in chaves))
+
+    def empurrar(self, chave):
+        membro = json.dumps(list(chave))
+        if self._cliente.rpush(self._chave_fila, membro) > self.capacidade:
+            # Passou da capacidade: desfaz a inserção (a mais recente, no fim)
+            self._cliente.lrem(self._chave_fila, -1, membro)
+            raise FilaCheia("Fila de webhooks cheia")
+
+    def retirar(self, tamanho):
+        membros = self._cliente.lpop(self._chave_fila, tamanho) or []
+        return [tuple(json.loads(membro)) for membro in membros]
+
+    def limpar(self):
+        self._cliente.delete(self._chave_fila)
+        vistos = list(self._cliente.scan_iter(match=f"{self._prefixo_visto}*"))
+        if vistos:
+            self._cliente.delete(*vistos)
+
+
+class FilaWebhooks:
+    """Fila limitada com deduplicação por (tipo, id) e pool de workers."""
+
+    def __init__(self, capacidade=CAPACIDADE_FILA_WEBHOOKS, ttl=TTL_DEDUPLICACAO):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self._armazenamento = ArmazenamentoFilaMemoria(capacidade, ttl)
+        self._ativo = False
+
+    def init_app(self, app):
+        url = app.config.get("REDIS_URL")
+        if url:
+            import redis
+
+            self._armazenamento = ArmazenamentoFilaRedis(
+                redis.Redis.from_url(url), self.capacidade, self.ttl
+            )
+
+    def __len__(self):
+        return len(self._armazenamento)
+
+    def limpar(self):
+        """Descarta as notificações enfileiradas e as chaves já vistas."""
+        self._armazenamento.limpar()
+
+    def enfileirar(self, tipo, recurso_id):
+        """
+        Enfileira a notificação. Retorna False se for repetida; lança FilaCheia
+        se a fila estiver cheia (a chave não fica marcada como vista).
+        """
+        chave = (tipo, str(recurso_id))
+        if not self._armazenamento.marcar(chave):
+            return False
+        try:
+            self._armazenamento.empurrar(chave)
+        except FilaCheia:
+            self._armazenamento.esquecer([chave])
+            raise
+        return True
+
+    def retirar_lote(self, tamanho=TAMANHO_LOTE_WEBHOOKS):
+        """Até `tamanho` notificações, sem bloquear."""
+        return self._armazenamento.retirar(tamanho)
+
+    def processar_lote(self, obter_gateway, tamanho=TAMANHO_LOTE_WEBHOOKS):
+        """
+        Processa um lote (requer contexto da aplicação). Retorna quantas
+        notificações foram retiradas da fila.
+        """
+        lote = self.retirar_lote(tamanho)
+        if not lote:
+            return 0
+        pendentes = set(lote)
+        chaves = {recurso_id: (tipo, recurso_id) for tipo, recurso_id in lote}
+        try:
+            # Sem pagamento (notificação antes do commit da criação) aceita o reenvio
+            conhecidos = list(
+                db.session.scalars(
+                    select(Pagamento.gateway_id).where(
+                        Pagamento.gateway_id.in_(list(chaves))
+                    )
+                )
+            )
+            db.session.commit()
+            status = conhecidos and consultar_status(obter_gateway(), conhecidos)
+            if status:
+                for pagamento in Pagamento.query.filter(
+                    Pagamento.gateway_id.in_(list(status))
+                ):
+                    aplicar_status(pagamento, status[pagamento.gateway_id])
+                    if pagamento.status != STATUS_PENDENTE:
+                        pendentes.discard(chaves[pagamento.gateway_id])
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            pendentes = set(lote)
+            logger.exception("Falha ao processar lote de webhooks")
+        self._armazenamento.esquecer(pendentes)
+        return len(lote)
+
+    def iniciar(self, app, socketio, workers=WORKERS_WEBHOOKS):
+        """Inicia o pool de workers em segundo plano (uma vez por processo)."""
+        if self._ativo:
+            return
+        self._ativo = True
+        for _ in range(workers):
+            socketio.start_background_task(self._executar, app, socketio)
+
+    def _executar(self, app, socketio):
+        from payment.factory import get_establishment_gateway
+
+        while True:
+            with app.app_context():
+                processados = self.processar_lote(get_establishment_gateway)
+            if not processados:
+                socketio.sleep(INTERVALO_OCIOSO)
+
+
+fila_webhooks = FilaWebhooks()
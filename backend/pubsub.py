@@ -0,0 +1,94 @@
+"""
+Fila de mensagens do Socket.IO entre workers.
+
+Com vários workers do gunicorn cada processo conhece apenas os sockets
+conectados a ele; sem uma fila compartilhada um emit feito em um worker não
+chega aos clientes dos demais. SOCKETIO_MESSAGE_QUEUE escolhe o backend:
+
+- ``redis://...``: RedisManager do python-socketio (produção);
+- ``memoria://``: barramento dentro do processo, para testes e benchmark;
+- vazio: sem fila (um único worker).
+"""
+
+import pickle
+import queue
+import threading
+
+import socketio
+
+CANAL_PADRAO = "comandas-socketio"
+PREFIXO_MEMORIA = "memoria://"
+
+
+class BarramentoMemoria:
+    """Pub/sub dentro do processo: cada assinante recebe sua própria fila."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assinantes = {}
+
+    def assinar(self, canal):
+        fila = queue.Queue()
+        with self._lock:
+            self._assinantes.setdefault(canal, []).append(fila)
+        return fila
+
+    def cancelar(self, canal, fila):
+        with self._lock:
+            filas = self._assinantes.get(canal, [])
+            if fila in filas:
+                filas.remove(fila)
+
+    def publicar(self, canal, mensagem):
+        with self._lock:
+            filas = list(self._assinantes.get(canal, ()))
+        for fila in filas:
+            fila.put(mensagem)
+
+
+barramento_padrao = BarramentoMemoria()
+
+
+class GerenciadorFilaMemoria(socketio.PubSubManager):
+    """
+    PubSubManager sobre um BarramentoMemoria. Vários servidores Socket.IO no
+    mesmo processo que compartilham o barramento se comportam como workers
+    ligados ao mesmo Redis.
+    """
+
+    name = "memoria"
+
+    def __init__(
+        self, barramento=None, channel=CANAL_PADRAO, write_only=False, logger=None
+    ):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.barramento = barramento or barramento_padrao
+        self._fila = None if write_only else self.barramento.assinar(channel)
+
+    def _publish(self, data):
+        # Serializa como o RedisManager: o receptor nunca compartilha objetos
+        self.barramento.publicar(self.channel, pickle.dumps(data))
+
+    def _listen(self):
+        while True:
+            yield pickle.loads(self._fila.get())
+
+    def fechar(self):
+        """Deixa de receber mensagens do barramento."""
+        if self._fila is not None:
+            self.barramento.cancelar(self.channel, self._fila)
+
+
+def criar_gerenciador(app, write_only=False):
+    """
+    Cria o client_manager do Socket.IO conforme SOCKETIO_MESSAGE_QUEUE, ou
+    None para o gerenciador local padrão.
+    """
+    url = app.config.get("SOCKETIO_MESSAGE_QUEUE")
+    if not url:
+        return None
+    if url.startswith(PREFIXO_MEMORIA):
+        return GerenciadorFilaMemoria(write_only=write_only)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return socketio.RedisManager(url, channel=CANAL_PADRAO, write_only=write_only)
+    raise ValueError(f"SOCKETIO_MESSAGE_QUEUE não suportada: {url}")
@@ -0,0 +1,352 @@
+"""
+Relatórios do backoffice, agregados no banco.
+
+Cada relatório é uma ou duas consultas GROUP BY sobre pedidos, linhas e
+pagamentos (aprovados) em um intervalo de datas [de, ate]; só o resultado agregado
+(no máximo algumas dezenas de linhas) chega ao Python. Receita, ticket e
+mix de pagamentos contam a data do pagamento; itens por pedido, a data de
+abertura do pedido.
+
+Os resultados ficam em cache por (relatório, de, ate):
+- intervalos já consolidados (terminados antes de ontem) quase não mudam e
+  ficam em um LRU local ao processo, marcado com a versão dos consolidados;
+  ela só avança quando um commit altera um pagamento de um dia consolidado
+  (estorno tardio), e então as entradas antigas deixam de ser servidas;
+- intervalos recentes usam um cache versionado (cache.CacheSnapshots) cuja
+  versão avança a cada commit que registra pedido ou pagamento.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import Integer, cast, event, func, select
+from sqlalchemy.orm import Session
+
+from cache import CacheSnapshots
+from database import db
+from models import Cliente, Pagamento, Pedido, PedidoItem
+from models.pagamento import STATUS_APROVADO
+from serializers import codificar_json
+
+# Pedidos abertos antes da meia-noite ainda recebem itens no dia seguinte
+DIAS_ATE_CONSOLIDAR = 1
+CAPACIDADE_CACHE_CONSOLIDADOS = 256
+CHAVE_ALTERADO = "relatorios_alterados"
+CHAVE_ALTERADO_CONSOLIDADO = "relatorios_consolidados_alterados"
+DIAS_SEMANA = (
+    "domingo",
+    "segunda",
+    "terça",
+    "quarta",
+    "quinta",
+    "sexta",
+    "sábado",
+)
+
+
+# --- Expressões dependentes do banco ---
+def _sqlite():
+    return db.session.get_bind().dialect.name == "sqlite"
+
+
+def _hora(coluna):
+    if _sqlite():
+        return cast(func.strftime("%H", coluna), Integer)
+    return cast(func.extract("hour", coluna), Integer)
+
+
+def _dia_semana(coluna):
+    """0 = domingo ... 6 = sábado, nos dois bancos."""
+    if _sqlite():
+        return cast(func.strftime("%w", coluna), Integer)
+    return cast(func.extract("dow", coluna), Integer)
+
+
+def _minutos_entre(fim, inicio):
+    if _sqlite():
+        return (func.julianday(fim) - func.julianday(inicio)) * 1440
+    return func.extract("epoch", fim - inicio) / 60
+
+
+def _iso(dia):
+    # func.date() devolve texto no SQLite e date no PostgreSQL
+    return dia if isinstance(dia, str) else dia.isoformat()
+
+
+def _numero(valor):
+    return round(float(valor or 0), 2)
+
+
+def _intervalo(de, ate):
+    inicio = datetime.combine(de, datetime.min.time())
+    fim = datetime.combine(ate + timedelta(days=1), datetime.min.time())
+    return inicio, fim
+
+
+def _pagamentos_no_periodo(de, ate, *colunas):
+    inicio, fim = _intervalo(de, ate)
+    return select(*colunas).where(
+        Pagamento.data_hora >= inicio,
+        Pagamento.data_hora < fim,
+        Pagamento.status == STATUS_APROVADO,
+    )
+
+
+def _receita_agrupada(de, ate, expressao, nome):
+    consulta = (
+        _pagamentos_no_periodo(
+            de,
+            ate,
+            expressao.label(nome),
+            func.sum(Pagamento.valor),
+            func.count(Pagamento.pagamento_id),
+        )
+        .group_by(expressao)
+        .order_by(expressao)
+    )
+    return [
+        {nome: grupo, "receita": _numero(receita), "pagamentos": pagamentos}
+        for grupo, receita, pagamentos in db.session.execute(consulta)
+    ]
+
+
+# --- Relatórios ---
+def receita_por_dia(de, ate):
+    linhas = _receita_agrupada(de, ate, func.date(Pagamento.data_hora), "dia")
+    for linha in linhas:
+        linha["dia"] = _iso(linha["dia"])
+    return linhas
+
+
+def receita_por_hora(de, ate):
+    return _receita_agrupada(de, ate, _hora(Pagamento.data_hora), "hora")
+
+
+def receita_por_dia_semana(de, ate):
+    linhas = _receita_agrupada(de, ate, _dia_semana(Pagamento.data_hora), "dia_semana")
+    for linha in linhas:
+        linha["nome"] = DIAS_SEMANA[linha["dia_semana"]]
+    return linhas
+
+
+def ticket_medio(de, ate):
+    """Receita por pedido pago: pagamentos parciais do mesmo pedido contam uma vez."""
+    receita, pagamentos, pedidos_pagos = db.session.execute(
+        _pagamentos_no_periodo(
+            de,
+            ate,
+            func.sum(Pagamento.valor),
+            func.count(Pagamento.pagamento_id),
+            func.count(func.distinct(Pagamento.pedido_id)),
+        )
+    ).one()
+    receita = _numero(receita)
+    return {
+        "receita": receita,
+        "pagamentos": pagamentos,
+        "pedidos_pagos": pedidos_pagos,
+        "ticket_medio": round(receita / pedidos_pagos, 2) if pedidos_pagos else 0.0,
+    }
+
+
+def itens_por_pedido(de, ate):
+    inicio, fim = _intervalo(de, ate)
+    por_pedido = (
+        select(func.sum(PedidoItem.quantidade).label("itens"))
+        .join(Pedido, Pedido.pedido_id == PedidoItem.pedido_id)
+        .where(Pedido.data_hora >= inicio, Pedido.data_hora < fim)
+        .group_by(PedidoItem.pedido_id)
+        .subquery()
+    )
+    pedidos, itens, maximo = db.session.execute(
+        select(
+            func.count(),
+            func.sum(por_pedido.c.itens),
+            func.max(por_pedido.c.itens),
+        )
+    ).one()
+    return {
+        "pedidos": pedidos,
+        "itens": itens or 0,
+        "media_itens": round(itens / pedidos, 2) if pedidos else 0.0,
+        "maximo_itens": maximo or 0,
+    }
+
+
+def giro_mesas(de, ate):
+    """
+    Tempo entre a abertura do pedido e o último pagamento, por mesa; cada
+    pedido pago conta um atendimento, mesmo com pagamentos parciais.
+    """
+    pagos = (
+        _pagamentos_no_periodo(
+            de, ate, Pagamento.pedido_id, func.max(Pagamento.data_hora).label("pago_em")
+        )
+        .group_by(Pagamento.pedido_id)
+        .subquery()
+    )
+    minutos = _minutos_entre(pagos.c.pago_em, Pedido.data_hora)
+    consulta = (
+        select(Cliente.mesa, func.count(), func.avg(minutos))
+        .select_from(pagos)
+        .join(Pedido, Pedido.pedido_id == pagos.c.pedido_id)
+        .outerjoin(Cliente, Cliente.cliente_id == Pedido.cliente_id)
+        .group_by(Cliente.mesa)
+        .order_by(Cliente.mesa)
+    )
+    por_mesa = [
+        {"mesa": mesa, "atendimentos": atendimentos, "media_minutos": _numero(media)}
+        for mesa, atendimentos, media in db.session.execute(consulta)
+    ]
+    atendimentos = sum(linha["atendimentos"] for linha in por_mesa)
+    total_minutos = sum(
+        linha["media_minutos"] * linha["atendimentos"] for linha in por_mesa
+    )
+    return {
+        "atendimentos": atendimentos,
+        "media_minutos": (
+            round(total_minutos / atendimentos, 2) if atendimentos else 0.0
+        ),
+        "por_mesa": por_mesa,
+    }
+
+
+def mix_pagamentos(de, ate):
+    consulta = (
+        _pagamentos_no_periodo(
+            de,
+            ate,
+            Pagamento.metodo,
+            func.count(Pagamento.pagamento_id),
+            func.sum(Pagamento.valor),
+        )
+        .group_by(Pagamento.metodo)
+        .order_by(Pagamento.metodo)
+    )
+    linhas = [
+        {"metodo": metodo, "pagamentos": pagamentos, "receita": _numero(receita)}
+        for metodo, pagamentos, receita in db.session.execute(consulta)
+    ]
+    receita_total = sum(linha["receita"] for linha in linhas)
+    for linha in linhas:
+        linha["percentual"] = (
+            round(100 * linha["receita"] / receita_total, 2) if receita_total else 0.0
+        )
+    return linhas
+
+
+RELATORIOS = {
+    "receita_por_dia": receita_por_dia,
+    "receita_por_hora": receita_por_hora,
+    "receita_por_dia_semana": receita_por_dia_semana,
+    "ticket_medio": ticket_medio,
+    "itens_por_pedido": itens_por_pedido,
+    "giro_mesas": giro_mesas,
+    "mix_pagamentos": mix_pagamentos,
+}
+
+
+# --- Cache ---
+class CacheRelatorios:
+    """Cache por (relatório, de, ate): LRU para consolidados, versionado para recentes."""
+
+    def __init__(self, capacidade=CAPACIDADE_CACHE_CONSOLIDADOS):
+        self.capacidade = capacidade
+        self._consolidados = OrderedDict()  # chave -> (versão, corpo)
+        self._lock = threading.Lock()
+        self._recentes = CacheSnapshots("relatorios")
+        # Só o contador de versão é usado (compartilhado entre workers com Redis)
+        self._versao_consolidados = CacheSnapshots("relatorios_consolidados")
+
+    def init_app(self, app):
+        self._recentes.init_app(app)
+        self._versao_consolidados.init_app(app)
+        with self._lock:
+            self._consolidados.clear()
+
+    def limpar(self):
+        """Descarta tudo, inclusive os consolidados (ex.: base recriada)."""
+        with self._lock:
+            self._consolidados.clear()
+        self._recentes.invalidar()
+        self._versao_consolidados.invalidar()
+
+    def invalidar_recentes(self):
+        """Chamado após commits que registram pedidos ou pagamentos."""
+        self._recentes.invalidar()
+
+    def invalidar_consolidados(self):
+        """Chamado após commits que alteram pagamentos de dias consolidados."""
+        self._versao_consolidados.invalidar()
+
+    def obter(self, nome, de, ate, construir, hoje=None):
+        """Bytes do relatório; `construir` só é chamada em caso de falta."""
+        hoje = hoje or datetime.utcnow().date()
+        chave = f"{nome}:{de.isoformat()}:{ate.isoformat()}"
+        if not consolidado(ate, hoje):
+            return self._recentes.obter(chave, self._recentes.versao(), construir)
+        versao = self._versao_consolidados.versao()
+        if versao is None:
+            return construir()
+        with self._lock:
+            entrada = self._consolidados.get(chave)
+            if entrada is not None and entrada[0] == versao:
+                self._consolidados.move_to_end(chave)
+                return entrada[1]
+        corpo = construir()
+        with self._lock:
+            self._consolidados[chave] = (versao, corpo)
+            self._consolidados.move_to_end(chave)
+            while len(self._consolidados) > self.capacidade:
+                self._consolidados.popitem(last=False)
+        return corpo
+
+
+def consolidado(dia, hoje=None):
+    """True se `dia` já está nos intervalos consolidados (antes de ontem)."""
+    hoje = hoje or datetime.utcnow().date()
+    return dia < hoje - timedelta(days=DIAS_ATE_CONSOLIDAR)
+
+
+relatorios_cache = CacheRelatorios()
+
+
+def gerar_relatorio(nome, de, ate):
+    """Resposta codificada (bytes) do relatório `nome` no intervalo, via cache."""
+
+    def construir():
+        return codificar_json(
+            {
+                "relatorio": nome,
+                "periodo": {"de": de.isoformat(), "ate": ate.isoformat()},
+                "dados": RELATORIOS[nome](de, ate),
+            }
+        )
+
+    return relatorios_cache.obter(nome, de, ate, construir)
+
+
+def marcar_alteracao(dia=None):
+    """
+    Sinaliza que a transação corrente altera dados dos relatórios recentes e,
+    se `dia` (data do pagamento alterado) já está consolidado, também dos
+    consolidados.
+    """
+    db.session.info[CHAVE_ALTERADO] = True
+    if dia is not None and consolidado(dia):
+        db.session.info[CHAVE_ALTERADO_CONSOLIDADO] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_apos_commit(session):
+    if session.info.pop(CHAVE_ALTERADO, False):
+        relatorios_cache.invalidar_recentes()
+    if session.info.pop(CHAVE_ALTERADO_CONSOLIDADO, False):
+        relatorios_cache.invalidar_consolidados()
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_alteracao(session):
+    session.info.pop(CHAVE_ALTERADO, None)
+    session.info.pop(CHAVE_ALTERADO_CONSOLIDADO, None)
@@ -0,0 +1,194 @@
+"""
+Resumos diários mantidos incrementalmente.
+
+As rotas de escrita chamam registrar_pedido/registrar_pagamento dentro da
+mesma transação que grava o pedido ou pagamento, de modo que o resumo do
+dia nunca diverge do que foi efetivado. O dashboard lê apenas essas linhas
+(FATIAS_RESUMO por dia e uma por item/dia), com custo independente do
+histórico.
+
+O total do dia é dividido em fatias: cada transação incrementa uma fatia
+sorteada, então pedidos e pagamentos simultâneos não disputam o lock de uma
+única linha do dia até o commit. A leitura soma as fatias (resumos_por_dia).
+"""
+
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models import Pagamento, Pedido, PedidoItem, Item, ResumoDiario, ResumoDiarioItem
+from models.pagamento import STATUS_APROVADO
+from reports import marcar_alteracao
+
+FATIAS_RESUMO = 8
+
+
+def _incrementar(modelo, chave, incrementos):
+    """UPDATE col = col + n na linha `chave`; cria a linha se ainda não existir."""
+    condicoes = [getattr(modelo, coluna) == valor for coluna, valor in chave.items()]
+    valores = {
+        coluna: getattr(modelo, coluna) + valor for coluna, valor in incrementos.items()
+    }
+    comando = (
+        update(modelo)
+        .where(*condicoes)
+        .values(valores)
+        .execution_options(synchronize_session=False)
+    )
+    if db.session.execute(comando).rowcount:
+        return
+    try:
+        # Savepoint: outro worker pode ter criado a linha do dia ao mesmo tempo
+        with db.session.begin_nested():
+            db.session.add(modelo(**chave, **incrementos))
+    except IntegrityError:
+        db.session.execute(comando)
+
+
+def _chave_fatia(dia):
+    return {"dia": dia, "fatia": random.randrange(FATIAS_RESUMO)}
+
+
+def registrar_pedido(dia, novo_pedido, itens):
+    """
+    Acumula no resumo do `dia` um pedido (se `novo_pedido`) e os itens adicionados.
+    `itens` mapeia item_id -> (quantidade, valor).
+    """
+    marcar_alteracao()
+    _incrementar(
+        ResumoDiario,
+        _chave_fatia(dia),
+        {
+            "pedidos": 1 if novo_pedido else 0,
+            "itens_vendidos": sum(quantidade for quantidade, _ in itens.values()),
+        },
+    )
+    for item_id, (quantidade, valor) in itens.items():
+        _incrementar(
+            ResumoDiarioItem,
+            {"dia": dia, "item_id": item_id},
+            {"quantidade": quantidade, "receita": valor},
+        )
+
+
+def registrar_pagamento(dia, valor):
+    """Acumula um pagamento recebido no resumo do `dia`."""
+    marcar_alteracao()
+    _incrementar(
+        ResumoDiario,
+        _chave_fatia(dia),
+        {"pagamentos": 1, "receita": Decimal(str(valor))},
+    )
+
+
+def registrar_estorno(dia, valor):
+    """Retira do resumo do `dia` (o do recebimento) um pagamento estornado."""
+    # O pagamento sai dos relatórios do dia em que foi recebido, mesmo antigo
+    marcar_alteracao(dia)
+    _incrementar(
+        ResumoDiario,
+        _chave_fatia(dia),
+        {"pagamentos": -1, "receita": -Decimal(str(valor))},
+    )
+
+
+def resumos_por_dia(de, ate=None):
+    """Totais de cada dia em [de, ate] (somando as fatias), em ordem de data."""
+    consulta = db.session.query(
+        ResumoDiario.dia,
+        func.sum(ResumoDiario.pedidos),
+        func.sum(ResumoDiario.itens_vendidos),
+        func.sum(ResumoDiario.pagamentos),
+        func.sum(ResumoDiario.receita),
+    ).filter(ResumoDiario.dia >= de)
+    if ate is not None:
+        consulta = consulta.filter(ResumoDiario.dia <= ate)
+    return [
+        {
+            "dia": _como_data(dia).isoformat(),
+            "pedidos": int(pedidos),
+            "itens_vendidos": int(itens_vendidos),
+            "pagamentos": int(pagamentos),
+            "receita": float(receita or 0),
+        }
+        for dia, pedidos, itens_vendidos, pagamentos, receita in consulta.group_by(
+            ResumoDiario.dia
+        ).order_by(ResumoDiario.dia)
+    ]
+
+
+def _como_data(valor):
+    # func.date() devolve texto no SQLite e date no PostgreSQL
+    return date.fromisoformat(valor) if isinstance(valor, str) else valor
+
+
+def reconstruir_resumos(de, ate):
+    """
+    Recalcula os resumos dos dias em [de, ate] a partir das tabelas de pedidos
+    e pagamentos. Usado para carga inicial ou correção; não faz commit.
+    Itens são atribuídos ao dia de abertura do pedido.
+    """
+    inicio = datetime.combine(de, datetime.min.time())
+    fim = datetime.combine(ate + timedelta(days=1), datetime.min.time())
+    ResumoDiarioItem.query.filter(
+        ResumoDiarioItem.dia >= de, ResumoDiarioItem.dia <= ate
+    ).delete(synchronize_session=False)
+    ResumoDiario.query.filter(ResumoDiario.dia >= de, ResumoDiario.dia <= ate).delete(
+        synchronize_session=False
+    )
+
+    resumos = {}
+
+    def resumo(dia):
+        if dia not in resumos:
+            resumos[dia] = ResumoDiario(
+                dia=dia, fatia=0, pedidos=0, itens_vendidos=0, pagamentos=0, receita=0
+            )
+        return resumos[dia]
+
+    dia_pedido = func.date(Pedido.data_hora)
+    for dia, pedidos in (
+        db.session.query(dia_pedido, func.count(Pedido.pedido_id))
+        .filter(Pedido.data_hora >= inicio, Pedido.data_hora < fim)
+        .group_by(dia_pedido)
+    ):
+        resumo(_como_data(dia)).pedidos = pedidos
+    for dia, item_id, quantidade, receita in (
+        db.session.query(
+            dia_pedido,
+            PedidoItem.item_id,
+            func.sum(PedidoItem.quantidade),
+            func.sum(PedidoItem.quantidade * Item.preco),
+        )
+        .join(Pedido, Pedido.pedido_id == PedidoItem.pedido_id)
+        .join(Item, Item.item_id == PedidoItem.item_id)
+        .filter(Pedido.data_hora >= inicio, Pedido.data_hora < fim)
+        .group_by(dia_pedido, PedidoItem.item_id)
+    ):
+        dia = _como_data(dia)
+        resumo(dia).itens_vendidos += quantidade
+        db.session.add(
+            ResumoDiarioItem(
+                dia=dia, item_id=item_id, quantidade=quantidade, receita=receita
+            )
+        )
+    dia_pagamento = func.date(Pagamento.data_hora)
+    for dia, pagamentos, receita in (
+        db.session.query(
+            dia_pagamento, func.count(Pagamento.pagamento_id), func.sum(Pagamento.valor)
+        )
+        .filter(
+            Pagamento.data_hora >= inicio,
+            Pagamento.data_hora < fim,
+            Pagamento.status == STATUS_APROVADO,
+        )
+        .group_by(dia_pagamento)
+    ):
+        linha = resumo(_como_data(dia))
+        linha.pagamentos = pagamentos
+        linha.receita = receita
+    db.session.add_all(resumos.values())
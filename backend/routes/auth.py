@@ -1,4 +1,5 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy import and_, exists
 from database import db
 from models import Cliente, Mesa
 
@@ -6,6 +7,7 @@ auth_bp = Blueprint("auth", __name__)
 
 # --- Constantes de status ---
 STATUS_MESA_OCUPADA = "ocupada"
+STATUS_MESA_LIVRE = "livre"
 STATUS_PEDIDO_FECHADO = "Fechado"
 
 
@@ -52,23 +54,26 @@ def listar_mesas_disponiveis():
                 type: object
             total_mesas:
               type: integer
+            total_disponiveis:
+              type: integer
       500:
         description: Erro interno
     """
     try:
-        # Buscar mesas livres
-        mesas_livres = Mesa.query.filter_by(status="livre").all()
-        # Buscar mesas que não têm cliente ativo
-        mesas_disponiveis = []
-        for mesa in mesas_livres:
-            cliente_ativo = Cliente.query.filter_by(mesa=mesa.numero).first()
-            if not cliente_ativo:
-                mesas_disponiveis.append(mesa)
+        # Uma única consulta: todas as mesas com a flag de disponibilidade
+        # (livre e sem cliente ativo, via anti-join), de onde saem lista e totais
+        disponivel = and_(
+            Mesa.status == STATUS_MESA_LIVRE,
+            ~exists().where(Cliente.mesa == Mesa.numero),
+        ).label("disponivel")
+        linhas = db.session.query(Mesa, disponivel).order_by(Mesa.numero).all()
+        mesas_disponiveis = [mesa.to_dict() for mesa, livre in linhas if livre]
         return (
             jsonify(
                 {
-                    "mesas_disponiveis": [mesa.to_dict() for mesa in mesas_disponiveis],
-                    "total_mesas": Mesa.query.count(),
+                    "mesas_disponiveis": mesas_disponiveis,
+                    "total_mesas": len(linhas),
+                    "total_disponiveis": len(mesas_disponiveis),
                 }
             ),
             200,
@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify
+from sqlalchemy import func
+from database import db
+from models import Item, Mesa, Pagamento, Pedido, ResumoDiarioItem
+from models.pagamento import STATUS_APROVADO, STATUS_PENDENTE
+from rollups import resumos_por_dia
+
+dashboard_bp = Blueprint("dashboard", __name__)
+
+# --- Constantes ---
+STATUS_MESA_OCUPADA = "ocupada"
+DIAS_MAXIMO_RESUMO = 90
+LIMITE_MAIS_VENDIDOS = 5
+
+
+@dashboard_bp.route("/dashboard/resumo", methods=["GET"])
+def obter_resumo_dashboard():
+    """
+    Resumo do dashboard: receita, pedidos por status, mesas ocupadas e mais vendidos.
+    ---
+    tags:
+      - Dashboard
+    parameters:
+      - in: query
+        name: dias
+        type: integer
+        required: false
+        description: Quantidade de dias até hoje (padrão 1 = só hoje, máximo 90)
+    responses:
+      200:
+        description: Resumo calculado a partir dos resumos diários
+        schema:
+          type: object
+          properties:
+            receita:
+              type: number
+            pagamentos:
+              type: integer
+            pedidos:
+              type: integer
+            pedidos_pagos:
+              type: integer
+              description: Pedidos distintos com pagamento aprovado no período
+            ticket_medio:
+              type: number
+              description: Receita por pedido pago
+            pedidos_por_status:
+              type: object
+            pagamentos_pendentes:
+              type: integer
+              description: Pagamentos aguardando confirmação do gateway
+            mesas_ocupadas:
+              type: integer
+            total_mesas:
+              type: integer
+            mais_vendidos:
+              type: array
+              items:
+                type: object
+            por_dia:
+              type: array
+              items:
+                type: object
+      400:
+        description: Parâmetro dias inválido
+      500:
+        description: Erro interno
+    """
+    try:
+        try:
+            dias = int(request.args.get("dias", 1))
+        except ValueError:
+            return jsonify({"error": "dias deve ser um inteiro"}), 400
+        if not 1 <= dias <= DIAS_MAXIMO_RESUMO:
+            return (
+                jsonify({"error": f"dias deve estar entre 1 e {DIAS_MAXIMO_RESUMO}"}),
+                400,
+            )
+        hoje = datetime.utcnow().date()
+        de = hoje - timedelta(days=dias - 1)
+        inicio = datetime.combine(de, datetime.min.time())
+
+        por_dia = resumos_por_dia(de)
+        receita = sum(r["receita"] for r in por_dia)
+        pagamentos = sum(r["pagamentos"] for r in por_dia)
+        pedidos = sum(r["pedidos"] for r in por_dia)
+
+        quantidade = func.sum(ResumoDiarioItem.quantidade)
+        mais_vendidos = (
+            db.session.query(
+                ResumoDiarioItem.item_id,
+                Item.nome,
+                quantidade.label("quantidade"),
+                func.sum(ResumoDiarioItem.receita).label("receita"),
+            )
+            .outerjoin(Item, Item.item_id == ResumoDiarioItem.item_id)
+            .filter(ResumoDiarioItem.dia >= de)
+            .group_by(ResumoDiarioItem.item_id, Item.nome)
+            .order_by(quantidade.desc())
+            .limit(LIMITE_MAIS_VENDIDOS)
+            .all()
+        )
+        # Status dos pedidos do período: varredura limitada por ix_pedido_data_hora
+        pedidos_por_status = dict(
+            db.session.query(Pedido.status, func.count(Pedido.pedido_id))
+            .filter(Pedido.data_hora >= inicio)
+            .group_by(Pedido.status)
+            .all()
+        )
+        pagamentos_pendentes = Pagamento.query.filter_by(status=STATUS_PENDENTE).count()
+        # Pagamentos parciais do mesmo pedido contam um pedido no ticket médio
+        pedidos_pagos = (
+            db.session.query(func.count(func.distinct(Pagamento.pedido_id)))
+            .filter(
+                Pagamento.data_hora >= inicio,
+                Pagamento.status == STATUS_APROVADO,
+            )
+            .scalar()
+        )
+        mesas_por_status = dict(
+            db.session.query(Mesa.status, func.count(Mesa.mesa_id))
+            .group_by(Mesa.status)
+            .all()
+        )
+        return (
+            jsonify(
+                {
+                    "periodo": {"de": de.isoformat(), "ate": hoje.isoformat()},
+                    "receita": round(receita, 2),
+                    "pagamentos": pagamentos,
+                    "pedidos": pedidos,
+                    "pedidos_pagos": pedidos_pagos,
+                    "ticket_medio": (
+                        round(receita / pedidos_pagos, 2) if pedidos_pagos else 0.0
+                    ),
+                    "pedidos_por_status": pedidos_por_status,
+                    "pagamentos_pendentes": pagamentos_pendentes,
+                    "mesas_ocupadas": mesas_por_status.get(STATUS_MESA_OCUPADA, 0),
+                    "total_mesas": sum(mesas_por_status.values()),
+                    "mais_vendidos": [
+                        {
+                            "item_id": item_id,
+                            "nome": nome or "Item removido",
+                            "quantidade": int(qtd),
+                            "receita": float(valor or 0),
+                        }
+                        for item_id, nome, qtd, valor in mais_vendidos
+                    ],
+                    "por_dia": por_dia,
+                }
+            ),
+            200,
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
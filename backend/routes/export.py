@@ -0,0 +1,201 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy import select
+from database import db
+from models import Cliente, Item, Pagamento, Pedido, PedidoItem
+from routes.orders import filtrar_pedidos, ler_data
+from serializers import FORMATOS_EXPORTACAO, resposta_streaming
+
+export_bp = Blueprint("export", __name__)
+
+# Linhas buscadas por vez do cursor do banco (server-side no PostgreSQL)
+TAMANHO_BLOCO_EXPORTACAO = 1000
+
+# --- Colunas exportadas: (nome, coluna) ---
+COLUNAS_PEDIDOS = (
+    ("pedido_id", Pedido.pedido_id),
+    ("data_hora", Pedido.data_hora),
+    ("cliente_id", Pedido.cliente_id),
+    ("mesa", Cliente.mesa),
+    ("status", Pedido.status),
+    ("fechado", Pedido.fechado),
+    ("subtotal", Pedido.subtotal),
+    ("desconto", Pedido.desconto),
+    ("percentual_servico", Pedido.percentual_servico),
+    ("taxa_servico", Pedido.taxa_servico),
+    ("total", Pedido.total),
+    ("valor_pago", Pedido.valor_pago),
+)
+COLUNAS_LINHAS_PEDIDOS = (
+    ("pedido_id", Pedido.pedido_id),
+    ("data_hora", Pedido.data_hora),
+    ("status", Pedido.status),
+    ("item_id", PedidoItem.item_id),
+    ("sku", Item.sku),
+    ("nome", Item.nome),
+    ("quantidade", PedidoItem.quantidade),
+    ("preco", Item.preco),
+)
+COLUNAS_PAGAMENTOS = (
+    ("pagamento_id", Pagamento.pagamento_id),
+    ("data_hora", Pagamento.data_hora),
+    ("pedido_id", Pagamento.pedido_id),
+    ("metodo", Pagamento.metodo),
+    ("valor", Pagamento.valor),
+    ("valor_pago", Pagamento.valor_pago),
+    ("troco", Pagamento.troco),
+    ("status", Pagamento.status),
+    ("gateway_id", Pagamento.gateway_id),
+)
+DETALHES_PEDIDOS = ("pedidos", "itens")
+
+
+def ler_formato(args):
+    """Formato pedido em ?formato= (padrão csv). Lança ValueError se inválido."""
+    formato = args.get("formato", "csv")
+    if formato not in FORMATOS_EXPORTACAO:
+        raise ValueError(f"formato deve ser um de: {', '.join(FORMATOS_EXPORTACAO)}")
+    return formato
+
+
+def em_blocos(consulta):
+    """Executa a consulta lendo o resultado em blocos, sem materializar tudo."""
+    return db.session.execute(
+        consulta.execution_options(yield_per=TAMANHO_BLOCO_EXPORTACAO)
+    )
+
+
+@export_bp.route("/export/pedidos", methods=["GET"])
+def exportar_pedidos():
+    """
+    Exporta pedidos em streaming (CSV ou NDJSON), com memória constante.
+    ---
+    tags:
+      - Exportação
+    parameters:
+      - in: query
+        name: formato
+        type: string
+        enum: [csv, ndjson]
+        required: false
+        description: Formato da resposta (padrão csv)
+      - in: query
+        name: detalhe
+        type: string
+        enum: [pedidos, itens]
+        required: false
+        description: Uma linha por pedido (padrão) ou uma linha por item do pedido
+      - in: query
+        name: de
+        type: string
+        required: false
+        description: Data/hora ISO inicial (inclusive)
+      - in: query
+        name: ate
+        type: string
+        required: false
+        description: Data/hora ISO final; uma data sem hora inclui o dia inteiro
+      - in: query
+        name: status
+        type: string
+        required: false
+        description: Um ou mais status separados por vírgula
+    produces:
+      - text/csv
+      - application/x-ndjson
+    responses:
+      200:
+        description: Pedidos, um por linha, em ordem de data
+      400:
+        description: Parâmetros inválidos
+      500:
+        description: Erro interno
+    """
+    try:
+        formato = ler_formato(request.args)
+        detalhe = request.args.get("detalhe", "pedidos")
+        if detalhe not in DETALHES_PEDIDOS:
+            raise ValueError(f"detalhe deve ser um de: {', '.join(DETALHES_PEDIDOS)}")
+        colunas = COLUNAS_PEDIDOS if detalhe == "pedidos" else COLUNAS_LINHAS_PEDIDOS
+        consulta = db.session.query(*(coluna for _, coluna in colunas)).select_from(
+            Pedido
+        )
+        if detalhe == "pedidos":
+            consulta = consulta.outerjoin(
+                Cliente, Cliente.cliente_id == Pedido.cliente_id
+            )
+        else:
+            consulta = consulta.join(
+                PedidoItem, PedidoItem.pedido_id == Pedido.pedido_id
+            ).outerjoin(Item, Item.item_id == PedidoItem.item_id)
+        consulta = filtrar_pedidos(consulta, request.args).order_by(
+            Pedido.data_hora, Pedido.pedido_id
+        )
+        if detalhe == "itens":
+            consulta = consulta.order_by(PedidoItem.item_id)
+        nomes = tuple(nome for nome, _ in colunas)
+        return resposta_streaming(
+            formato, nomes, em_blocos(consulta.statement), f"pedidos-{detalhe}"
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@export_bp.route("/export/pagamentos", methods=["GET"])
+def exportar_pagamentos():
+    """
+    Exporta pagamentos em streaming (CSV ou NDJSON), com memória constante.
+    ---
+    tags:
+      - Exportação
+    parameters:
+      - in: query
+        name: formato
+        type: string
+        enum: [csv, ndjson]
+        required: false
+        description: Formato da resposta (padrão csv)
+      - in: query
+        name: de
+        type: string
+        required: false
+        description: Data/hora ISO inicial (inclusive)
+      - in: query
+        name: ate
+        type: string
+        required: false
+        description: Data/hora ISO final; uma data sem hora inclui o dia inteiro
+    produces:
+      - text/csv
+      - application/x-ndjson
+    responses:
+      200:
+        description: Pagamentos, um por linha, em ordem de data
+      400:
+        description: Parâmetros inválidos
+      500:
+        description: Erro interno
+    """
+    try:
+        formato = ler_formato(request.args)
+        consulta = select(*(coluna for _, coluna in COLUNAS_PAGAMENTOS))
+        if request.args.get("de"):
+            consulta = consulta.where(
+                Pagamento.data_hora >= ler_data(request.args["de"])
+            )
+        if request.args.get("ate"):
+            consulta = consulta.where(
+                Pagamento.data_hora < ler_data(request.args["ate"], fim=True)
+            )
+        consulta = consulta.order_by(Pagamento.data_hora, Pagamento.pagamento_id)
+        return resposta_streaming(
+            formato,
+            tuple(nome for nome, _ in COLUNAS_PAGAMENTOS),
+            em_blocos(consulta),
+            "pagamentos",
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
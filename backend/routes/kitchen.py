@@ -0,0 +1,135 @@
+from flask import Blueprint, request, jsonify, current_app
+from database import db
+from models import Cliente, Item, Pedido, PedidoItem
+from events import SALA_COZINHA, feed
+from routes.orders import STATUS_LINHA_ABERTOS, STATUS_PEDIDO_COZINHA
+from serializers import resposta_json
+
+cozinha_bp = Blueprint("cozinha", __name__)
+
+# --- Long-polling da fila ---
+ESPERA_MAXIMA_SEGUNDOS = 30
+INTERVALO_VERIFICACAO = 0.25  # Segundos entre verificações do feed durante a espera
+
+
+def consultar_fila():
+    """
+    Linhas ainda não prontas dos pedidos na cozinha, do mais antigo para o
+    mais novo (FIFO). Uma consulta só, guiada pelo índice (status, data_hora)
+    do pedido.
+    """
+    consulta = (
+        db.session.query(
+            Pedido.pedido_id,
+            Pedido.data_hora,
+            Cliente.mesa,
+            PedidoItem.item_id,
+            Item.nome,
+            # Só as porções ainda não preparadas da linha
+            (PedidoItem.quantidade - PedidoItem.quantidade_pronta).label("quantidade"),
+            PedidoItem.status,
+            PedidoItem.enfileirado_em,
+            PedidoItem.iniciado_em,
+        )
+        .join(PedidoItem, PedidoItem.pedido_id == Pedido.pedido_id)
+        .join(Item, Item.item_id == PedidoItem.item_id)
+        .outerjoin(Cliente, Cliente.cliente_id == Pedido.cliente_id)
+        .filter(
+            Pedido.status == STATUS_PEDIDO_COZINHA,
+            PedidoItem.status.in_(STATUS_LINHA_ABERTOS),
+        )
+        .order_by(Pedido.data_hora, Pedido.pedido_id, PedidoItem.item_id)
+    )
+    return [
+        {
+            "pedido_id": pedido_id,
+            "data_hora": data_hora.isoformat(),
+            "mesa": mesa,
+            "item_id": item_id,
+            "nome": nome,
+            "quantidade": quantidade,
+            "status": status,
+            "enfileirado_em": enfileirado_em.isoformat() if enfileirado_em else None,
+            "iniciado_em": iniciado_em.isoformat() if iniciado_em else None,
+        }
+        for (
+            pedido_id,
+            data_hora,
+            mesa,
+            item_id,
+            nome,
+            quantidade,
+            status,
+            enfileirado_em,
+            iniciado_em,
+        ) in consulta
+    ]
+
+
+def aguardar_mudanca(desde, espera):
+    """
+    Bloqueia até `espera` segundos enquanto o feed não tiver eventos para a
+    cozinha após `desde`. Usa socketio.sleep para não travar o worker eventlet.
+    """
+    socketio = current_app.socketio
+    restante = espera
+    while restante > 0:
+        eventos = feed.desde(desde, salas={SALA_COZINHA})
+        if eventos is None or eventos:
+            return
+        socketio.sleep(INTERVALO_VERIFICACAO)
+        restante -= INTERVALO_VERIFICACAO
+
+
+@cozinha_bp.route("/cozinha/fila", methods=["GET"])
+def obter_fila_cozinha():
+    """
+    Fila da cozinha: itens dos pedidos em preparo, em ordem de chegada.
+    ---
+    tags:
+      - Cozinha
+    parameters:
+      - in: query
+        name: desde
+        type: integer
+        required: false
+        description: seq da última resposta; com wait, espera por mudanças após ele
+      - in: query
+        name: wait
+        type: integer
+        required: false
+        description: Segundos a esperar por mudanças (long-polling, máximo 30)
+    responses:
+      200:
+        description: Fila atual e seq do feed de eventos
+        schema:
+          type: object
+          properties:
+            seq:
+              type: integer
+            itens:
+              type: array
+              items:
+                type: object
+      400:
+        description: Parâmetros inválidos
+      500:
+        description: Erro interno
+    """
+    try:
+        try:
+            desde = request.args.get("desde", type=int)
+            espera = int(request.args.get("wait", 0))
+            if espera < 0:
+                raise ValueError("wait deve ser positivo")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if request.args.get("desde") and desde is None:
+            return jsonify({"error": "desde deve ser um inteiro"}), 400
+        if desde is not None and espera:
+            aguardar_mudanca(desde, min(espera, ESPERA_MAXIMA_SEGUNDOS))
+        # seq lido antes da fila: uma mudança entre os dois aparece na próxima espera
+        seq = feed.seq_atual()
+        return resposta_json({"seq": seq, "itens": consultar_fila()})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,12 +1,93 @@
-from flask import Blueprint, request, jsonify
+import io
+from decimal import Decimal
+from flask import Blueprint, request, jsonify, current_app
 from database import db
-from models import Item
+from models import Item, Categoria
+from cache import menu_cache
+from menu_import import (
+    COLUNAS_EXPORTACAO,
+    FORMATOS,
+    LEITORES,
+    importar_itens,
+    tuplas_itens,
+)
+from outbox import registrar_evento
+from serializers import FORMATOS_EXPORTACAO, resposta_streaming
+from totals import remover_item_dos_pedidos, variar_preco_item
 
 menu_bp = Blueprint("menu", __name__)
 
 # --- Constantes de mensagens de erro ---
 ERRO_ITEM_NAO_ENCONTRADO = "Item não encontrado"
 ERRO_NOME_PRECO_OBRIGATORIOS = "Nome e preço são obrigatórios"
+ERRO_CATEGORIA_NAO_ENCONTRADA = "Categoria não encontrada"
+ERRO_SKU_EM_USO = "SKU já cadastrado em outro item"
+
+# --- Tipos de conteúdo aceitos pela importação em lote ---
+FORMATOS_POR_MIMETYPE = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+# --- Função utilitária para respostas do menu em cache ---
+def responder_menu_em_cache(chave, construir):
+    """
+    Responde com o snapshot `chave` do menu, usando ETag/If-None-Match.
+    `construir` retorna o payload (dict) e só é chamada quando o snapshot da
+    versão corrente ainda não existe neste processo.
+    """
+    versao = menu_cache.versao()
+    etag = menu_cache.etag(versao) if versao is not None else None
+    if etag and request.if_none_match.contains(etag):
+        resposta = current_app.response_class(status=304)
+    else:
+        corpo = menu_cache.obter(
+            chave, versao, lambda: current_app.json.dumps(construir()).encode()
+        )
+        resposta = current_app.response_class(corpo, mimetype="application/json")
+    if etag:
+        resposta.set_etag(etag)
+        resposta.headers["Cache-Control"] = "no-cache"
+    return resposta
+
+
+def categoria_invalida(data):
+    """Retorna True se o payload referencia uma categoria inexistente."""
+    categoria_id = data.get("categoria_id")
+    return categoria_id is not None and not db.session.get(Categoria, categoria_id)
+
+
+def sku_em_uso(data, item_id=None):
+    """Retorna True se o SKU do payload já pertence a outro item."""
+    sku = data.get("sku")
+    if not sku:
+        return False
+    existente = Item.query.filter_by(sku=sku).first()
+    return existente is not None and existente.item_id != item_id
+
+
+def montar_cardapio():
+    """Agrupa itens por categoria a partir de um único SELECT com outer join."""
+    linhas = (
+        db.session.query(Item, Categoria)
+        .outerjoin(Categoria, Item.categoria_id == Categoria.categoria_id)
+        .order_by(Categoria.nome.is_(None), Categoria.nome, Item.nome)
+        .all()
+    )
+    grupos = {}
+    for item, categoria in linhas:
+        chave = categoria.categoria_id if categoria else None
+        if chave not in grupos:
+            grupos[chave] = (
+                categoria.to_dict()
+                if categoria
+                else {"id": None, "nome": "Sem categoria", "descricao": None}
+            )
+            grupos[chave]["itens"] = []
+        grupos[chave]["itens"].append(item.to_dict())
+    return {"categorias": list(grupos.values())}
 
 
 @menu_bp.route("/itens", methods=["GET"])
@@ -16,6 +97,17 @@ def listar_itens():
     ---
     tags:
       - Itens
+    parameters:
+      - in: query
+        name: categoria
+        type: integer
+        required: false
+        description: Retorna apenas os itens desta categoria
+      - in: header
+        name: If-None-Match
+        type: string
+        required: false
+        description: ETag recebido anteriormente; responde 304 se o menu não mudou
     responses:
       200:
         description: Lista de itens
@@ -26,12 +118,34 @@ def listar_itens():
               type: array
               items:
                 type: object
+      304:
+        description: Menu inalterado desde o ETag informado
+      400:
+        description: Categoria inválida
       500:
         description: Erro interno
     """
     try:
-        itens = Item.query.all()
-        return jsonify({"itens": [item.to_dict() for item in itens]}), 200
+        categoria = request.args.get("categoria")
+        if categoria is None:
+            return responder_menu_em_cache(
+                "itens",
+                lambda: {"itens": [item.to_dict() for item in Item.query.all()]},
+            )
+        try:
+            categoria_id = int(categoria)
+        except ValueError:
+            return jsonify({"error": "categoria deve ser um inteiro"}), 400
+        # Filtro servido pelo índice de item.categoria_id
+        return responder_menu_em_cache(
+            f"itens:categoria:{categoria_id}",
+            lambda: {
+                "itens": [
+                    item.to_dict()
+                    for item in Item.query.filter_by(categoria_id=categoria_id)
+                ]
+            },
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -53,6 +167,9 @@ def criar_item():
             - nome
             - preco
           properties:
+            sku:
+              type: string
+              example: BEB-001
             nome:
               type: string
               example: Coca-Cola
@@ -62,6 +179,9 @@ def criar_item():
             preco:
               type: number
               example: 5.0
+            categoria_id:
+              type: integer
+              example: 4
     responses:
       201:
         description: Item criado com sucesso
@@ -81,11 +201,20 @@ def criar_item():
         data = request.get_json()
         if not data or "nome" not in data or "preco" not in data:
             return jsonify({"error": ERRO_NOME_PRECO_OBRIGATORIOS}), 400
+        if categoria_invalida(data):
+            return jsonify({"error": ERRO_CATEGORIA_NAO_ENCONTRADA}), 400
+        if sku_em_uso(data):
+            return jsonify({"error": ERRO_SKU_EM_USO}), 400
         novo_item = Item(
-            nome=data["nome"], descricao=data.get("descricao", ""), preco=data["preco"]
+            sku=data.get("sku") or None,
+            nome=data["nome"],
+            descricao=data.get("descricao", ""),
+            preco=data["preco"],
+            categoria_id=data.get("categoria_id"),
         )
         db.session.add(novo_item)
         db.session.commit()
+        menu_cache.invalidar()
         return (
             jsonify(
                 {"message": "Item criado com sucesso", "item": novo_item.to_dict()}
@@ -97,6 +226,124 @@ def criar_item():
         return jsonify({"error": str(e)}), 500
 
 
+@menu_bp.route("/itens/importar", methods=["POST"])
+def importar_itens_em_lote():
+    """
+    Importa itens em lote (CSV ou NDJSON), criando ou atualizando pelo SKU.
+    O arquivo é lido em streaming e gravado em lotes; linhas inválidas são
+    relatadas sem interromper as demais.
+    ---
+    tags:
+      - Itens
+    consumes:
+      - text/csv
+      - application/x-ndjson
+    parameters:
+      - in: query
+        name: formato
+        type: string
+        enum: [csv, ndjson]
+        required: false
+        description: Formato do corpo; padrão pelo Content-Type
+      - in: body
+        name: body
+        required: true
+        description: Colunas/campos sku, nome, descricao, preco, categoria_id
+        schema:
+          type: string
+          example: "sku,nome,descricao,preco,categoria_id\nBEB-001,Coca-Cola,Lata,5.00,4"
+    responses:
+      200:
+        description: Resultado da importação
+        schema:
+          type: object
+          properties:
+            criados:
+              type: integer
+            atualizados:
+              type: integer
+            total_erros:
+              type: integer
+            erros:
+              type: array
+              items:
+                type: object
+                properties:
+                  linha:
+                    type: integer
+                  sku:
+                    type: string
+                  erro:
+                    type: string
+      400:
+        description: Formato não suportado ou arquivo fora de UTF-8
+      500:
+        description: Erro interno
+    """
+    try:
+        formato = request.args.get("formato") or FORMATOS_POR_MIMETYPE.get(
+            request.mimetype
+        )
+        if formato not in FORMATOS:
+            return (
+                jsonify(
+                    {
+                        "error": "Envie text/csv ou application/x-ndjson "
+                        f"(ou ?formato={'|'.join(FORMATOS)})"
+                    }
+                ),
+                400,
+            )
+        fluxo = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+        try:
+            resultado = importar_itens(LEITORES[formato](fluxo))
+        except UnicodeDecodeError:
+            return jsonify({"error": "O arquivo deve estar em UTF-8"}), 400
+        finally:
+            if not fluxo.closed:
+                fluxo.detach()
+        if resultado["criados"] or resultado["atualizados"]:
+            menu_cache.invalidar()
+        return jsonify(resultado), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+
+@menu_bp.route("/itens/exportar", methods=["GET"])
+def exportar_itens_em_lote():
+    """
+    Exporta todos os itens em streaming, nas colunas aceitas pela importação.
+    ---
+    tags:
+      - Itens
+    parameters:
+      - in: query
+        name: formato
+        type: string
+        enum: [csv, ndjson]
+        required: false
+        description: Formato da resposta (padrão csv)
+    produces:
+      - text/csv
+      - application/x-ndjson
+    responses:
+      200:
+        description: Itens, um por linha
+      400:
+        description: Formato não suportado
+    """
+    formato = request.args.get("formato", "csv")
+    if formato not in FORMATOS_EXPORTACAO:
+        return (
+            jsonify(
+                {"error": f"formato deve ser um de: {', '.join(FORMATOS_EXPORTACAO)}"}
+            ),
+            400,
+        )
+    return resposta_streaming(formato, COLUNAS_EXPORTACAO, tuplas_itens(), "itens")
+
+
 @menu_bp.route("/itens/<int:item_id>", methods=["GET"])
 def obter_item(item_id):
     """
@@ -151,6 +398,9 @@ def atualizar_item(item_id):
         schema:
           type: object
           properties:
+            sku:
+              type: string
+              example: BEB-002
             nome:
               type: string
               example: Coca Zero
@@ -160,6 +410,9 @@ def atualizar_item(item_id):
             preco:
               type: number
               example: 6.0
+            categoria_id:
+              type: integer
+              example: 4
     responses:
       200:
         description: Item atualizado com sucesso
@@ -170,6 +423,8 @@ def atualizar_item(item_id):
               type: string
             item:
               type: object
+      400:
+        description: Categoria não encontrada ou SKU em uso
       404:
         description: Item não encontrado
       500:
@@ -180,13 +435,28 @@ def atualizar_item(item_id):
         item = db.session.get(Item, item_id)
         if not item:
             return jsonify({"error": ERRO_ITEM_NAO_ENCONTRADO}), 404
+        if categoria_invalida(data):
+            return jsonify({"error": ERRO_CATEGORIA_NAO_ENCONTRADA}), 400
+        if sku_em_uso(data, item_id):
+            return jsonify({"error": ERRO_SKU_EM_USO}), 400
+        if "sku" in data:
+            item.sku = data["sku"] or None
         if "nome" in data:
             item.nome = data["nome"]
         if "descricao" in data:
             item.descricao = data["descricao"]
+        pedidos_afetados = []
         if "preco" in data:
+            # Pedidos abertos com o item acompanham o novo preço
+            variacao = Decimal(str(data["preco"])) - Decimal(str(item.preco))
+            pedidos_afetados = variar_preco_item(item.item_id, variacao)
             item.preco = data["preco"]
+        if "categoria_id" in data:
+            item.categoria_id = data["categoria_id"]
+        for pedido_id in pedidos_afetados:
+            registrar_evento("pedido_atualizado", pedido_id=pedido_id)
         db.session.commit()
+        menu_cache.invalidar()
         return (
             jsonify({"message": "Item atualizado com sucesso", "item": item.to_dict()}),
             200,
@@ -226,14 +496,57 @@ def remover_item(item_id):
         item = db.session.get(Item, item_id)
         if not item:
             return jsonify({"error": ERRO_ITEM_NAO_ENCONTRADO}), 404
+        # As linhas do item saem dos pedidos (cascade); os totais acompanham
+        for pedido_id in remover_item_dos_pedidos(item):
+            registrar_evento("pedido_atualizado", pedido_id=pedido_id)
         db.session.delete(item)
         db.session.commit()
+        menu_cache.invalidar()
         return jsonify({"message": "Item removido com sucesso"}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
 
+@menu_bp.route("/cardapio", methods=["GET"])
+def listar_cardapio():
+    """
+    Lista o menu agrupado por categoria, montado em uma única consulta.
+    ---
+    tags:
+      - Categorias
+    responses:
+      200:
+        description: Categorias com seus itens (itens sem categoria ficam em id nulo)
+        schema:
+          type: object
+          properties:
+            categorias:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+                  nome:
+                    type: string
+                  descricao:
+                    type: string
+                  itens:
+                    type: array
+                    items:
+                      type: object
+      304:
+        description: Menu inalterado desde o ETag informado
+      500:
+        description: Erro interno
+    """
+    try:
+        return responder_menu_em_cache("cardapio", montar_cardapio)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @menu_bp.route("/categorias", methods=["GET"])
 def listar_categorias():
     """
@@ -262,20 +575,15 @@ def listar_categorias():
         description: Erro interno
     """
     try:
-        # Por enquanto, retornar categorias padrão
-        # TODO: Implementar modelo de Categoria quando necessário
-        categorias = [
-            {"id": 1, "nome": "Entradas", "descricao": "Pratos de entrada"},
-            {"id": 2, "nome": "Pratos Principais", "descricao": "Pratos principais"},
-            {"id": 3, "nome": "Sobremesas", "descricao": "Sobremesas e doces"},
-            {"id": 4, "nome": "Bebidas", "descricao": "Bebidas e refrigerantes"},
-            {
-                "id": 5,
-                "nome": "Acompanhamentos",
-                "descricao": "Acompanhamentos e extras",
+        return responder_menu_em_cache(
+            "categorias",
+            lambda: {
+                "categorias": [
+                    categoria.to_dict()
+                    for categoria in Categoria.query.order_by(Categoria.categoria_id)
+                ]
             },
-        ]
-        return jsonify({"categorias": categorias}), 200
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -313,7 +621,7 @@ def criar_categoria():
             categoria:
               type: object
       400:
-        description: Dados inválidos
+        description: Dados inválidos ou categoria duplicada
       500:
         description: Erro interno
     """
@@ -321,30 +629,23 @@ def criar_categoria():
         data = request.get_json()
         if not data or "nome" not in data:
             return jsonify({"error": "Nome da categoria é obrigatório"}), 400
-
-        # TODO: Implementar criação real de categoria
-        categorias = [
-            {"id": 1, "nome": "Entradas", "descricao": "Pratos de entrada"},
-            {"id": 2, "nome": "Pratos Principais", "descricao": "Pratos principais"},
-            {"id": 3, "nome": "Sobremesas", "descricao": "Sobremesas e doces"},
-            {"id": 4, "nome": "Bebidas", "descricao": "Bebidas e refrigerantes"},
-            {
-                "id": 5,
-                "nome": "Acompanhamentos",
-                "descricao": "Acompanhamentos e extras",
-            },
-        ]
-        nova_categoria = {
-            "id": len(categorias) + 1,
-            "nome": data["nome"],
-            "descricao": data.get("descricao", ""),
-        }
-
+        if Categoria.query.filter_by(nome=data["nome"]).first():
+            return jsonify({"error": "Já existe uma categoria com esse nome"}), 400
+        nova_categoria = Categoria(
+            nome=data["nome"], descricao=data.get("descricao", "")
+        )
+        db.session.add(nova_categoria)
+        db.session.commit()
+        menu_cache.invalidar()
         return (
             jsonify(
-                {"message": "Categoria criada com sucesso", "categoria": nova_categoria}
+                {
+                    "message": "Categoria criada com sucesso",
+                    "categoria": nova_categoria.to_dict(),
+                }
             ),
             201,
         )
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": str(e)}), 500
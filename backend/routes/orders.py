@@ -1,9 +1,20 @@
+import base64
+import random
+import time
 from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import and_, case, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.orm import joinedload, selectinload
 from database import db
 from models import Pedido, PedidoItem, Item, Cliente
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
-from events import emitir_pedido_novo, emitir_pedido_atualizado
+from idempotency import idempotente
+from outbox import registrar_evento
+from rollups import registrar_pedido
+from serializers import SerializadorPedidos, resposta_json
+from totals import aplicar_linhas, arredondar, definir_ajustes
 
 orders_bp = Blueprint("orders", __name__)
 
@@ -14,6 +25,22 @@ STATUS_PEDIDO_PAGO = "Pago"
 STATUS_PEDIDO_AGUARDANDO_PAGAMENTO = "Aguardando Pagamento"
 STATUS_MESA_LIVRE = "livre"
 
+# --- Status das linhas do pedido (andamento de cada prato na cozinha) ---
+STATUS_LINHA_NA_FILA = "Na fila"
+STATUS_LINHA_EM_PREPARO = "Em preparo"
+STATUS_LINHA_PRONTO = "Pronto"
+STATUS_LINHA = (STATUS_LINHA_NA_FILA, STATUS_LINHA_EM_PREPARO, STATUS_LINHA_PRONTO)
+STATUS_LINHA_ABERTOS = (STATUS_LINHA_NA_FILA, STATUS_LINHA_EM_PREPARO)
+
+# --- Concorrência na gravação de pedidos ---
+TENTATIVAS_CONCORRENCIA = 8
+ESPERA_BASE_CONFLITO = 0.005  # Segundos; dobra a cada tentativa, com jitter
+
+# --- Paginação da listagem de pedidos ---
+LIMITE_PADRAO_PEDIDOS = 50
+LIMITE_MAXIMO_PEDIDOS = 200
+CAMPOS_LINHA = {"item_id", "quantidade"}
+
 
 # --- Função utilitária para liberar mesa e remover cliente ---
 def liberar_mesa_e_remover_cliente(cliente):
@@ -27,7 +54,218 @@ def liberar_mesa_e_remover_cliente(cliente):
         db.session.delete(cliente)
 
 
+# --- Funções auxiliares da listagem paginada ---
+def codificar_cursor(pedido):
+    """Gera o cursor opaco (data_hora + pedido_id) a partir do último pedido da página."""
+    bruto = f"{pedido.data_hora.isoformat()}|{pedido.pedido_id}"
+    return base64.urlsafe_b64encode(bruto.encode()).decode()
+
+
+def decodificar_cursor(cursor):
+    """Retorna a tupla (data_hora, pedido_id) do cursor. Lança ValueError se inválido."""
+    try:
+        bruto = base64.urlsafe_b64decode(cursor.encode()).decode()
+        data_hora, pedido_id = bruto.rsplit("|", 1)
+        return datetime.fromisoformat(data_hora), int(pedido_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+
+def ler_data(valor, fim=False):
+    """Converte data/data-hora ISO. Datas sem hora usadas como fim cobrem o dia inteiro."""
+    data = datetime.fromisoformat(valor)
+    if fim and len(valor) == 10:
+        data += timedelta(days=1)
+    return data
+
+
+def _ler_booleano(valor):
+    if valor.lower() in ("true", "1", "sim"):
+        return True
+    if valor.lower() in ("false", "0", "nao", "não"):
+        return False
+    raise ValueError(f"Valor booleano inválido: {valor}")
+
+
+def definir_status_linha(linha, status, agora=None):
+    """Muda o status da linha e registra o horário da etapa correspondente."""
+    agora = agora or datetime.utcnow()
+    linha.status = status
+    if status == STATUS_LINHA_NA_FILA:
+        linha.enfileirado_em = agora
+        linha.iniciado_em = None
+        linha.pronto_em = None
+    elif status == STATUS_LINHA_EM_PREPARO:
+        linha.iniciado_em = agora
+        linha.pronto_em = None
+    elif status == STATUS_LINHA_PRONTO:
+        linha.iniciado_em = linha.iniciado_em or agora
+        linha.pronto_em = agora
+        linha.quantidade_pronta = linha.quantidade
+
+
+def _andamento_ao_somar(enfileirado_em):
+    """
+    SET do andamento de uma linha que recebe porções novas. Se ela já saiu da
+    fila (em preparo ou pronta), as porções anteriores contam como prontas e
+    só as novas voltam para a fila; se ainda está na fila, nada muda além da
+    quantidade.
+    """
+    na_fila = PedidoItem.status == STATUS_LINHA_NA_FILA
+    return {
+        "quantidade_pronta": case(
+            (na_fila, PedidoItem.quantidade_pronta), else_=PedidoItem.quantidade
+        ),
+        "status": STATUS_LINHA_NA_FILA,
+        "enfileirado_em": case(
+            (na_fila, PedidoItem.enfileirado_em), else_=enfileirado_em
+        ),
+        "iniciado_em": None,
+        "pronto_em": None,
+    }
+
+
+def somar_linhas(pedido_id, quantidades, precos, agora=None):
+    """
+    Soma as quantidades às linhas do pedido de forma atômica: um único
+    INSERT ... ON CONFLICT DO UPDATE SET quantidade = quantidade + n, sem ler
+    as linhas antes. Só as porções novas vão para a fila: as que a cozinha já
+    preparou ficam em quantidade_pronta.
+    """
+    if not quantidades:
+        return
+    agora = agora or datetime.utcnow()
+    # Ordem fixa de item_id: transações concorrentes travam as linhas na mesma ordem
+    valores = [
+        {
+            "pedido_id": pedido_id,
+            "item_id": item_id,
+            "quantidade": quantidade,
+            "preco_unitario": precos[item_id],
+            "status": STATUS_LINHA_NA_FILA,
+            "enfileirado_em": agora,
+        }
+        for item_id, quantidade in sorted(quantidades.items())
+    ]
+    dialeto = db.session.get_bind().dialect.name
+    if dialeto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialeto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        _somar_linhas_sem_upsert(valores)
+        return
+    comando = insert(PedidoItem).values(valores)
+    comando = comando.on_conflict_do_update(
+        index_elements=[PedidoItem.pedido_id, PedidoItem.item_id],
+        set_={
+            "quantidade": PedidoItem.quantidade + comando.excluded.quantidade,
+            "preco_unitario": comando.excluded.preco_unitario,
+            **_andamento_ao_somar(comando.excluded.enfileirado_em),
+        },
+    )
+    db.session.execute(comando)
+
+
+def _somar_linhas_sem_upsert(valores):
+    # Bancos sem ON CONFLICT: UPDATE atômico e INSERT em savepoint se a linha não existir
+    for linha in valores:
+        comando = (
+            db.update(PedidoItem)
+            .where(
+                PedidoItem.pedido_id == linha["pedido_id"],
+                PedidoItem.item_id == linha["item_id"],
+            )
+            .values(
+                quantidade=PedidoItem.quantidade + linha["quantidade"],
+                preco_unitario=linha["preco_unitario"],
+                **_andamento_ao_somar(linha["enfileirado_em"]),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if db.session.execute(comando).rowcount:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.add(PedidoItem(**linha))
+        except IntegrityError:
+            db.session.execute(comando)
+
+
+def _gravar_itens(cliente_id, quantidades, precos):
+    """
+    Uma tentativa de adicionar os itens ao pedido aberto do cliente (ou a um
+    novo). Lança StaleDataError/IntegrityError se outro dispositivo alterou o
+    pedido ao mesmo tempo; quem chama desfaz e tenta de novo.
+    """
+    pedido = Pedido.query.filter_by(cliente_id=cliente_id, fechado=False).first()
+    novo_pedido = pedido is None
+    if novo_pedido:
+        pedido = Pedido(
+            cliente_id=cliente_id,
+            status=STATUS_PEDIDO_COZINHA,
+            subtotal=Decimal("0.00"),
+            desconto=Decimal("0.00"),
+            percentual_servico=current_app.config["TAXA_SERVICO_PERCENTUAL"],
+            taxa_servico=Decimal("0.00"),
+            total=Decimal("0.00"),
+            fechado=False,
+        )
+        db.session.add(pedido)
+    pedido.status = STATUS_PEDIDO_COZINHA
+    aplicar_linhas(
+        pedido,
+        {
+            item_id: (quantidade, precos[item_id])
+            for item_id, quantidade in quantidades.items()
+        },
+    )
+    # O flush grava o pedido com WHERE versao = :lida (version_id_col)
+    db.session.flush()
+    somar_linhas(pedido.pedido_id, quantidades, precos)
+    registrar_pedido(
+        datetime.utcnow().date(),
+        novo_pedido=novo_pedido,
+        itens={
+            item_id: (quantidade, arredondar(precos[item_id]) * quantidade)
+            for item_id, quantidade in quantidades.items()
+        },
+    )
+    registrar_evento("pedido_novo", pedido_id=pedido.pedido_id)
+    return pedido
+
+
+def opcoes_carga_pedido():
+    """Opções de carga em lote de itens (com o item do menu) e cliente do pedido."""
+    return (
+        selectinload(Pedido.itens).joinedload(PedidoItem.item),
+        joinedload(Pedido.cliente),
+    )
+
+
+def filtrar_pedidos(consulta, args):
+    """
+    Aplica à consulta os filtros de listagem (status, fechado, mesa, de, ate).
+    Lança ValueError se algum filtro for inválido.
+    """
+    if args.get("status"):
+        consulta = consulta.filter(Pedido.status.in_(args["status"].split(",")))
+    if args.get("fechado"):
+        consulta = consulta.filter(Pedido.fechado.is_(_ler_booleano(args["fechado"])))
+    if args.get("mesa"):
+        clientes_da_mesa = select(Cliente.cliente_id).where(
+            Cliente.mesa == int(args["mesa"])
+        )
+        consulta = consulta.filter(Pedido.cliente_id.in_(clientes_da_mesa))
+    if args.get("de"):
+        consulta = consulta.filter(Pedido.data_hora >= ler_data(args["de"]))
+    if args.get("ate"):
+        consulta = consulta.filter(Pedido.data_hora < ler_data(args["ate"], fim=True))
+    return consulta
+
+
 @orders_bp.route("/pedidos", methods=["POST"])
+@idempotente
 def criar_pedido():
     """
     Cria um novo pedido ou adiciona itens a um pedido existente para um cliente.
@@ -35,6 +273,11 @@ def criar_pedido():
     tags:
       - Pedidos
     parameters:
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave única por tentativa; repetições devolvem a mesma resposta
       - in: body
         name: body
         required: true
@@ -72,6 +315,10 @@ def criar_pedido():
         description: Dados inválidos ou item não encontrado
       404:
         description: Cliente não encontrado
+      409:
+        description: Conflito de concorrência ou chave ainda em andamento
+      422:
+        description: Idempotency-Key já usado com outro corpo
       500:
         description: Erro interno
     """
@@ -83,48 +330,65 @@ def criar_pedido():
         cliente = db.session.get(Cliente, data["cliente_id"])
         if not cliente:
             return jsonify({"error": "Cliente não encontrado"}), 404
-        # Verificar se já existe um pedido aberto para este cliente
-        pedido_existente = Pedido.query.filter_by(
-            cliente_id=data["cliente_id"], fechado=False
-        ).first()
-        if pedido_existente:
-            pedido = pedido_existente
-            pedido.status = STATUS_PEDIDO_COZINHA
-        else:
-            pedido = Pedido(
-                cliente_id=data["cliente_id"],
-                status=STATUS_PEDIDO_COZINHA,
-                total=Decimal("0.00"),
-                fechado=False,
-            )
-            db.session.add(pedido)
-            db.session.flush()  # Para obter o ID do pedido
-        # Adicionar itens
-        total_adicionado = Decimal("0.00")
+        # Consolidar quantidades por item (o payload pode repetir item_id)
+        quantidades = {}
         for item_data in data["itens"]:
-            item = db.session.get(Item, item_data["item_id"])
-            if not item:
+            if not isinstance(item_data, dict) or not CAMPOS_LINHA <= item_data.keys():
                 return (
-                    jsonify({"error": f'Item {item_data["item_id"]} não encontrado'}),
-                    404,
+                    jsonify({"error": "Cada item precisa de item_id e quantidade"}),
+                    400,
                 )
-            item_existente = PedidoItem.query.filter_by(
-                pedido_id=pedido.pedido_id, item_id=item_data["item_id"]
-            ).first()
-            if item_existente:
-                item_existente.quantidade += item_data["quantidade"]
-                total_adicionado += Decimal(str(item.preco)) * item_data["quantidade"]
-            else:
-                pedido_item = PedidoItem(
-                    pedido_id=pedido.pedido_id,
-                    item_id=item_data["item_id"],
-                    quantidade=item_data["quantidade"],
+            quantidade = item_data["quantidade"]
+            # bool é subclasse de int: true não vale como quantidade 1
+            if (
+                not isinstance(quantidade, int)
+                or isinstance(quantidade, bool)
+                or quantidade < 1
+            ):
+                return (
+                    jsonify({"error": "quantidade deve ser um inteiro positivo"}),
+                    400,
                 )
-                db.session.add(pedido_item)
-                total_adicionado += Decimal(str(item.preco)) * item_data["quantidade"]
-        pedido.total += total_adicionado
-        db.session.commit()
-        emitir_pedido_novo(current_app.socketio, pedido.to_dict())
+            item_id = item_data["item_id"]
+            if not isinstance(item_id, int) or isinstance(item_id, bool):
+                return jsonify({"error": "item_id deve ser um inteiro"}), 400
+            quantidades[item_id] = quantidades.get(item_id, 0) + quantidade
+        # Resolver todos os itens do menu em uma única consulta
+        itens = {}
+        if quantidades:
+            itens = {
+                item.item_id: item
+                for item in Item.query.filter(Item.item_id.in_(list(quantidades)))
+            }
+        for item_id in quantidades:
+            if item_id not in itens:
+                return jsonify({"error": f"Item {item_id} não encontrado"}), 404
+        precos = {item_id: item.preco for item_id, item in itens.items()}
+        # Compare-and-swap na versão do pedido: em conflito, refaz a transação
+        for tentativa in range(TENTATIVAS_CONCORRENCIA):
+            try:
+                pedido = _gravar_itens(data["cliente_id"], quantidades, precos)
+                db.session.commit()
+                break
+            except (StaleDataError, IntegrityError):
+                db.session.rollback()
+                if tentativa == TENTATIVAS_CONCORRENCIA - 1:
+                    return (
+                        jsonify(
+                            {
+                                "error": "Pedido alterado por outro dispositivo, "
+                                "tente novamente"
+                            }
+                        ),
+                        409,
+                    )
+                time.sleep(random.uniform(0, ESPERA_BASE_CONFLITO * 2**tentativa))
+        pedido = db.session.get(
+            Pedido,
+            pedido.pedido_id,
+            options=opcoes_carga_pedido(),
+            populate_existing=True,
+        )
         return (
             jsonify(
                 {
@@ -142,13 +406,59 @@ def criar_pedido():
 @orders_bp.route("/pedidos", methods=["GET"])
 def listar_pedidos():
     """
-    Listar todos os pedidos
+    Listar pedidos (mais recentes primeiro) com paginação por cursor e filtros.
     ---
     tags:
       - Pedidos
+    parameters:
+      - in: query
+        name: status
+        type: string
+        required: false
+        description: Um ou mais status separados por vírgula
+      - in: query
+        name: fechado
+        type: boolean
+        required: false
+      - in: query
+        name: mesa
+        type: integer
+        required: false
+        description: Número da mesa
+      - in: query
+        name: de
+        type: string
+        required: false
+        description: Data/hora inicial (ISO 8601, inclusiva)
+      - in: query
+        name: ate
+        type: string
+        required: false
+        description: Data/hora final (ISO 8601; datas sem hora incluem o dia inteiro)
+      - in: query
+        name: limite
+        type: integer
+        required: false
+        description: Tamanho da página (padrão 50, máximo 200)
+      - in: query
+        name: cursor
+        type: string
+        required: false
+        description: Valor de proximo_cursor retornado pela página anterior
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Campos do pedido separados por vírgula (ex. pedido_id,status,itens)
+      - in: query
+        name: itens
+        type: string
+        required: false
+        enum: [completo, ref]
+        description: ref referencia os itens por id e os inclui uma vez em "itens"
     responses:
       200:
-        description: Lista de pedidos
+        description: Página de pedidos
         schema:
           type: object
           properties:
@@ -156,12 +466,52 @@ def listar_pedidos():
               type: array
               items:
                 type: object
+            proximo_cursor:
+              type: string
+            itens:
+              type: object
+              description: Tabela item_id -> item (somente com itens=ref)
+      400:
+        description: Filtro, campo, limite ou cursor inválido
       500:
         description: Erro interno
     """
     try:
-        pedidos = Pedido.query.all()
-        return jsonify({"pedidos": [pedido.to_dict() for pedido in pedidos]}), 200
+        try:
+            limite = int(request.args.get("limite", LIMITE_PADRAO_PEDIDOS))
+            if limite < 1:
+                raise ValueError("limite deve ser positivo")
+            limite = min(limite, LIMITE_MAXIMO_PEDIDOS)
+            serializador = SerializadorPedidos.da_requisicao(request.args)
+            consulta = filtrar_pedidos(Pedido.query, request.args)
+            if request.args.get("cursor"):
+                data_hora, pedido_id = decodificar_cursor(request.args["cursor"])
+                consulta = consulta.filter(
+                    or_(
+                        Pedido.data_hora < data_hora,
+                        and_(
+                            Pedido.data_hora == data_hora, Pedido.pedido_id < pedido_id
+                        ),
+                    )
+                )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        # Tuplas de colunas e itens em lote: a página custa um número fixo de consultas
+        linhas = (
+            serializador.selecionar(consulta)
+            .order_by(Pedido.data_hora.desc(), Pedido.pedido_id.desc())
+            .limit(limite + 1)
+            .all()
+        )
+        proximo_cursor = None
+        if len(linhas) > limite:
+            linhas = linhas[:limite]
+            proximo_cursor = codificar_cursor(linhas[-1])
+        pedidos, itens = serializador.serializar(linhas)
+        resposta = {"pedidos": pedidos, "proximo_cursor": proximo_cursor}
+        if itens is not None:
+            resposta["itens"] = itens
+        return resposta_json(resposta)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -179,6 +529,17 @@ def obter_pedido(pedido_id):
         type: integer
         required: true
         description: ID do pedido
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Campos do pedido separados por vírgula (ex. pedido_id,status,itens)
+      - in: query
+        name: itens
+        type: string
+        required: false
+        enum: [completo, ref]
+        description: ref referencia os itens por id e os inclui uma vez em "itens"
     responses:
       200:
         description: Pedido encontrado
@@ -187,18 +548,31 @@ def obter_pedido(pedido_id):
           properties:
             pedido:
               type: object
+      400:
+        description: Campo inválido
       404:
         description: Pedido não encontrado
       500:
         description: Erro interno
     """
     try:
-        pedido = db.session.get(Pedido, pedido_id)
-
-        if not pedido:
+        try:
+            serializador = SerializadorPedidos.da_requisicao(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        linhas = (
+            serializador.selecionar(Pedido.query)
+            .filter(Pedido.pedido_id == pedido_id)
+            .all()
+        )
+        if not linhas:
             return jsonify({"error": "Pedido não encontrado"}), 404
 
-        return jsonify({"pedido": pedido.to_dict()}), 200
+        pedidos, itens = serializador.serializar(linhas)
+        resposta = {"pedido": pedidos[0]}
+        if itens is not None:
+            resposta["itens"] = itens
+        return resposta_json(resposta)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -207,7 +581,8 @@ def obter_pedido(pedido_id):
 @orders_bp.route("/pedidos/<int:pedido_id>/status", methods=["PUT"])
 def atualizar_status_pedido(pedido_id):
     """
-    Atualiza o status do pedido. Se status for 'Pago', libera a mesa (não remove mais o cliente).
+    Atualiza o status do pedido. Se status for 'Pago', libera a mesa (não remove mais o cliente);
+    'Pago' só é aceito sem saldo em aberto (pagamentos são registrados em /api/pagamentos).
     ---
     tags:
       - Pedidos
@@ -239,7 +614,7 @@ def atualizar_status_pedido(pedido_id):
             pedido:
               type: object
       400:
-        description: Status obrigatório
+        description: Status obrigatório ou pedido com saldo em aberto
       404:
         description: Pedido não encontrado
       500:
@@ -249,18 +624,29 @@ def atualizar_status_pedido(pedido_id):
         data = request.get_json()
         if not data or "status" not in data:
             return jsonify({"error": "Status é obrigatório"}), 400
-        pedido = db.session.get(Pedido, pedido_id)
+        pedido = db.session.get(Pedido, pedido_id, options=opcoes_carga_pedido())
         if not pedido:
             return jsonify({"error": "Pedido não encontrado"}), 404
+        pago = data["status"].lower() == STATUS_PEDIDO_PAGO.lower()
+        if pago and pedido.saldo > 0:
+            return (
+                jsonify(
+                    {
+                        "error": "Pedido tem saldo em aberto; registre o pagamento",
+                        "saldo": float(pedido.saldo),
+                    }
+                ),
+                400,
+            )
         pedido.status = data["status"]
         pedido_dict = pedido.to_dict()  # Salva antes de liberar/remover cliente
         # Se o status for 'Pago', liberar a mesa
-        if data["status"].lower() == STATUS_PEDIDO_PAGO.lower():
+        if pago:
             from routes.payment import liberar_mesa
 
             liberar_mesa(pedido.cliente)
+        registrar_evento("pedido_atualizado", pedido_id=pedido.pedido_id)
         db.session.commit()
-        emitir_pedido_atualizado(current_app.socketio, pedido_dict)
         return (
             jsonify(
                 {"message": "Status atualizado com sucesso", "pedido": pedido_dict}
@@ -272,6 +658,159 @@ def atualizar_status_pedido(pedido_id):
         return jsonify({"error": str(e)}), 500
 
 
+@orders_bp.route(
+    "/pedidos/<int:pedido_id>/itens/<int:item_id>/status", methods=["PATCH"]
+)
+def atualizar_status_linha(pedido_id, item_id):
+    """
+    Atualizar o status de uma linha do pedido (um prato) sem alterar o pedido
+    ---
+    tags:
+      - Pedidos
+    parameters:
+      - in: path
+        name: pedido_id
+        type: integer
+        required: true
+      - in: path
+        name: item_id
+        type: integer
+        required: true
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - status
+          properties:
+            status:
+              type: string
+              enum: [Na fila, Em preparo, Pronto]
+              example: Pronto
+    responses:
+      200:
+        description: Status da linha atualizado
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+            linha:
+              type: object
+      400:
+        description: Status inválido
+      404:
+        description: Linha não encontrada
+      500:
+        description: Erro interno
+    """
+    try:
+        data = request.get_json() or {}
+        if data.get("status") not in STATUS_LINHA:
+            return (
+                jsonify({"error": f"status deve ser um de: {', '.join(STATUS_LINHA)}"}),
+                400,
+            )
+        linha = db.session.get(PedidoItem, (pedido_id, item_id))
+        if not linha:
+            return jsonify({"error": "Item não encontrado no pedido"}), 404
+        definir_status_linha(linha, data["status"])
+        linha_dict = linha.to_dict_linha()
+        # Só a linha vai no evento; o pedido não é reescrito nem retransmitido
+        cliente_id, mesa = (
+            db.session.query(Pedido.cliente_id, Cliente.mesa)
+            .outerjoin(Cliente, Cliente.cliente_id == Pedido.cliente_id)
+            .filter(Pedido.pedido_id == pedido_id)
+            .one()
+        )
+        registrar_evento(
+            "pedido_item_atualizado",
+            dados={"linha": linha_dict, "cliente_id": cliente_id, "mesa": mesa},
+        )
+        db.session.commit()
+        return (
+            jsonify({"message": "Status do item atualizado", "linha": linha_dict}),
+            200,
+        )
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+
+@orders_bp.route("/pedidos/<int:pedido_id>/ajustes", methods=["PUT"])
+def ajustar_pedido(pedido_id):
+    """
+    Definir desconto e/ou taxa de serviço de um pedido aberto
+    ---
+    tags:
+      - Pedidos
+    parameters:
+      - in: path
+        name: pedido_id
+        type: integer
+        required: true
+        description: ID do pedido
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            desconto:
+              type: number
+              example: 5.00
+            percentual_servico:
+              type: number
+              example: 10
+    responses:
+      200:
+        description: Totais recalculados
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+            pedido:
+              type: object
+      400:
+        description: Valores inválidos ou pedido fechado
+      404:
+        description: Pedido não encontrado
+      500:
+        description: Erro interno
+    """
+    try:
+        data = request.get_json() or {}
+        if "desconto" not in data and "percentual_servico" not in data:
+            return (
+                jsonify({"error": "Informe desconto e/ou percentual_servico"}),
+                400,
+            )
+        pedido = db.session.get(Pedido, pedido_id, options=opcoes_carga_pedido())
+        if not pedido:
+            return jsonify({"error": "Pedido não encontrado"}), 404
+        if pedido.fechado:
+            return jsonify({"error": "Pedido já está fechado"}), 400
+        try:
+            definir_ajustes(
+                pedido,
+                desconto=data.get("desconto"),
+                percentual_servico=data.get("percentual_servico"),
+            )
+        except (ValueError, ArithmeticError) as e:
+            return jsonify({"error": str(e)}), 400
+        registrar_evento("pedido_atualizado", pedido_id=pedido.pedido_id)
+        db.session.commit()
+        return (
+            jsonify({"message": "Totais atualizados", "pedido": pedido.to_dict()}),
+            200,
+        )
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+
 @orders_bp.route("/pedidos/cliente/<int:cliente_id>", methods=["GET"])
 def obter_pedidos_cliente(cliente_id):
     """
@@ -285,6 +824,17 @@ def obter_pedidos_cliente(cliente_id):
         type: integer
         required: true
         description: ID do cliente
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Campos do pedido separados por vírgula (ex. pedido_id,status,itens)
+      - in: query
+        name: itens
+        type: string
+        required: false
+        enum: [completo, ref]
+        description: ref referencia os itens por id e os inclui uma vez em "itens"
     responses:
       200:
         description: Lista de pedidos do cliente
@@ -295,13 +845,27 @@ def obter_pedidos_cliente(cliente_id):
               type: array
               items:
                 type: object
+      400:
+        description: Campo inválido
       500:
         description: Erro interno
     """
     try:
-        pedidos = Pedido.query.filter_by(cliente_id=cliente_id).all()
-
-        return jsonify({"pedidos": [pedido.to_dict() for pedido in pedidos]}), 200
+        try:
+            serializador = SerializadorPedidos.da_requisicao(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        linhas = (
+            serializador.selecionar(Pedido.query)
+            .filter(Pedido.cliente_id == cliente_id)
+            .order_by(Pedido.pedido_id)
+            .all()
+        )
+        pedidos, itens = serializador.serializar(linhas)
+        resposta = {"pedidos": pedidos}
+        if itens is not None:
+            resposta["itens"] = itens
+        return resposta_json(resposta)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1,13 +1,27 @@
-from flask import Blueprint, request, jsonify
+import uuid
+from flask import Blueprint, request, jsonify, current_app
 from database import db
 from models import Pagamento, Pedido
-from datetime import datetime
+from idempotency import idempotente
+from payment.client import ErroGateway
+from payment.factory import GatewayNaoConfigurado, get_establishment_gateway
+from payment.reconciler import agendar_primeira_consulta
+from payment.ledger import (
+    dividir_igualmente,
+    dividir_por_itens,
+    valor_a_receber,
+    valor_disponivel,
+)
+from payment.settlement import STATUS_PENDENTE, confirmar_pagamento, travar_pedido
 
 payment_bp = Blueprint("payment", __name__)
 
 # --- Constantes de status ---
 STATUS_PEDIDO_PAGO = "Pago"
+STATUS_PEDIDO_AGUARDANDO_PAGAMENTO = "Aguardando Pagamento"
 STATUS_MESA_LIVRE = "livre"
+STATUS_MESA_OCUPADA = "ocupada"
+METODO_PIX = "PIX"
 
 
 # --- Função utilitária para liberar mesa ---
@@ -21,14 +35,47 @@ def liberar_mesa(cliente):
             mesa.status = STATUS_MESA_LIVRE
 
 
+def ocupar_mesa(cliente):
+    """Volta a ocupar a mesa do cliente (pedido pago que voltou a ter saldo)."""
+    from models import Mesa
+
+    if cliente:
+        mesa = Mesa.query.filter_by(numero=cliente.mesa).first()
+        if mesa:
+            mesa.status = STATUS_MESA_OCUPADA
+
+
+def conta_do_pedido(pedido):
+    """Saldo do pedido e seus pagamentos (valor_pago já vem acumulado no pedido)."""
+    pagamentos = (
+        Pagamento.query.filter_by(pedido_id=pedido.pedido_id)
+        .order_by(Pagamento.pagamento_id)
+        .all()
+    )
+    return {
+        "pedido_id": pedido.pedido_id,
+        "total": float(pedido.total or 0),
+        "valor_pago": float(pedido.valor_pago or 0),
+        "saldo": float(pedido.saldo),
+        "pagamentos": [pagamento.to_dict() for pagamento in pagamentos],
+    }
+
+
 @payment_bp.route("/pagamentos", methods=["POST"])
+@idempotente
 def criar_pagamento():
     """
-    Cria um novo pagamento e libera a mesa se necessário.
+    Registra um pagamento (total ou parcial) do pedido. O valor é abatido do
+    saldo; quando o saldo zera, o pedido é marcado como pago e a mesa liberada.
     ---
     tags:
       - Pagamentos
     parameters:
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave única por tentativa; repetições devolvem a mesma resposta
       - in: body
         name: body
         required: true
@@ -48,6 +95,7 @@ def criar_pagamento():
             valor:
               type: number
               example: 38.30
+              description: Até o saldo em aberto do pedido
     responses:
       201:
         description: Pagamento criado com sucesso
@@ -58,10 +106,16 @@ def criar_pagamento():
               type: string
             pagamento:
               type: object
+            saldo:
+              type: number
       400:
-        description: Dados inválidos, pedido já pago ou pedido não fechado
+        description: Dados inválidos, valor acima do saldo, pedido já quitado ou não fechado
       404:
         description: Pedido não encontrado
+      409:
+        description: Requisição com a mesma Idempotency-Key em andamento
+      422:
+        description: Idempotency-Key já usado com outro corpo
       500:
         description: Erro interno
     """
@@ -74,33 +128,149 @@ def criar_pagamento():
             or "valor" not in data
         ):
             return jsonify({"error": "pedido_id, metodo e valor são obrigatórios"}), 400
-        pedido = db.session.get(Pedido, data["pedido_id"])
+        # Travado: dois caixas não abatem o mesmo saldo ao mesmo tempo
+        pedido = travar_pedido(data["pedido_id"])
         if not pedido:
             return jsonify({"error": "Pedido não encontrado"}), 404
-        pagamento_existente = Pagamento.query.filter_by(
-            pedido_id=data["pedido_id"]
-        ).first()
-        if pagamento_existente:
-            return jsonify({"error": "Já existe pagamento para este pedido"}), 400
+        try:
+            valor = valor_a_receber(pedido, data["valor"])
+        except (ValueError, ArithmeticError) as e:
+            return jsonify({"error": str(e)}), 400
         if not pedido.fechado:
             return jsonify({"error": "Pedido deve estar fechado para pagamento"}), 400
         novo_pagamento = Pagamento(
-            pedido_id=data["pedido_id"], metodo=data["metodo"], valor=data["valor"]
+            pedido_id=pedido.pedido_id, metodo=data["metodo"], valor=valor
         )
         db.session.add(novo_pagamento)
-        pedido.status = STATUS_PEDIDO_PAGO
-        # Liberar a mesa
-        liberar_mesa(pedido.cliente)
+        # Saldo abatido, resumo do dia e evento; quitado, pedido pago e mesa livre
+        confirmar_pagamento(novo_pagamento)
         db.session.commit()
         return (
             jsonify(
                 {
                     "message": "Pagamento criado com sucesso",
                     "pagamento": novo_pagamento.to_dict(),
+                    "saldo": float(pedido.saldo),
+                }
+            ),
+            201,
+        )
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+
+@payment_bp.route("/pagamentos/pix", methods=["POST"])
+@idempotente
+def criar_pagamento_pix():
+    """
+    Cria uma cobrança PIX no gateway para o saldo do pedido (ou parte dele).
+    O pagamento fica pendente até a confirmação pelo webhook; só então o
+    valor é abatido do saldo.
+    ---
+    tags:
+      - Pagamentos
+    parameters:
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave única por tentativa; repetições devolvem a mesma resposta
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - pedido_id
+          properties:
+            pedido_id:
+              type: integer
+              example: 1
+            valor:
+              type: number
+              example: 20.00
+              description: Parte do saldo a cobrar (padrão todo o saldo em aberto)
+            email:
+              type: string
+              example: cliente@example.com
+              description: E-mail do pagador (padrão MERCADOPAGO_EMAIL_PAGADOR)
+    responses:
+      201:
+        description: Cobrança criada; exibir o QR code ao cliente
+        schema:
+          type: object
+          properties:
+            pagamento:
+              type: object
+            qr_code:
+              type: string
+            qr_code_base64:
+              type: string
+      400:
+        description: Dados inválidos, valor acima do saldo, pedido já quitado ou não fechado
+      404:
+        description: Pedido não encontrado
+      409:
+        description: Requisição com a mesma Idempotency-Key em andamento
+      422:
+        description: Idempotency-Key já usado com outro corpo
+      502:
+        description: Falha no gateway de pagamento
+      503:
+        description: Gateway de pagamento não configurado
+      500:
+        description: Erro interno
+    """
+    try:
+        data = request.get_json()
+        if not data or "pedido_id" not in data:
+            return jsonify({"error": "pedido_id é obrigatório"}), 400
+        pedido = db.session.get(Pedido, data["pedido_id"])
+        if not pedido:
+            return jsonify({"error": "Pedido não encontrado"}), 404
+        try:
+            valor = valor_a_receber(pedido, data.get("valor"))
+        except (ValueError, ArithmeticError) as e:
+            return jsonify({"error": str(e)}), 400
+        if not pedido.fechado:
+            return jsonify({"error": "Pedido deve estar fechado para pagamento"}), 400
+        config = current_app.config
+        cobranca = get_establishment_gateway().create_pix_payment(
+            valor,
+            f"Pedido {pedido.pedido_id}",
+            data.get("email") or config["MERCADOPAGO_EMAIL_PAGADOR"],
+            pedido.pedido_id,
+            chave_idempotencia=f"pix-{pedido.pedido_id}-{uuid.uuid4().hex}",
+            url_notificacao=config.get("MERCADOPAGO_URL_NOTIFICACAO"),
+        )
+        pagamento = Pagamento(
+            pedido_id=pedido.pedido_id,
+            metodo=METODO_PIX,
+            valor=valor,
+            status=STATUS_PENDENTE,
+            gateway_id=cobranca["gateway_id"],
+        )
+        # Reconciliação caso o webhook não chegue
+        agendar_primeira_consulta(pagamento)
+        db.session.add(pagamento)
+        db.session.commit()
+        return (
+            jsonify(
+                {
+                    "pagamento": pagamento.to_dict(),
+                    "qr_code": cobranca["qr_code"],
+                    "qr_code_base64": cobranca["qr_code_base64"],
                 }
             ),
             201,
         )
+    except GatewayNaoConfigurado as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 503
+    except ErroGateway as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 502
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
@@ -147,7 +317,7 @@ def obter_pagamento(pagamento_id):
 @payment_bp.route("/pagamentos/pedido/<int:pedido_id>", methods=["GET"])
 def obter_pagamento_por_pedido(pedido_id):
     """
-    Obter pagamento de um pedido específico
+    Obter pagamentos de um pedido específico, com o saldo em aberto
     ---
     tags:
       - Pagamentos
@@ -159,24 +329,126 @@ def obter_pagamento_por_pedido(pedido_id):
         description: ID do pedido
     responses:
       200:
-        description: Pagamento encontrado
+        description: Pagamentos encontrados
         schema:
           type: object
           properties:
             pagamento:
               type: object
+              description: Primeiro pagamento do pedido
+            pagamentos:
+              type: array
+              items:
+                type: object
+            total:
+              type: number
+            valor_pago:
+              type: number
+            saldo:
+              type: number
       404:
         description: Pagamento não encontrado
       500:
         description: Erro interno
     """
     try:
-        pagamento = Pagamento.query.filter_by(pedido_id=pedido_id).first()
+        pedido = db.session.get(Pedido, pedido_id)
+        conta = conta_do_pedido(pedido) if pedido else None
 
-        if not pagamento:
+        if not conta or not conta["pagamentos"]:
             return jsonify({"error": "Pagamento não encontrado"}), 404
 
-        return jsonify({"pagamento": pagamento.to_dict()}), 200
+        return jsonify({"pagamento": conta["pagamentos"][0], **conta}), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
+
+@payment_bp.route("/pagamentos/pedido/<int:pedido_id>/divisao", methods=["POST"])
+def dividir_conta(pedido_id):
+    """
+    Calcula a divisão da conta: em partes iguais do saldo disponível (sem PIX
+    pendentes) ou por itens, esta só antes do primeiro pagamento.
+    Cada parte é paga depois com POST /pagamentos do valor indicado.
+    ---
+    tags:
+      - Pagamentos
+    parameters:
+      - in: path
+        name: pedido_id
+        type: integer
+        required: true
+        description: ID do pedido
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            partes:
+              type: integer
+              example: 3
+              description: Divide o saldo em partes iguais
+            grupos:
+              type: array
+              description: Itens de cada pessoa; desconto e serviço rateados
+              items:
+                type: array
+                items:
+                  type: object
+                  properties:
+                    item_id:
+                      type: integer
+                    quantidade:
+                      type: integer
+    responses:
+      200:
+        description: Valor de cada parte
+        schema:
+          type: object
+          properties:
+            partes:
+              type: array
+              items:
+                type: number
+            restante:
+              type: number
+              description: Valor de itens não atribuídos (divisão por itens)
+            saldo:
+              type: number
+      400:
+        description: Informe partes ou grupos válidos; pedido com pagamentos não divide por itens
+      404:
+        description: Pedido não encontrado
+      500:
+        description: Erro interno
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        pedido = db.session.get(Pedido, pedido_id)
+        if not pedido:
+            return jsonify({"error": "Pedido não encontrado"}), 404
+        try:
+            if "grupos" in data:
+                if not isinstance(data["grupos"], list) or not data["grupos"]:
+                    raise ValueError("grupos deve ser uma lista não vazia")
+                partes, restante = dividir_por_itens(pedido, data["grupos"])
+            elif "partes" in data:
+                partes = dividir_igualmente(valor_disponivel(pedido), data["partes"])
+                restante = 0
+            else:
+                raise ValueError("Informe partes ou grupos")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return (
+            jsonify(
+                {
+                    "partes": [float(parte) for parte in partes],
+                    "restante": float(restante),
+                    "saldo": float(pedido.saldo),
+                }
+            ),
+            200,
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
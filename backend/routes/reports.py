@@ -0,0 +1,104 @@
+from datetime import date, datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app
+from reports import RELATORIOS, gerar_relatorio
+
+relatorios_bp = Blueprint("relatorios", __name__)
+
+# --- Constantes ---
+DIAS_PADRAO_RELATORIO = 30
+DIAS_MAXIMO_RELATORIO = 366
+
+
+def ler_periodo(args, hoje=None):
+    """(de, ate) a partir de ?de=&ate= (datas ISO). Lança ValueError se inválidos."""
+    hoje = hoje or datetime.utcnow().date()
+    ate = date.fromisoformat(args["ate"]) if args.get("ate") else hoje
+    if args.get("de"):
+        de = date.fromisoformat(args["de"])
+    else:
+        de = ate - timedelta(days=DIAS_PADRAO_RELATORIO - 1)
+    if de > ate:
+        raise ValueError("de deve ser anterior ou igual a ate")
+    if (ate - de).days + 1 > DIAS_MAXIMO_RELATORIO:
+        raise ValueError(f"O período máximo é de {DIAS_MAXIMO_RELATORIO} dias")
+    return de, ate
+
+
+@relatorios_bp.route("/relatorios", methods=["GET"])
+def listar_relatorios():
+    """
+    Lista os relatórios disponíveis.
+    ---
+    tags:
+      - Relatórios
+    responses:
+      200:
+        description: Nomes dos relatórios
+        schema:
+          type: object
+          properties:
+            relatorios:
+              type: array
+              items:
+                type: string
+    """
+    return jsonify({"relatorios": list(RELATORIOS)}), 200
+
+
+@relatorios_bp.route("/relatorios/<nome>", methods=["GET"])
+def obter_relatorio(nome):
+    """
+    Relatório agregado no banco para um período (padrão: últimos 30 dias).
+    ---
+    tags:
+      - Relatórios
+    parameters:
+      - in: path
+        name: nome
+        type: string
+        required: true
+        enum: [receita_por_dia, receita_por_hora, receita_por_dia_semana,
+               ticket_medio, itens_por_pedido, giro_mesas, mix_pagamentos]
+      - in: query
+        name: de
+        type: string
+        format: date
+        required: false
+        description: Primeiro dia do período (inclusive)
+      - in: query
+        name: ate
+        type: string
+        format: date
+        required: false
+        description: Último dia do período (inclusive, padrão hoje)
+    responses:
+      200:
+        description: Relatório
+        schema:
+          type: object
+          properties:
+            relatorio:
+              type: string
+            periodo:
+              type: object
+            dados:
+              type: object
+      400:
+        description: Período inválido
+      404:
+        description: Relatório não encontrado
+      500:
+        description: Erro interno
+    """
+    try:
+        if nome not in RELATORIOS:
+            return jsonify({"error": "Relatório não encontrado"}), 404
+        try:
+            de, ate = ler_periodo(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return current_app.response_class(
+            gerar_relatorio(nome, de, ate), mimetype="application/json"
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
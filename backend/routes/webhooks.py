@@ -0,0 +1,81 @@
+from flask import Blueprint, request, jsonify, current_app
+from payment.webhooks import (
+    TIPOS_SUPORTADOS,
+    FilaCheia,
+    assinatura_valida,
+    fila_webhooks,
+)
+
+webhooks_bp = Blueprint("webhooks", __name__)
+
+
+def ler_notificacao(corpo, args):
+    """(tipo, id) da notificação, do corpo JSON ou de ?type=&data.id=."""
+    corpo = corpo if isinstance(corpo, dict) else {}
+    tipo = corpo.get("type") or args.get("type") or args.get("topic")
+    dados = corpo.get("data") if isinstance(corpo.get("data"), dict) else {}
+    recurso_id = dados.get("id") or args.get("data.id") or args.get("id")
+    return tipo, recurso_id
+
+
+@webhooks_bp.route("/pagamentos/webhook", methods=["POST"])
+def receber_webhook():
+    """
+    Recebe notificações do gateway de pagamento e as enfileira para processamento.
+    ---
+    tags:
+      - Pagamentos
+    parameters:
+      - in: header
+        name: x-signature
+        type: string
+        required: false
+        description: Assinatura do Mercado Pago (exigida se houver segredo configurado)
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            type:
+              type: string
+              example: payment
+            data:
+              type: object
+              properties:
+                id:
+                  type: string
+                  example: "123456789"
+    responses:
+      200:
+        description: Notificação aceita (enfileirada, repetida ou ignorada)
+        schema:
+          type: object
+          properties:
+            enfileirado:
+              type: boolean
+      400:
+        description: Notificação sem tipo ou id
+      401:
+        description: Assinatura inválida
+      503:
+        description: Fila cheia; o gateway deve reenviar
+    """
+    tipo, recurso_id = ler_notificacao(request.get_json(silent=True), request.args)
+    if not tipo or not recurso_id:
+        return jsonify({"error": "Notificação sem tipo ou id"}), 400
+    segredo = current_app.config.get("MERCADOPAGO_WEBHOOK_SECRET")
+    if segredo and not assinatura_valida(
+        segredo,
+        request.headers.get("x-signature"),
+        request.headers.get("x-request-id"),
+        recurso_id,
+    ):
+        return jsonify({"error": "Assinatura inválida"}), 401
+    if tipo not in TIPOS_SUPORTADOS:
+        return jsonify({"enfileirado": False}), 200
+    try:
+        enfileirado = fila_webhooks.enfileirar(tipo, recurso_id)
+    except FilaCheia as e:
+        return jsonify({"error": str(e)}), 503
+    return jsonify({"enfileirado": enfileirado}), 200
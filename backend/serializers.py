@@ -0,0 +1,272 @@
+"""
+Serialização de respostas direto de tuplas de linhas.
+
+As listagens de pedidos selecionam apenas as colunas necessárias (sem
+instanciar objetos do ORM nem passar pelo identity map), convertem cada
+campo com conversores resolvidos uma única vez e codificam com orjson
+quando disponível (json da biblioteca padrão como fallback).
+
+Opções aceitas pelas rotas:
+- ``?fields=pedido_id,status,itens``: campos do pedido a incluir;
+- ``?itens=ref``: linhas referenciam o item por id e os itens vão uma única
+  vez na tabela ``itens`` da resposta, em vez de repetidos a cada linha.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import current_app, stream_with_context
+from sqlalchemy import select
+
+from database import db
+from models import Cliente, Item, Pedido, PedidoItem
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+
+def _padrao(valor):
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def codificar_json(dados):
+    """Codifica `dados` em bytes JSON (orjson, ou json da biblioteca padrão)."""
+    if orjson is not None:
+        return orjson.dumps(dados, default=_padrao, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        dados, default=_padrao, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def resposta_json(dados, status=200):
+    """Resposta Flask com o corpo já codificado por codificar_json."""
+    return current_app.response_class(
+        codificar_json(dados), status=status, mimetype="application/json"
+    )
+
+
+# --- Exportações em streaming ---
+FORMATOS_EXPORTACAO = ("csv", "ndjson")
+MIMETYPES_EXPORTACAO = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def linhas_ndjson(registros):
+    """Gera uma linha NDJSON (bytes) por registro, para respostas em streaming."""
+    for registro in registros:
+        yield codificar_json(registro) + b"\n"
+
+
+def linhas_csv(cabecalho, tuplas):
+    """Gera o CSV (bytes) linha a linha: cabeçalho e depois uma linha por tupla."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for linha in _com_cabecalho(cabecalho, tuplas):
+        escritor.writerow([_celula_csv(valor) for valor in linha])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _celula_csv(valor):
+    return valor.isoformat() if isinstance(valor, (datetime, date)) else valor
+
+
+def _com_cabecalho(cabecalho, tuplas):
+    yield cabecalho
+    yield from tuplas
+
+
+def resposta_streaming(formato, colunas, tuplas, nome_arquivo):
+    """
+    Resposta gerada linha a linha, em CSV ou NDJSON, a partir de tuplas na
+    ordem de `colunas` (tipicamente um Result com yield_per). A memória usada
+    não depende da quantidade de linhas.
+    """
+    if formato == "csv":
+        linhas = linhas_csv(colunas, tuplas)
+    else:
+        linhas = linhas_ndjson(dict(zip(colunas, tupla)) for tupla in tuplas)
+    resposta = current_app.response_class(
+        stream_with_context(linhas), mimetype=MIMETYPES_EXPORTACAO[formato]
+    )
+    resposta.headers["Content-Disposition"] = (
+        f"attachment; filename={nome_arquivo}.{formato}"
+    )
+    return resposta
+
+
+# --- Conversores de colunas ---
+def _iso(valor):
+    return valor.isoformat() if valor else None
+
+
+def _float_ou_zero(valor):
+    return float(valor) if valor else 0.0
+
+
+# (nome, coluna, conversor) na ordem do Pedido.to_dict
+COLUNAS_PEDIDO = (
+    ("pedido_id", Pedido.pedido_id, None),
+    ("cliente_id", Pedido.cliente_id, None),
+    ("status", Pedido.status, None),
+    ("data_hora", Pedido.data_hora, _iso),
+    ("subtotal", Pedido.subtotal, _float_ou_zero),
+    ("desconto", Pedido.desconto, _float_ou_zero),
+    ("percentual_servico", Pedido.percentual_servico, _float_ou_zero),
+    ("taxa_servico", Pedido.taxa_servico, _float_ou_zero),
+    ("total", Pedido.total, _float_ou_zero),
+    ("valor_pago", Pedido.valor_pago, _float_ou_zero),
+    ("saldo", Pedido.total - Pedido.valor_pago, _float_ou_zero),
+    ("fechado", Pedido.fechado, None),
+)
+COLUNAS_CLIENTE = (
+    Cliente.cliente_id.label("cliente_cliente_id"),
+    Cliente.nome.label("cliente_nome"),
+    Cliente.mesa.label("cliente_mesa"),
+)
+COLUNAS_LINHA = (
+    ("pedido_id", PedidoItem.pedido_id, None),
+    ("item_id", PedidoItem.item_id, None),
+    ("quantidade", PedidoItem.quantidade, None),
+    ("quantidade_pronta", PedidoItem.quantidade_pronta, None),
+    ("status", PedidoItem.status, None),
+    ("enfileirado_em", PedidoItem.enfileirado_em, _iso),
+    ("iniciado_em", PedidoItem.iniciado_em, _iso),
+    ("pronto_em", PedidoItem.pronto_em, _iso),
+)
+COLUNAS_ITEM = (
+    ("item_id", Item.item_id, None),
+    ("sku", Item.sku, None),
+    ("nome", Item.nome, None),
+    ("descricao", Item.descricao, None),
+    ("preco", Item.preco, float),
+    ("categoria_id", Item.categoria_id, None),
+)
+CAMPOS_PEDIDO = tuple(nome for nome, _, _ in COLUNAS_PEDIDO) + ("itens", "cliente")
+# Sempre lidos, mesmo fora de ?fields=: agrupam os itens e formam o cursor
+CAMPOS_CHAVE_PEDIDO = ("pedido_id", "data_hora")
+MODOS_ITENS = ("completo", "ref")
+
+
+def _converter(linha, conversores, inicio=0):
+    return {
+        nome: linha[inicio + i] if conversor is None else conversor(linha[inicio + i])
+        for i, (nome, _, conversor) in enumerate(conversores)
+    }
+
+
+class SerializadorPedidos:
+    """Monta a representação de pedidos a partir de tuplas, com campos selecionáveis."""
+
+    def __init__(self, campos=None, itens_ref=False):
+        campos = CAMPOS_PEDIDO if campos is None else tuple(campos)
+        desconhecidos = set(campos) - set(CAMPOS_PEDIDO)
+        if desconhecidos:
+            raise ValueError(f"Campos inválidos: {', '.join(sorted(desconhecidos))}")
+        self.itens_ref = itens_ref
+        self.incluir_itens = "itens" in campos
+        self.incluir_cliente = "cliente" in campos
+        # Só as colunas pedidas vão ao SELECT (pedido_id continua na posição 0)
+        lidas = [
+            coluna
+            for coluna in COLUNAS_PEDIDO
+            if coluna[0] in campos or coluna[0] in CAMPOS_CHAVE_PEDIDO
+        ]
+        self._colunas = tuple(coluna.label(nome) for nome, coluna, _ in lidas)
+        # Resolvido uma vez por requisição: (nome, posição na tupla, conversor)
+        self._escalares = tuple(
+            (nome, posicao, conversor)
+            for posicao, (nome, _, conversor) in enumerate(lidas)
+            if nome in campos
+        )
+
+    @classmethod
+    def da_requisicao(cls, args):
+        """Cria o serializador a partir de ?fields= e ?itens=. Lança ValueError."""
+        campos = None
+        if args.get("fields"):
+            campos = [campo.strip() for campo in args["fields"].split(",")]
+            campos = [campo for campo in campos if campo]
+        modo = args.get("itens", "completo")
+        if modo not in MODOS_ITENS:
+            raise ValueError(f"itens deve ser um de: {', '.join(MODOS_ITENS)}")
+        return cls(campos, itens_ref=modo == "ref")
+
+    def selecionar(self, consulta):
+        """Troca as entidades de uma consulta sobre Pedido pelas colunas necessárias."""
+        colunas = list(self._colunas)
+        if self.incluir_cliente:
+            colunas.extend(COLUNAS_CLIENTE)
+        consulta = consulta.with_entities(*colunas)
+        if self.incluir_cliente:
+            consulta = consulta.outerjoin(
+                Cliente, Cliente.cliente_id == Pedido.cliente_id
+            )
+        return consulta
+
+    def serializar(self, linhas):
+        """
+        Converte as tuplas de `selecionar` em dicts. Retorna (pedidos, itens),
+        onde `itens` é a tabela {item_id: item} com itens_ref e None sem.
+        """
+        pedidos = []
+        por_id = {}
+        inicio_cliente = len(self._colunas)
+        for linha in linhas:
+            pedido = {
+                nome: linha[posicao] if conversor is None else conversor(linha[posicao])
+                for nome, posicao, conversor in self._escalares
+            }
+            if self.incluir_itens:
+                pedido["itens"] = []
+                por_id[linha[0]] = pedido
+            if self.incluir_cliente:
+                pedido["cliente"] = (
+                    None
+                    if linha[inicio_cliente] is None
+                    else {
+                        "cliente_id": linha[inicio_cliente],
+                        "nome": linha[inicio_cliente + 1],
+                        "mesa": linha[inicio_cliente + 2],
+                    }
+                )
+            pedidos.append(pedido)
+        tabela = {}
+        if por_id:
+            self._carregar_itens(por_id, tabela)
+        return pedidos, (tabela if self.itens_ref else None)
+
+    def _carregar_itens(self, por_id, tabela):
+        # Uma consulta para as linhas de todos os pedidos da página
+        consulta = (
+            select(
+                *(coluna for _, coluna, _ in COLUNAS_LINHA),
+                *(coluna for _, coluna, _ in COLUNAS_ITEM),
+            )
+            .outerjoin(Item, Item.item_id == PedidoItem.item_id)
+            .where(PedidoItem.pedido_id.in_(list(por_id)))
+            .order_by(PedidoItem.pedido_id, PedidoItem.item_id)
+        )
+        inicio_item = len(COLUNAS_LINHA)
+        for linha in db.session.execute(consulta):
+            registro = _converter(linha, COLUNAS_LINHA)
+            item_id = registro["item_id"]
+            if item_id not in tabela:
+                tabela[item_id] = (
+                    None
+                    if linha[inicio_item] is None
+                    else _converter(linha, COLUNAS_ITEM, inicio_item)
+                )
+            if not self.itens_ref:
+                # O mesmo dict do item é reutilizado por todas as linhas que o citam
+                registro["item"] = tabela[item_id]
+            por_id[registro["pedido_id"]]["itens"].append(registro)
@@ -1,12 +1,24 @@
 import sys
 import os
+import threading
+import time
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Os testes drenam o outbox de eventos explicitamente (fixture drenar_eventos)
+os.environ["OUTBOX_DRENAGEM_AUTOMATICA"] = "0"
+# Idem para a fila de webhooks do gateway (testes chamam processar_lote)
+os.environ["WEBHOOKS_PROCESSAMENTO_AUTOMATICO"] = "0"
+os.environ["RECONCILIACAO_PIX_AUTOMATICA"] = "0"
 from app import app as flask_app
 
 import pytest
 
 
+# A suíte faz mais requisições por rota do que o limite padrão por hora
+for limiter in flask_app.extensions.get("limiter", ()):
+    limiter.enabled = False
+
+
 @pytest.fixture
 def app():
     yield flask_app
@@ -18,8 +30,139 @@ def client(app):
 
 
 @pytest.fixture(autouse=True)
-def _reset_db():
+def _reset_db(app):
     from database import db
+    from cache import menu_cache
+    from reports import relatorios_cache
+    from payment.webhooks import fila_webhooks
 
     db.drop_all()
     db.create_all()
+    menu_cache.invalidar()
+    relatorios_cache.limpar()
+    fila_webhooks.limpar()
+
+
+@pytest.fixture
+def drenar_eventos(app):
+    """Emite os eventos pendentes do outbox, como faria o drenador em segundo plano."""
+    from outbox import drenar
+
+    return lambda: drenar(app.socketio)
+
+
+@pytest.fixture
+def contar_consultas():
+    """Retorna um context manager que registra as instruções SQL executadas."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+    from database import db
+
+    @contextmanager
+    def _contar():
+        consultas = []
+
+        def _registrar(conn, cursor, statement, *args):
+            consultas.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", _registrar)
+        try:
+            yield consultas
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _registrar)
+
+    return _contar
+
+
+class GatewayFalso:
+    """
+    Adaptador em memória: cobranças PIX com IDs "mp-<pedido>" (repetições do
+    mesmo pedido ganham sufixo) e `status` fixo a cada consulta, respondida
+    após `atraso` segundos. Registra as consultas e quantas correm ao mesmo tempo.
+    """
+
+    def __init__(self, status="pending", atraso=0):
+        self.status = status
+        self.atraso = atraso
+        self.consultas = []
+        self.cobrancas = {}
+        self.em_andamento = 0
+        self.maximo_simultaneas = 0
+        self._lock = threading.Lock()
+
+    def create_pix_payment(self, valor, descricao, email, referencia, **kwargs):
+        with self._lock:
+            repeticoes = self.cobrancas.get(referencia, 0)
+            self.cobrancas[referencia] = repeticoes + 1
+        sufixo = f"-{repeticoes + 1}" if repeticoes else ""
+        return {
+            "gateway_id": f"mp-{referencia}{sufixo}",
+            "status": "pending",
+            "valor": float(valor),
+            "referencia_externa": str(referencia),
+            "qr_code": "000201...",
+            "qr_code_base64": "iVBOR...",
+        }
+
+    def get_payment_status(self, gateway_id):
+        with self._lock:
+            self.consultas.append(gateway_id)
+            self.em_andamento += 1
+            self.maximo_simultaneas = max(self.maximo_simultaneas, self.em_andamento)
+        time.sleep(self.atraso)
+        with self._lock:
+            self.em_andamento -= 1
+        return self.status
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    """GatewayFalso usado pelas rotas de pagamento no lugar do Mercado Pago."""
+    falso = GatewayFalso()
+    monkeypatch.setattr("routes.payment.get_establishment_gateway", lambda: falso)
+    return falso
+
+
+@pytest.fixture
+def criar_pedido(client):
+    """
+    Retorna criar(mesa, itens, ...) que cadastra mesa, cliente, itens e o
+    pedido com `itens` [(nome, preço, quantidade)]; com `fechar` o pedido é
+    fechado (após aplicar `percentual_servico`). Devolve (pedido, item_ids).
+    """
+
+    def criar(
+        mesa,
+        itens=(("Pizza", 30.0, 1),),
+        fechar=False,
+        percentual_servico=None,
+        nome="Cliente",
+    ):
+        client.post("/api/mesas", json={"numero": mesa, "capacidade": 4})
+        cliente = client.post("/api/cliente", json={"nome": nome, "mesa": mesa}).json
+        item_ids = [
+            client.post("/api/itens", json={"nome": item, "preco": preco}).json["item"][
+                "item_id"
+            ]
+            for item, preco, _ in itens
+        ]
+        pedido = client.post(
+            "/api/pedidos",
+            json={
+                "cliente_id": cliente["cliente"]["cliente_id"],
+                "itens": [
+                    {"item_id": item_id, "quantidade": quantidade}
+                    for item_id, (_, _, quantidade) in zip(item_ids, itens)
+                ],
+            },
+        ).json["pedido"]
+        url = f"/api/pedidos/{pedido['pedido_id']}"
+        if percentual_servico is not None:
+            client.put(
+                f"{url}/ajustes", json={"percentual_servico": percentual_servico}
+            )
+        if fechar:
+            pedido = client.post(f"{url}/fechar").json["pedido"]
+        return pedido, item_ids
+
+    return criar
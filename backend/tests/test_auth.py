@@ -38,3 +38,16 @@ def test_remover_cliente_inexistente(client):
     resp = client.delete("/api/cliente/99999")
     assert resp.status_code == 404
     assert "error" in resp.json
+
+
+def test_mesas_disponiveis_em_uma_consulta(client, contar_consultas):
+    for numero in (1, 2, 3):
+        client.post("/api/mesas", json={"numero": numero, "capacidade": 4})
+    client.post("/api/cliente", json={"nome": "Ocupante", "mesa": 2})
+    with contar_consultas() as consultas:
+        resp = client.get("/api/mesas/disponiveis")
+    assert resp.status_code == 200
+    assert [m["numero"] for m in resp.json["mesas_disponiveis"]] == [1, 3]
+    assert resp.json["total_mesas"] == 3
+    assert resp.json["total_disponiveis"] == 2
+    assert len(consultas) == 1
@@ -0,0 +1,38 @@
+from cache import CacheSnapshots, ContadorVersaoRedis
+
+
+class RedisFalso:
+    """Subconjunto de comandos do Redis usado pelo contador de versão."""
+
+    def __init__(self):
+        self.dados = {}
+
+    def get(self, chave):
+        return self.dados.get(chave)
+
+    def set(self, chave, valor, nx=False):
+        if nx and chave in self.dados:
+            return False
+        self.dados[chave] = valor
+        return True
+
+    def incr(self, chave):
+        self.dados[chave] = int(self.dados.get(chave, 0)) + 1
+        return self.dados[chave]
+
+
+def test_invalidacao_compartilhada_entre_workers():
+    redis = RedisFalso()
+    worker_a = CacheSnapshots("menu")
+    worker_b = CacheSnapshots("menu")
+    worker_a._contador = ContadorVersaoRedis(redis, "comandas:menu:versao")
+    worker_b._contador = ContadorVersaoRedis(redis, "comandas:menu:versao")
+
+    versao = worker_b.versao()
+    assert worker_b.obter("itens", versao, lambda: b"antigo") == b"antigo"
+    assert worker_b.obter("itens", versao, lambda: b"ignorado") == b"antigo"
+
+    worker_a.invalidar()
+    nova_versao = worker_b.versao()
+    assert nova_versao > versao
+    assert worker_b.obter("itens", nova_versao, lambda: b"novo") == b"novo"
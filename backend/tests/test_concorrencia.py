@@ -0,0 +1,78 @@
+import threading
+from decimal import Decimal
+
+from database import db
+from models import Pedido, PedidoItem
+from rollups import resumos_por_dia
+
+THREADS = 8
+REQUISICOES_POR_THREAD = 5
+
+
+def _preparar(client):
+    client.post("/api/mesas", json={"numero": 9501, "capacidade": 8})
+    cliente = client.post("/api/cliente", json={"nome": "Mesa cheia", "mesa": 9501})
+    itens = [
+        client.post("/api/itens", json={"nome": nome, "preco": preco}).json["item"]
+        for nome, preco in (("Chopp", 9.9), ("Porção", 32.5))
+    ]
+    return cliente.json["cliente"]["cliente_id"], [i["item_id"] for i in itens]
+
+
+def test_garcons_simultaneos_nao_perdem_itens(app):
+    cliente_id, (chopp, porcao) = _preparar(app.test_client())
+    status = []
+    inicio = threading.Barrier(THREADS)
+
+    def garcom():
+        client = app.test_client()
+        inicio.wait()
+        for _ in range(REQUISICOES_POR_THREAD):
+            resp = client.post(
+                "/api/pedidos",
+                json={
+                    "cliente_id": cliente_id,
+                    "itens": [
+                        {"item_id": chopp, "quantidade": 2},
+                        {"item_id": porcao, "quantidade": 1},
+                    ],
+                },
+            )
+            status.append(resp.status_code)
+
+    threads = [threading.Thread(target=garcom) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Sob contenção extrema uma requisição pode esgotar as tentativas (409);
+    # o que não pode acontecer é um item aceito se perder.
+    assert set(status) <= {201, 409}, status
+    aceitos = status.count(201)
+    assert aceitos >= 0.9 * THREADS * REQUISICOES_POR_THREAD, status
+    db.session.expire_all()
+    pedidos = Pedido.query.filter_by(cliente_id=cliente_id).all()
+    assert len(pedidos) == 1  # um único pedido aberto, mesmo com corrida na criação
+    pedido = pedidos[0]
+    linhas = {
+        linha.item_id: linha.quantidade
+        for linha in PedidoItem.query.filter_by(pedido_id=pedido.pedido_id)
+    }
+    assert linhas == {chopp: 2 * aceitos, porcao: aceitos}
+    assert pedido.subtotal == Decimal("52.30") * aceitos
+    assert pedido.total == pedido.subtotal
+    assert pedido.versao == aceitos
+    (resumo,) = resumos_por_dia(pedido.data_hora.date())
+    assert (resumo["pedidos"], resumo["itens_vendidos"]) == (1, 3 * aceitos)
+
+
+def test_versao_avanca_a_cada_alteracao(client):
+    cliente_id, (chopp, _) = _preparar(client)
+    corpo = {"cliente_id": cliente_id, "itens": [{"item_id": chopp, "quantidade": 1}]}
+    pedido_id = client.post("/api/pedidos", json=corpo).json["pedido"]["pedido_id"]
+    assert db.session.get(Pedido, pedido_id).versao == 1
+    client.post("/api/pedidos", json=corpo)
+    client.put(f"/api/itens/{chopp}", json={"preco": 10.0})
+    db.session.expire_all()
+    assert db.session.get(Pedido, pedido_id).versao == 3
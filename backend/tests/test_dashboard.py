@@ -0,0 +1,114 @@
+from datetime import datetime
+
+import pytest
+
+
+def _criar_pedido_pago(client, mesa, itens):
+    """Cria mesa, cliente e pedido com `itens` [(nome, preco, qtd)], fecha e paga."""
+    client.post("/api/mesas", json={"numero": mesa, "capacidade": 4})
+    cliente_resp = client.post("/api/cliente", json={"nome": "Dash", "mesa": mesa})
+    cliente_id = cliente_resp.json["cliente"]["cliente_id"]
+    linhas = []
+    for nome, preco, quantidade in itens:
+        item_resp = client.post("/api/itens", json={"nome": nome, "preco": preco})
+        linhas.append(
+            {"item_id": item_resp.json["item"]["item_id"], "quantidade": quantidade}
+        )
+    pedido_resp = client.post(
+        "/api/pedidos", json={"cliente_id": cliente_id, "itens": linhas}
+    )
+    pedido = pedido_resp.json["pedido"]
+    client.post(f"/api/pedidos/{pedido['pedido_id']}/fechar")
+    client.post(
+        "/api/pagamentos",
+        json={
+            "pedido_id": pedido["pedido_id"],
+            "metodo": "Dinheiro",
+            "valor": pedido["total"],
+        },
+    )
+    return pedido
+
+
+def test_resumo_dashboard(client):
+    _criar_pedido_pago(client, 5001, [("Pizza", 40.0, 1), ("Refri", 5.0, 4)])
+    _criar_pedido_pago(client, 5002, [("Lasanha", 30.0, 1)])
+    client.post("/api/mesas", json={"numero": 5003, "capacidade": 2})
+    client.post("/api/cliente", json={"nome": "Ocupa", "mesa": 5003})
+
+    resp = client.get("/api/dashboard/resumo")
+    assert resp.status_code == 200, resp.json
+    resumo = resp.json
+    assert resumo["receita"] == 90.0
+    assert resumo["pagamentos"] == 2
+    assert resumo["pedidos"] == 2
+    assert resumo["pedidos_pagos"] == 2
+    assert resumo["ticket_medio"] == 45.0
+    assert resumo["pedidos_por_status"] == {"Pago": 2}
+    assert resumo["pagamentos_pendentes"] == 0
+    assert resumo["mesas_ocupadas"] == 1
+    assert resumo["total_mesas"] == 3
+    assert [i["nome"] for i in resumo["mais_vendidos"]][0] == "Refri"
+    assert resumo["mais_vendidos"][0]["quantidade"] == 4
+
+
+def test_ticket_medio_por_pedido_pago(client):
+    client.post("/api/mesas", json={"numero": 5010, "capacidade": 2})
+    cliente_id = client.post(
+        "/api/cliente", json={"nome": "Parcial", "mesa": 5010}
+    ).json["cliente"]["cliente_id"]
+    item_id = client.post("/api/itens", json={"nome": "Pizza", "preco": 40.0}).json[
+        "item"
+    ]["item_id"]
+    pedido_id = client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": cliente_id,
+            "itens": [{"item_id": item_id, "quantidade": 1}],
+        },
+    ).json["pedido"]["pedido_id"]
+    client.post(f"/api/pedidos/{pedido_id}/fechar")
+    for valor in (10.0, 30.0):
+        client.post(
+            "/api/pagamentos",
+            json={"pedido_id": pedido_id, "metodo": "Dinheiro", "valor": valor},
+        )
+
+    resumo = client.get("/api/dashboard/resumo").json
+    assert resumo["pagamentos"] == 2 and resumo["pedidos_pagos"] == 1
+    assert resumo["ticket_medio"] == 40.0
+
+
+def test_resumo_soma_as_fatias_do_dia(client, monkeypatch):
+    from database import db
+    from models import ResumoDiario
+    from rollups import registrar_pagamento, resumos_por_dia
+
+    hoje = datetime.utcnow().date()
+    fatias = iter([1, 5, 1])
+    monkeypatch.setattr("rollups.random.randrange", lambda _: next(fatias))
+    for valor in (10, 20, 5):
+        registrar_pagamento(hoje, valor)
+    db.session.commit()
+    assert ResumoDiario.query.count() == 2
+    (resumo,) = resumos_por_dia(hoje)
+    assert (resumo["pagamentos"], resumo["receita"]) == (3, 35.0)
+    assert client.get("/api/dashboard/resumo").json["receita"] == 35.0
+
+
+def test_resumo_dashboard_dias_invalido(client):
+    assert client.get("/api/dashboard/resumo?dias=0").status_code == 400
+    assert client.get("/api/dashboard/resumo?dias=x").status_code == 400
+
+
+def test_reconstruir_resumos_igual_ao_incremental(app, client):
+    from database import db
+    from rollups import reconstruir_resumos
+
+    _criar_pedido_pago(client, 5004, [("Pastel", 8.0, 3)])
+    incremental = client.get("/api/dashboard/resumo").json
+    hoje = datetime.utcnow().date()
+    reconstruir_resumos(hoje, hoje)
+    db.session.commit()
+    reconstruido = client.get("/api/dashboard/resumo").json
+    assert reconstruido == incremental
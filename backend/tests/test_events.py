@@ -0,0 +1,198 @@
+import pytest
+
+from events import FeedEventos, calcular_delta_pedido
+
+
+def _pedido(status="Cozinha", total=10.0, itens=((1, 1),)):
+    return {
+        "pedido_id": 1,
+        "status": status,
+        "total": total,
+        "itens": [{"item_id": i, "quantidade": q} for i, q in itens],
+    }
+
+
+def test_delta_contem_apenas_o_que_mudou():
+    anterior = _pedido(itens=((1, 1), (2, 1)))
+    atual = _pedido(total=25.0, itens=((1, 2), (3, 1)))
+    delta = calcular_delta_pedido(anterior, atual)
+    assert delta["completo"] is False
+    assert delta["campos"] == {"total": 25.0}
+    assert delta["itens"] == [
+        {"item_id": 1, "quantidade": 2},
+        {"item_id": 3, "quantidade": 1},
+    ]
+    assert delta["itens_removidos"] == [2]
+
+
+def test_primeiro_evento_do_pedido_e_completo():
+    feed = FeedEventos()
+    envelope = feed.registrar_pedido("pedido_novo", _pedido(), ["cozinha"])
+    assert envelope["seq"] == 1
+    assert envelope["completo"] is True
+    envelope = feed.registrar_pedido(
+        "pedido_atualizado", _pedido(status="Pago"), ["cozinha"]
+    )
+    assert envelope["campos"] == {"status": "Pago"}
+    assert envelope["itens"] == []
+
+
+def test_retomada_pelo_buffer_circular():
+    feed = FeedEventos(tamanho=3)
+    for i in range(5):
+        feed.registrar("mesa_status", {"numero": i}, [f"mesa:{i}"])
+    assert [e["seq"] for _, e in feed.desde(3)] == [4, 5]
+    assert [e["seq"] for _, e in feed.desde(3, salas={"mesa:4"})] == [5]
+    assert feed.desde(5) == []
+    assert feed.desde(1) is None  # seq 2 já saiu do buffer
+    assert feed.desde(9) is None  # cliente à frente: servidor reiniciou
+
+
+def _criar_pedido(client, mesa):
+    client.post("/api/mesas", json={"numero": mesa, "capacidade": 2})
+    cliente = client.post("/api/cliente", json={"nome": "Feed", "mesa": mesa}).json
+    item = client.post("/api/itens", json={"nome": "Bolo", "preco": 5.0}).json
+    return client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": cliente["cliente"]["cliente_id"],
+            "itens": [{"item_id": item["item"]["item_id"], "quantidade": 1}],
+        },
+    ).json["pedido"]
+
+
+def test_eventos_de_pedido_vao_so_para_as_salas_interessadas(
+    app, client, drenar_eventos
+):
+    cozinha = app.socketio.test_client(app)
+    mesa_7 = app.socketio.test_client(app)
+    mesa_8 = app.socketio.test_client(app)
+    sem_sala = app.socketio.test_client(app)
+    assert cozinha.emit("entrar_sala", {"tipo": "cozinha"}, callback=True) == {
+        "sala": "cozinha"
+    }
+    mesa_7.emit("entrar_sala", {"tipo": "mesa", "id": 6007})
+    mesa_8.emit("entrar_sala", {"tipo": "mesa", "id": 6008})
+    for socket in (cozinha, mesa_7, mesa_8, sem_sala):
+        socket.get_received()
+
+    _criar_pedido(client, 6007)
+    drenar_eventos()
+
+    def nomes(socket):
+        return [r["name"] for r in socket.get_received()]
+
+    assert nomes(cozinha) == ["pedido_novo"]
+    assert nomes(mesa_7) == ["pedido_novo"]
+    assert nomes(mesa_8) == []
+    assert nomes(sem_sala) == []
+
+
+def test_entrar_sala_invalida(app):
+    socket = app.socketio.test_client(app)
+    assert "error" in socket.emit("entrar_sala", {"tipo": "vip"}, callback=True)
+    assert "error" in socket.emit(
+        "entrar_sala", {"tipo": "mesa", "id": "3"}, callback=True
+    )
+
+
+def test_entrar_sala_exige_equipe_ou_cliente_da_mesa(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "TOKEN_EQUIPE_SOCKET", "segredo")
+    client.post("/api/mesas", json={"numero": 6020, "capacidade": 2})
+    cliente_id = client.post("/api/cliente", json={"nome": "Sala", "mesa": 6020}).json[
+        "cliente"
+    ]["cliente_id"]
+
+    def entrar(socket, **dados):
+        return socket.emit("entrar_sala", dados, callback=True)
+
+    anonimo = app.socketio.test_client(app)
+    assert "error" in entrar(anonimo, tipo="cozinha")
+    assert "error" in entrar(anonimo, tipo="mesa", id=6020)
+    assert "error" in entrar(anonimo, tipo="mesa", id=6021, cliente_id=cliente_id)
+    assert "error" in entrar(
+        anonimo, tipo="cliente", id=cliente_id + 1, cliente_id=cliente_id
+    )
+    assert entrar(anonimo, tipo="mesa", id=6020, cliente_id=cliente_id) == {
+        "sala": "mesa:6020"
+    }
+    assert entrar(anonimo, tipo="cliente", id=cliente_id, cliente_id=cliente_id) == {
+        "sala": f"cliente:{cliente_id}"
+    }
+
+    intruso = app.socketio.test_client(app, auth={"token": "errado"})
+    assert "error" in entrar(intruso, tipo="caixa")
+    equipe = app.socketio.test_client(app, auth={"token": "segredo"})
+    assert entrar(equipe, tipo="caixa") == {"sala": "caixa"}
+    assert entrar(equipe, tipo="mesa", id=6021) == {"sala": "mesa:6021"}
+
+
+def test_socket_retomar_recebe_eventos_perdidos(app, client, drenar_eventos):
+    from events import feed
+
+    socket = app.socketio.test_client(app)
+    inicial = socket.get_received()[0]["args"][0]["seq"]
+    _criar_pedido(client, 6001)
+    drenar_eventos()
+
+    reconectado = app.socketio.test_client(app)
+    reconectado.emit("entrar_sala", {"tipo": "mesa", "id": 6001})
+    reconectado.get_received()
+    reconectado.emit("retomar", {"seq": inicial})
+    recebidos = reconectado.get_received()
+    assert [r["name"] for r in recebidos] == ["pedido_novo"]
+    assert recebidos[0]["args"][0]["seq"] == feed.seq_atual()
+
+    # Eventos de outras mesas não são reenviados
+    _criar_pedido(client, 6002)
+    drenar_eventos()
+    reconectado.get_received()
+    reconectado.emit("retomar", {"seq": feed.seq_atual() - 1})
+    assert reconectado.get_received() == []
+
+    reconectado.emit("retomar", {"seq": -5000})
+    assert reconectado.get_received()[0]["name"] == "resincronizar"
+
+
+def test_evento_so_e_emitido_apos_drenagem(app, client, drenar_eventos):
+    from models import EventoOutbox
+
+    cozinha = app.socketio.test_client(app)
+    cozinha.emit("entrar_sala", {"tipo": "cozinha"})
+    cozinha.get_received()
+
+    _criar_pedido(client, 6010)
+    assert cozinha.get_received() == []
+    assert EventoOutbox.query.count() == 1
+
+    assert drenar_eventos() == 1
+    assert [r["name"] for r in cozinha.get_received()] == ["pedido_novo"]
+    assert EventoOutbox.query.count() == 0
+
+
+def test_atualizacoes_do_mesmo_pedido_sao_agrupadas(app, client, drenar_eventos):
+    cozinha = app.socketio.test_client(app)
+    cozinha.emit("entrar_sala", {"tipo": "cozinha"})
+    cozinha.get_received()
+
+    pedido = _criar_pedido(client, 6011)
+    for status in ("Pronto", "Entregue"):
+        client.put(
+            f"/api/pedidos/{pedido['pedido_id']}/status", json={"status": status}
+        )
+
+    assert drenar_eventos() == 3
+    recebidos = cozinha.get_received()
+    assert [r["name"] for r in recebidos] == ["pedido_novo"]
+    assert recebidos[0]["args"][0]["campos"]["status"] == "Entregue"
+
+
+def test_rollback_descarta_o_evento(app, client, drenar_eventos):
+    from models import EventoOutbox
+    from database import db
+    from outbox import registrar_evento
+
+    registrar_evento("pedido_atualizado", pedido_id=1)
+    db.session.rollback()
+    assert EventoOutbox.query.count() == 0
+    assert drenar_eventos() == 0
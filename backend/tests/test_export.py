@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from database import db
+from models import Pagamento, Pedido
+
+
+def _pedido(client, mesa, quantidade, data_hora):
+    client.post("/api/mesas", json={"numero": mesa, "capacidade": 4})
+    cliente = client.post("/api/cliente", json={"nome": "Conta", "mesa": mesa}).json
+    item = client.post(
+        "/api/itens", json={"sku": f"SKU-{mesa}", "nome": "Prato", "preco": 20.0}
+    ).json["item"]
+    pedido_id = client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": cliente["cliente"]["cliente_id"],
+            "itens": [{"item_id": item["item_id"], "quantidade": quantidade}],
+        },
+    ).json["pedido"]["pedido_id"]
+    db.session.get(Pedido, pedido_id).data_hora = data_hora
+    db.session.commit()
+    return pedido_id
+
+
+def _ler_csv(resp):
+    return list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+
+
+def test_exporta_pedidos_em_csv_filtrando_por_data(client):
+    setembro = _pedido(client, 9801, 1, datetime(2026, 9, 30, 23, 0))
+    outubro = _pedido(client, 9802, 2, datetime(2026, 10, 1, 12, 0))
+    _pedido(client, 9803, 3, datetime(2026, 11, 1, 0, 0))
+    resp = client.get("/api/export/pedidos?de=2026-10-01&ate=2026-10-31")
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.mimetype == "text/csv"
+    linhas = _ler_csv(resp)
+    assert [int(linha["pedido_id"]) for linha in linhas] == [outubro]
+    assert linhas[0]["data_hora"] == "2026-10-01T12:00:00"
+    assert (linhas[0]["mesa"], linhas[0]["total"]) == ("9802", "40.00")
+    todos = _ler_csv(client.get("/api/export/pedidos"))
+    assert int(todos[0]["pedido_id"]) == setembro
+    assert len(todos) == 3
+
+
+def test_exporta_linhas_dos_pedidos_em_ndjson(client):
+    pedido_id = _pedido(client, 9804, 2, datetime(2026, 10, 5))
+    resp = client.get("/api/export/pedidos?formato=ndjson&detalhe=itens")
+    assert resp.mimetype == "application/x-ndjson"
+    registros = [json.loads(linha) for linha in resp.get_data().splitlines()]
+    assert registros == [
+        {
+            "pedido_id": pedido_id,
+            "data_hora": "2026-10-05T00:00:00",
+            "status": "Cozinha",
+            "item_id": registros[0]["item_id"],
+            "sku": "SKU-9804",
+            "nome": "Prato",
+            "quantidade": 2,
+            "preco": 20.0,
+        }
+    ]
+
+
+def test_exporta_pagamentos(client):
+    pedido_id = _pedido(client, 9805, 1, datetime(2026, 10, 5))
+    client.post(f"/api/pedidos/{pedido_id}/fechar")
+    client.post(
+        "/api/pagamentos",
+        json={"pedido_id": pedido_id, "metodo": "Pix", "valor": 20.0},
+    )
+    pagamento = Pagamento.query.one()
+    pagamento.data_hora = datetime(2026, 10, 6, 9, 30)
+    db.session.commit()
+    resp = client.get("/api/export/pagamentos?formato=ndjson&de=2026-10-06")
+    registros = [json.loads(linha) for linha in resp.get_data().splitlines()]
+    assert [(r["pedido_id"], r["metodo"], r["valor"]) for r in registros] == [
+        (pedido_id, "Pix", 20.0)
+    ]
+    vazio = client.get("/api/export/pagamentos?ate=2026-10-05")
+    assert _ler_csv(vazio) == []
+
+
+def test_parametros_invalidos(client):
+    assert client.get("/api/export/pedidos?formato=xml").status_code == 400
+    assert client.get("/api/export/pedidos?detalhe=tudo").status_code == 400
+    assert client.get("/api/export/pagamentos?de=ontem").status_code == 400
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from payment import (
+    AsyncMercadoPagoAdapter,
+    CircuitoAberto,
+    ClienteHTTPGateway,
+    DisjuntorCircuito,
+    ErroGateway,
+    MercadoPagoAdapter,
+    PaymentGatewayBase,
+)
+
+PAGAMENTO_PIX = {
+    "id": 123,
+    "status": "pending",
+    "transaction_amount": 50.0,
+    "external_reference": "7",
+    "point_of_interaction": {
+        "transaction_data": {"qr_code": "000201...", "qr_code_base64": "iVBOR..."}
+    },
+}
+
+
+class _GatewayFalso(BaseHTTPRequestHandler):
+    """Responde conforme a fila `roteiro` do servidor; registra cada chamada."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self):
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        corpo = self.rfile.read(tamanho) if tamanho else b""
+        servidor = self.server
+        servidor.chamadas.append(
+            {
+                "metodo": self.command,
+                "caminho": self.path,
+                "porta_cliente": self.client_address[1],
+                "cabecalhos": dict(self.headers),
+                "corpo": json.loads(corpo) if corpo else None,
+            }
+        )
+        status, dados, atraso = (
+            servidor.roteiro.pop(0) if servidor.roteiro else (200, PAGAMENTO_PIX, 0)
+        )
+        if atraso:
+            time.sleep(atraso)
+        saida = json.dumps(dados).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(saida)))
+        self.end_headers()
+        self.wfile.write(saida)
+
+    do_GET = _responder
+    do_POST = _responder
+
+
+@pytest.fixture
+def gateway():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _GatewayFalso)
+    servidor.daemon_threads = True
+    servidor.chamadas = []
+    servidor.roteiro = []
+    servidor.url = f"http://127.0.0.1:{servidor.server_address[1]}"
+    threading.Thread(
+        target=servidor.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    ).start()
+    yield servidor
+    ClienteHTTPGateway.fechar_sessoes()
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _cliente(gateway, **opcoes):
+    opcoes.setdefault("dormir", lambda _: None)
+    opcoes.setdefault("disjuntor", DisjuntorCircuito())
+    return ClienteHTTPGateway(gateway.url, "token-teste", **opcoes)
+
+
+def test_chamadas_reutilizam_conexao_keep_alive(gateway):
+    adaptador = MercadoPagoAdapter(
+        "token-teste", url_base=gateway.url, dormir=lambda _: None
+    )
+    for _ in range(5):
+        assert adaptador.get_payment_status("123") == "pending"
+    # Mesmo socket de origem: a conexão do pool foi reaproveitada
+    assert len({c["porta_cliente"] for c in gateway.chamadas}) == 1
+    assert gateway.chamadas[0]["cabecalhos"]["Authorization"] == "Bearer token-teste"
+
+
+def test_create_pix_payment_envia_chave_e_resume_resposta(gateway):
+    adaptador = MercadoPagoAdapter("token-teste", url_base=gateway.url)
+    pagamento = adaptador.create_pix_payment(
+        50, "Pedido 7", "cliente@example.com", 7, chave_idempotencia="pedido-7"
+    )
+    assert pagamento == {
+        "gateway_id": "123",
+        "status": "pending",
+        "valor": 50.0,
+        "referencia_externa": "7",
+        "qr_code": "000201...",
+        "qr_code_base64": "iVBOR...",
+    }
+    chamada = gateway.chamadas[0]
+    assert chamada["metodo"] == "POST" and chamada["caminho"] == "/v1/payments"
+    assert chamada["cabecalhos"]["X-Idempotency-Key"] == "pedido-7"
+    assert chamada["corpo"]["payment_method_id"] == "pix"
+
+
+def test_create_credit_card_payment_envia_token_e_parcelas(gateway):
+    adaptador = MercadoPagoAdapter("token-teste", url_base=gateway.url)
+    assert isinstance(adaptador, PaymentGatewayBase)
+    adaptador.create_credit_card_payment(
+        120, "tok-1", installments=3, description="Pedido 9", payment_method_id="visa"
+    )
+    corpo = gateway.chamadas[0]["corpo"]
+    assert corpo["token"] == "tok-1" and corpo["installments"] == 3
+    assert corpo["payment_method_id"] == "visa"
+    assert corpo["transaction_amount"] == 120.0
+    with pytest.raises(ValueError):
+        adaptador.create_payment(10, currency="USD")
+
+
+def test_handle_webhook_consulta_status_do_pagamento(gateway):
+    adaptador = MercadoPagoAdapter("token-teste", url_base=gateway.url)
+    assert adaptador.handle_webhook({"type": "payment", "data": {"id": 123}}) == {
+        "status": "processed",
+        "notification_type": "payment",
+        "payment_id": "123",
+        "payment_status": "pending",
+    }
+    assert adaptador.handle_webhook({"data": {}})["status"] == "error"
+    assert gateway.chamadas[0]["caminho"] == "/v1/payments/123"
+
+
+def test_timeout_de_leitura_e_repetido(gateway):
+    gateway.roteiro = [(200, PAGAMENTO_PIX, 0.5)]
+    cliente = _cliente(gateway, timeout_leitura=0.1)
+    assert cliente.requisitar("GET", "/v1/payments/123")["id"] == 123
+    assert len(gateway.chamadas) == 2
+
+
+def test_erro_5xx_repetido_ate_esgotar_tentativas(gateway):
+    gateway.roteiro = [(502, {}, 0)] * 3
+    cliente = _cliente(gateway, tentativas=3)
+    with pytest.raises(ErroGateway) as erro:
+        cliente.requisitar("GET", "/v1/payments/123")
+    assert erro.value.status == 502
+    assert len(gateway.chamadas) == 3
+
+
+def test_post_sem_chave_de_idempotencia_nao_e_repetido(gateway):
+    gateway.roteiro = [(503, {}, 0)]
+    cliente = _cliente(gateway)
+    with pytest.raises(ErroGateway):
+        cliente.requisitar("POST", "/v1/payments", json={})
+    assert len(gateway.chamadas) == 1
+
+
+def test_erro_4xx_nao_e_repetido(gateway):
+    gateway.roteiro = [(400, {"message": "invalid"}, 0)]
+    cliente = _cliente(gateway)
+    with pytest.raises(ErroGateway) as erro:
+        cliente.requisitar("GET", "/v1/payments/123")
+    assert erro.value.status == 400
+    assert len(gateway.chamadas) == 1
+
+
+def test_disjuntor_abre_e_depois_deixa_passar_chamada_de_teste(gateway):
+    agora = [0.0]
+    disjuntor = DisjuntorCircuito(
+        limite_falhas=2, tempo_abertura=30, relogio=lambda: agora[0]
+    )
+    cliente = _cliente(gateway, tentativas=1, disjuntor=disjuntor)
+    gateway.roteiro = [(500, {}, 0)] * 2
+    for _ in range(2):
+        with pytest.raises(ErroGateway):
+            cliente.requisitar("GET", "/v1/payments/123")
+    assert disjuntor.estado == DisjuntorCircuito.ABERTO
+
+    # Aberto: falha sem chegar ao gateway
+    with pytest.raises(CircuitoAberto):
+        cliente.requisitar("GET", "/v1/payments/123")
+    assert len(gateway.chamadas) == 2
+
+    agora[0] = 31
+    assert disjuntor.estado == DisjuntorCircuito.MEIO_ABERTO
+    assert cliente.requisitar("GET", "/v1/payments/123")["id"] == 123
+    assert disjuntor.estado == DisjuntorCircuito.FECHADO
+
+
+def test_disjuntor_compartilhado_por_gateway_e_token(gateway):
+    a = ClienteHTTPGateway(gateway.url, "token-a")
+    b = ClienteHTTPGateway(gateway.url, "token-a")
+    c = ClienteHTTPGateway(gateway.url, "token-b")
+    assert a.disjuntor is b.disjuntor
+    assert a.disjuntor is not c.disjuntor
+
+
+def test_adaptador_async_consulta_em_paralelo(gateway):
+    adaptador = AsyncMercadoPagoAdapter(
+        "token-teste", url_base=gateway.url, dormir=lambda _: None
+    )
+
+    async def consultar():
+        try:
+            return await asyncio.gather(
+                *(adaptador.get_payment_status(str(i)) for i in range(5))
+            )
+        finally:
+            await adaptador.fechar()
+
+    assert asyncio.run(consultar()) == ["pending"] * 5
+    assert {c["caminho"] for c in gateway.chamadas} == {
+        f"/v1/payments/{i}" for i in range(5)
+    }
@@ -0,0 +1,116 @@
+import pytest
+
+from database import db
+from models import Establishment
+from payment import ClienteHTTPGateway, MercadoPagoAdapter
+from payment.factory import GatewayNaoConfigurado, RegistroGateways, gateways
+
+
+@pytest.fixture
+def registro():
+    agora = [0.0]
+    consultas = []
+    credenciais = {1: "token-1", 2: "token-2"}
+
+    def fonte(estabelecimento_id):
+        consultas.append(estabelecimento_id)
+        token = credenciais.get(estabelecimento_id)
+        return token and {
+            "gateway": "mercadopago",
+            "token": token,
+            "url_base": "http://gateway.local",
+            "opcoes": {},
+        }
+
+    registro = RegistroGateways(ttl=60, relogio=lambda: agora[0])
+    registro.registrar(
+        "mercadopago", lambda c: MercadoPagoAdapter(c["token"], c["url_base"])
+    )
+    registro.fonte_credenciais = fonte
+    registro.agora, registro.consultas, registro.credenciais = (
+        agora,
+        consultas,
+        credenciais,
+    )
+    yield registro
+    ClienteHTTPGateway.fechar_sessoes()
+
+
+def test_adaptador_reaproveitado_sem_consultar_credencial(registro):
+    adaptador = registro.obter(1)
+    assert registro.obter(1) is adaptador
+    assert registro.obter(2) is not adaptador
+    assert registro.consultas == [1, 2]
+
+
+def test_ttl_expirado_relê_credencial(registro):
+    adaptador = registro.obter(1)
+    registro.agora[0] = 61
+    novo = registro.obter(1)
+    assert registro.consultas == [1, 1]
+    # Mesma credencial: o pool de conexões do token continua o mesmo
+    assert novo.cliente.sessao is adaptador.cliente.sessao
+
+
+def test_troca_de_credencial_fecha_conexoes_antigas(registro):
+    antigo = registro.obter(1)
+    sessao_antiga = antigo.cliente.sessao
+    registro.credenciais[1] = "token-novo"
+    registro.invalidar(1)
+    novo = registro.obter(1)
+    assert novo is not antigo
+    assert novo.cliente.token == "token-novo"
+    assert ("http://gateway.local", "token-1") not in ClienteHTTPGateway._sessoes
+    assert novo.cliente.sessao is not sessao_antiga
+
+
+def test_estabelecimento_sem_credencial(registro):
+    with pytest.raises(GatewayNaoConfigurado):
+        registro.obter(99)
+
+
+def test_gateway_registrado_por_nome(registro):
+    class GatewayTeste:
+        def __init__(self, credencial):
+            self.credencial = credencial
+
+    registro.registrar("teste", GatewayTeste)
+    registro.fonte_credenciais = lambda _: {"gateway": "teste", "token": "t"}
+    assert isinstance(registro.obter(3), GatewayTeste)
+    assert "teste" in registro.nomes
+
+    registro.fonte_credenciais = lambda _: {"gateway": "outro", "token": "t"}
+    with pytest.raises(GatewayNaoConfigurado):
+        registro.obter(4)
+
+
+def test_registro_padrao_usa_configuracao(app, monkeypatch):
+    monkeypatch.setitem(app.config, "MERCADOPAGO_ACCESS_TOKEN", "token-config")
+    gateways.invalidar()
+    try:
+        with app.app_context():
+            adaptador = gateways.obter()
+            assert isinstance(adaptador, MercadoPagoAdapter)
+            assert adaptador.cliente.token == "token-config"
+            assert gateways.obter() is adaptador
+    finally:
+        gateways.invalidar()
+
+
+def test_registro_padrao_le_credencial_do_estabelecimento(app):
+    db.session.add_all(
+        [
+            Establishment(id=1, payment_gateway="mercadopago", mp_access_token="t-1"),
+            Establishment(id=2, payment_gateway="mercadopago", mp_access_token="t-2"),
+        ]
+    )
+    db.session.commit()
+    gateways.invalidar()
+    try:
+        with app.app_context():
+            assert gateways.obter(1).cliente.token == "t-1"
+            assert gateways.obter(2).cliente.token == "t-2"
+            with pytest.raises(GatewayNaoConfigurado):
+                gateways.obter(3)
+    finally:
+        gateways.invalidar()
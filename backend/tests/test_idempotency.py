@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta
+
+from database import db
+from idempotency import limpar_expiradas, validade_reserva
+from models import ChaveIdempotencia, PedidoItem
+
+
+def _preparar(client):
+    client.post("/api/mesas", json={"numero": 9601, "capacidade": 4})
+    cliente = client.post("/api/cliente", json={"nome": "Wi-Fi ruim", "mesa": 9601})
+    item = client.post("/api/itens", json={"nome": "Suco", "preco": 8.0})
+    return cliente.json["cliente"]["cliente_id"], item.json["item"]["item_id"]
+
+
+def _corpo(cliente_id, item_id, quantidade=2):
+    return {
+        "cliente_id": cliente_id,
+        "itens": [{"item_id": item_id, "quantidade": quantidade}],
+    }
+
+
+def test_repeticao_devolve_resposta_sem_duplicar_itens(client, contar_consultas):
+    cliente_id, item_id = _preparar(client)
+    cabecalhos = {"Idempotency-Key": "tablet-1-req-1"}
+    primeira = client.post(
+        "/api/pedidos", json=_corpo(cliente_id, item_id), headers=cabecalhos
+    )
+    assert primeira.status_code == 201
+    with contar_consultas() as consultas:
+        repetida = client.post(
+            "/api/pedidos", json=_corpo(cliente_id, item_id), headers=cabecalhos
+        )
+    assert repetida.status_code == 201
+    assert repetida.headers["Idempotent-Replayed"] == "true"
+    assert repetida.get_data() == primeira.get_data()
+    assert repetida.headers["Repr-Digest"] == primeira.headers["Repr-Digest"]
+    # Só a leitura da chave: nenhuma consulta às tabelas de pedidos
+    assert not any("pedido" in consulta for consulta in consultas), consultas
+    assert PedidoItem.query.one().quantidade == 2
+
+
+def test_chaves_diferentes_sao_requisicoes_diferentes(client):
+    cliente_id, item_id = _preparar(client)
+    for chave in ("a", "b"):
+        resp = client.post(
+            "/api/pedidos",
+            json=_corpo(cliente_id, item_id),
+            headers={"Idempotency-Key": chave},
+        )
+        assert resp.status_code == 201
+    assert PedidoItem.query.one().quantidade == 4
+
+
+def test_mesma_chave_com_outro_corpo_retorna_422(client):
+    cliente_id, item_id = _preparar(client)
+    cabecalhos = {"Idempotency-Key": "k"}
+    client.post("/api/pedidos", json=_corpo(cliente_id, item_id), headers=cabecalhos)
+    resp = client.post(
+        "/api/pedidos", json=_corpo(cliente_id, item_id, 5), headers=cabecalhos
+    )
+    assert resp.status_code == 422
+    assert PedidoItem.query.one().quantidade == 2
+
+
+def test_chave_em_andamento_retorna_409(client):
+    cliente_id, item_id = _preparar(client)
+    cabecalhos = {"Idempotency-Key": "k"}
+    client.post("/api/pedidos", json=_corpo(cliente_id, item_id), headers=cabecalhos)
+    # Simula a primeira requisição ainda sem resposta gravada
+    ChaveIdempotencia.query.update({"status_code": None, "corpo": None})
+    db.session.commit()
+    resp = client.post(
+        "/api/pedidos", json=_corpo(cliente_id, item_id), headers=cabecalhos
+    )
+    assert resp.status_code == 409
+    # Reserva abandonada (worker caiu) pode ser retomada
+    ChaveIdempotencia.query.update(
+        {"criado_em": datetime.utcnow() - timedelta(minutes=5)}
+    )
+    db.session.commit()
+    resp = client.post(
+        "/api/pedidos", json=_corpo(cliente_id, item_id), headers=cabecalhos
+    )
+    assert resp.status_code == 201
+    assert PedidoItem.query.one().quantidade == 4
+
+
+def test_erros_de_servidor_liberam_a_chave(client, monkeypatch):
+    cabecalhos = {"Idempotency-Key": "k"}
+    resp = client.post("/api/pedidos", json={"cliente_id": 1}, headers=cabecalhos)
+    assert resp.status_code == 400
+    # 400 é determinístico: a repetição devolve a mesma resposta gravada
+    resp = client.post("/api/pedidos", json={"cliente_id": 1}, headers=cabecalhos)
+    assert resp.headers.get("Idempotent-Replayed") == "true"
+    cliente_id, item_id = _preparar(client)
+
+    def falhar(*args, **kwargs):
+        raise RuntimeError("falha inesperada")
+
+    monkeypatch.setattr("routes.orders.somar_linhas", falhar)
+    corpo = _corpo(cliente_id, item_id)
+    resp = client.post("/api/pedidos", json=corpo, headers={"Idempotency-Key": "z"})
+    assert resp.status_code == 500
+    assert db.session.get(ChaveIdempotencia, ("POST /api/pedidos", "z")) is None
+
+
+def test_pagamento_repetido_nao_vira_erro(client):
+    cliente_id, item_id = _preparar(client)
+    pedido = client.post("/api/pedidos", json=_corpo(cliente_id, item_id)).json
+    pedido_id = pedido["pedido"]["pedido_id"]
+    client.post(f"/api/pedidos/{pedido_id}/fechar")
+    corpo = {"pedido_id": pedido_id, "metodo": "Pix", "valor": 16.0}
+    cabecalhos = {"Idempotency-Key": "pagto-1"}
+    primeira = client.post("/api/pagamentos", json=corpo, headers=cabecalhos)
+    repetida = client.post("/api/pagamentos", json=corpo, headers=cabecalhos)
+    assert (primeira.status_code, repetida.status_code) == (201, 201)
+    assert repetida.json == primeira.json
+    # Sem a chave, o segundo pagamento continua sendo recusado
+    assert client.post("/api/pagamentos", json=corpo).status_code == 400
+
+
+def test_chave_expirada_e_removida_e_reprocessada(client):
+    cliente_id, item_id = _preparar(client)
+    cabecalhos = {"Idempotency-Key": "k"}
+    client.post("/api/pedidos", json=_corpo(cliente_id, item_id), headers=cabecalhos)
+    depois = datetime.utcnow() + timedelta(days=2)
+    ChaveIdempotencia.query.update({"expira_em": depois - timedelta(days=1)})
+    db.session.commit()
+    assert limpar_expiradas(agora=depois) == 1
+    resp = client.post(
+        "/api/pedidos", json=_corpo(cliente_id, item_id), headers=cabecalhos
+    )
+    assert "Idempotent-Replayed" not in resp.headers
+    assert PedidoItem.query.one().quantidade == 4
+
+
+def test_chave_invalida(client):
+    resp = client.post("/api/pedidos", json={}, headers={"Idempotency-Key": "x" * 300})
+    assert resp.status_code == 400
+
+
+def test_reserva_dura_mais_que_a_chamada_ao_gateway(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "GATEWAY_TIMEOUT_LEITURA", 30.0)
+    with app.test_request_context():
+        # 3 tentativas de 3.05s + 30s e as esperas entre elas
+        assert validade_reserva() > timedelta(seconds=3 * 33.05)
+    cliente_id, item_id = _preparar(client)
+    cabecalhos = {"Idempotency-Key": "lenta"}
+    client.post("/api/pedidos", json=_corpo(cliente_id, item_id), headers=cabecalhos)
+    ChaveIdempotencia.query.update(
+        {
+            "status_code": None,
+            "corpo": None,
+            "criado_em": datetime.utcnow() - timedelta(seconds=90),
+        }
+    )
+    db.session.commit()
+    resp = client.post(
+        "/api/pedidos", json=_corpo(cliente_id, item_id), headers=cabecalhos
+    )
+    assert resp.status_code == 409
+
+
+def test_resposta_gravada_adulterada_nao_e_repetida(client):
+    cliente_id, item_id = _preparar(client)
+    cabecalhos = {"Idempotency-Key": "k"}
+    client.post("/api/pedidos", json=_corpo(cliente_id, item_id), headers=cabecalhos)
+    ChaveIdempotencia.query.update({"corpo": b'{"pedido": null}'})
+    db.session.commit()
+    resp = client.post(
+        "/api/pedidos", json=_corpo(cliente_id, item_id), headers=cabecalhos
+    )
+    assert resp.status_code == 500
+    assert PedidoItem.query.one().quantidade == 2
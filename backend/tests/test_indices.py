@@ -0,0 +1,90 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, exists, select, text
+
+from database import db
+from models import Cliente, Item, Mesa, Pagamento, Pedido
+
+# Formato das consultas feitas pelas rotas -> índice esperado no plano
+CONSULTAS_FREQUENTES = {
+    "pedido_aberto_do_cliente": (
+        lambda: Pedido.query.filter_by(cliente_id=1, fechado=False).statement,
+        ("ix_pedido_cliente_fechado", "uq_pedido_cliente_aberto"),
+    ),
+    "pedidos_do_cliente": (
+        lambda: Pedido.query.filter_by(cliente_id=1).statement,
+        ("ix_pedido_cliente_fechado", "uq_pedido_cliente_aberto"),
+    ),
+    "cliente_da_mesa": (
+        lambda: Cliente.query.filter_by(mesa=1).statement,
+        ("ix_cliente_mesa",),
+    ),
+    "pagamento_do_pedido": (
+        lambda: Pagamento.query.filter_by(pedido_id=1).statement,
+        ("ix_pagamento_pedido",),
+    ),
+    "mesas_livres": (
+        lambda: Mesa.query.filter_by(status="livre").statement,
+        ("ix_mesa_status",),
+    ),
+    "mesa_sem_cliente": (
+        lambda: select(Mesa.mesa_id).where(
+            ~exists().where(Cliente.mesa == Mesa.numero)
+        ),
+        ("ix_cliente_mesa",),
+    ),
+    "pedidos_por_status": (
+        lambda: Pedido.query.filter_by(status="Cozinha")
+        .order_by(Pedido.data_hora)
+        .statement,
+        ("ix_pedido_status_data_hora",),
+    ),
+    "pagina_de_pedidos": (
+        lambda: Pedido.query.order_by(Pedido.data_hora.desc(), Pedido.pedido_id.desc())
+        .limit(50)
+        .statement,
+        ("ix_pedido_data_hora",),
+    ),
+    "itens_da_categoria": (
+        lambda: Item.query.filter_by(categoria_id=1).statement,
+        ("ix_item_categoria_id",),
+    ),
+}
+
+
+def _sql(statement, engine):
+    return str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.parametrize("nome", sorted(CONSULTAS_FREQUENTES))
+def test_plano_sqlite_usa_indice(app, nome):
+    construir, indices = CONSULTAS_FREQUENTES[nome]
+    sql = _sql(construir(), db.engine)
+    plano = " ".join(
+        linha[-1] for linha in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+    )
+    assert any(indice in plano for indice in indices), plano
+
+
+@pytest.mark.skipif(
+    not os.environ.get("TEST_POSTGRES_URL"),
+    reason="TEST_POSTGRES_URL não configurada",
+)
+@pytest.mark.parametrize("nome", sorted(CONSULTAS_FREQUENTES))
+def test_plano_postgres_usa_indice(app, nome):
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    db.metadata.create_all(engine)
+    try:
+        construir, indices = CONSULTAS_FREQUENTES[nome]
+        sql = _sql(construir(), engine)
+        with engine.connect() as conexao:
+            # Tabelas vazias: sem isso o planner prefere seq scan
+            conexao.execute(text("SET enable_seqscan = off"))
+            plano = " ".join(
+                linha[0] for linha in conexao.execute(text(f"EXPLAIN {sql}"))
+            )
+        assert any(indice in plano for indice in indices), plano
+    finally:
+        db.metadata.drop_all(engine)
+        engine.dispose()
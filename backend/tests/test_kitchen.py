@@ -0,0 +1,144 @@
+import threading
+import time
+
+from events import feed
+
+# Uma linha com duas unidades por pedido
+PRATO = [("Prato", 5.0, 2)]
+
+
+def test_fila_em_ordem_de_chegada_so_com_pedidos_na_cozinha(client, criar_pedido):
+    primeiro = criar_pedido(7101, PRATO)[0]
+    segundo = criar_pedido(7102, PRATO)[0]
+    pronto = criar_pedido(7103, PRATO)[0]
+    client.put(f"/api/pedidos/{pronto['pedido_id']}/status", json={"status": "Pronto"})
+
+    resp = client.get("/api/cozinha/fila")
+    assert resp.status_code == 200
+    itens = resp.json["itens"]
+    assert [i["pedido_id"] for i in itens] == [
+        primeiro["pedido_id"],
+        segundo["pedido_id"],
+    ]
+    assert itens[0]["mesa"] == 7101
+    assert itens[0]["quantidade"] == 2
+    assert resp.json["seq"] == feed.seq_atual()
+
+
+def test_fila_em_uma_consulta(client, contar_consultas, criar_pedido):
+    for mesa in range(7201, 7205):
+        criar_pedido(mesa, PRATO)[0]
+    with contar_consultas() as consultas:
+        client.get("/api/cozinha/fila")
+    assert len(consultas) == 1
+
+
+def test_long_polling_responde_ao_evento_da_cozinha(client):
+    seq = feed.seq_atual()
+
+    def emitir_depois():
+        time.sleep(0.3)
+        feed.registrar("pedido_novo", {"pedido_id": 1}, ["cozinha"])
+
+    threading.Thread(target=emitir_depois).start()
+    inicio = time.monotonic()
+    resp = client.get(f"/api/cozinha/fila?desde={seq}&wait=5")
+    assert resp.status_code == 200
+    assert 0.2 < time.monotonic() - inicio < 4
+    assert resp.json["seq"] == seq + 1
+
+
+def test_long_polling_ignora_eventos_de_outras_salas_e_expira(client, monkeypatch):
+    import routes.kitchen
+
+    seq = feed.seq_atual()
+    feed.registrar("pagamento_recebido", {"pagamento_id": 1}, ["caixa"])
+    monkeypatch.setattr(routes.kitchen, "INTERVALO_VERIFICACAO", 0.05)
+    inicio = time.monotonic()
+    resp = client.get(f"/api/cozinha/fila?desde={seq}&wait=1")
+    assert time.monotonic() - inicio >= 0.9
+    assert resp.json["seq"] == seq + 1
+
+
+def test_parametros_invalidos(client):
+    assert client.get("/api/cozinha/fila?desde=abc&wait=1").status_code == 400
+    assert client.get("/api/cozinha/fila?desde=1&wait=-1").status_code == 400
+    assert client.get("/api/cozinha/fila?wait=x").status_code == 400
+
+
+def test_status_por_linha_tira_prato_pronto_da_fila(client, criar_pedido):
+    pedido = criar_pedido(7301, PRATO)[0]
+    item_id = pedido["itens"][0]["item_id"]
+    url = f"/api/pedidos/{pedido['pedido_id']}/itens/{item_id}/status"
+    assert pedido["itens"][0]["status"] == "Na fila"
+
+    resp = client.patch(url, json={"status": "Em preparo"})
+    assert resp.status_code == 200, resp.json
+    assert resp.json["linha"]["iniciado_em"] is not None
+    assert client.get("/api/cozinha/fila").json["itens"][0]["status"] == "Em preparo"
+
+    resp = client.patch(url, json={"status": "Pronto"})
+    assert resp.json["linha"]["pronto_em"] is not None
+    assert client.get("/api/cozinha/fila").json["itens"] == []
+    # O pedido continua na cozinha: só a linha mudou
+    detalhe = client.get(f"/api/pedidos/{pedido['pedido_id']}").json["pedido"]
+    assert detalhe["status"] == "Cozinha"
+    assert detalhe["itens"][0]["status"] == "Pronto"
+
+    # Mais porções do mesmo prato: só a nova vai para a fila
+    client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": pedido["cliente_id"],
+            "itens": [{"item_id": item_id, "quantidade": 1}],
+        },
+    )
+    fila = client.get("/api/cozinha/fila").json["itens"]
+    assert [(i["status"], i["quantidade"]) for i in fila] == [("Na fila", 1)]
+    linha = client.get(f"/api/pedidos/{pedido['pedido_id']}").json["pedido"]["itens"][0]
+    assert linha["quantidade"] == 3 and linha["quantidade_pronta"] == 2
+
+    # Enquanto a linha está na fila, novas porções só aumentam a parte pendente
+    client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": pedido["cliente_id"],
+            "itens": [{"item_id": item_id, "quantidade": 2}],
+        },
+    )
+    fila = client.get("/api/cozinha/fila").json["itens"]
+    assert [(i["status"], i["quantidade"]) for i in fila] == [("Na fila", 3)]
+
+
+def test_evento_de_linha_leva_so_a_linha(app, client, drenar_eventos, criar_pedido):
+    pedido = criar_pedido(7302, PRATO)[0]
+    drenar_eventos()
+    cozinha = app.socketio.test_client(app)
+    cozinha.emit("entrar_sala", {"tipo": "cozinha"})
+    cozinha.get_received()
+
+    item_id = pedido["itens"][0]["item_id"]
+    client.patch(
+        f"/api/pedidos/{pedido['pedido_id']}/itens/{item_id}/status",
+        json={"status": "Pronto"},
+    )
+    drenar_eventos()
+    recebidos = cozinha.get_received()
+    assert [r["name"] for r in recebidos] == ["pedido_item_atualizado"]
+    linha = recebidos[0]["args"][0]
+    assert linha["item_id"] == item_id and linha["status"] == "Pronto"
+    assert "item" not in linha and "itens" not in linha
+
+
+def test_status_de_linha_invalido_ou_inexistente(client, criar_pedido):
+    pedido = criar_pedido(7303, PRATO)[0]
+    item_id = pedido["itens"][0]["item_id"]
+    url = f"/api/pedidos/{pedido['pedido_id']}/itens/{item_id}/status"
+    assert client.patch(url, json={"status": "Queimado"}).status_code == 400
+    assert (
+        client.patch(
+            f"/api/pedidos/{pedido['pedido_id']}/itens/999/status",
+            json={"status": "Pronto"},
+        ).status_code
+        == 404
+    )
@@ -0,0 +1,157 @@
+from database import db
+from models import Mesa, Pagamento, Pedido
+from payment.settlement import aplicar_status
+from rollups import resumos_por_dia
+
+
+def _pagar(client, pedido_id, valor):
+    return client.post(
+        "/api/pagamentos",
+        json={"pedido_id": pedido_id, "metodo": "Dinheiro", "valor": valor},
+    )
+
+
+def _mesa(numero):
+    return Mesa.query.filter_by(numero=numero).one().status
+
+
+def test_pagamentos_parciais_quitam_pedido_no_saldo_zero(client, criar_pedido):
+    pedido_id = criar_pedido(7001, fechar=True)[0]["pedido_id"]
+    resp = _pagar(client, pedido_id, 10.0)
+    assert resp.status_code == 201, resp.json
+    assert resp.json["saldo"] == 20.0
+    assert db.session.get(Pedido, pedido_id).status != "Pago"
+    assert _mesa(7001) != "livre"
+
+    assert _pagar(client, pedido_id, 25.0).status_code == 400  # acima do saldo
+    resp = _pagar(client, pedido_id, 20.0)
+    assert resp.status_code == 201 and resp.json["saldo"] == 0.0
+    db.session.expire_all()
+    pedido = db.session.get(Pedido, pedido_id)
+    assert pedido.status == "Pago" and float(pedido.valor_pago) == 30.0
+    assert _mesa(7001) == "livre"
+    assert _pagar(client, pedido_id, 1.0).status_code == 400
+
+    conta = client.get(f"/api/pagamentos/pedido/{pedido_id}").json
+    assert [p["valor"] for p in conta["pagamentos"]] == [10.0, 20.0]
+    assert conta["saldo"] == 0.0 and conta["pagamento"]["valor"] == 10.0
+
+
+def test_saldo_lido_sem_somar_pagamentos(client, criar_pedido, contar_consultas):
+    pedido_id = criar_pedido(7001, fechar=True)[0]["pedido_id"]
+    for _ in range(3):
+        _pagar(client, pedido_id, 5.0)
+    with contar_consultas() as consultas:
+        pedido = client.get(f"/api/pedidos/{pedido_id}").json["pedido"]
+    assert pedido["valor_pago"] == 15.0 and pedido["saldo"] == 15.0
+    assert not any("sum(" in consulta.lower() for consulta in consultas)
+
+
+def test_pix_pendente_reserva_parte_do_saldo(client, criar_pedido, gateway):
+    pedido_id = criar_pedido(7001, fechar=True)[0]["pedido_id"]
+    resp = client.post(
+        "/api/pagamentos/pix", json={"pedido_id": pedido_id, "valor": 10}
+    )
+    assert resp.status_code == 201, resp.json
+    assert _pagar(client, pedido_id, 30.0).status_code == 400
+    assert _pagar(client, pedido_id, 20.0).status_code == 201
+    assert db.session.get(Pedido, pedido_id).status != "Pago"
+
+    pix = Pagamento.query.filter_by(pedido_id=pedido_id, status="pendente").one()
+    assert aplicar_status(pix, "approved")
+    db.session.commit()
+    assert db.session.get(Pedido, pedido_id).status == "Pago"
+    assert _mesa(7001) == "livre"
+
+
+def test_estorno_devolve_valor_ao_saldo(client, criar_pedido, gateway):
+    pedido_id = criar_pedido(7001, fechar=True)[0]["pedido_id"]
+    client.post("/api/pagamentos/pix", json={"pedido_id": pedido_id, "valor": 10})
+    pix = Pagamento.query.filter_by(pedido_id=pedido_id).one()
+    aplicar_status(pix, "approved")
+    assert aplicar_status(pix, "refunded")
+    db.session.commit()
+    assert db.session.get(Pedido, pedido_id).saldo == 30
+
+
+def test_estorno_apos_quitar_reabre_pedido_mesa_e_resumo(client, criar_pedido, gateway):
+    pedido_id = criar_pedido(7001, fechar=True)[0]["pedido_id"]
+    client.post("/api/pagamentos/pix", json={"pedido_id": pedido_id})
+    pix = Pagamento.query.filter_by(pedido_id=pedido_id).one()
+    aplicar_status(pix, "approved")
+    db.session.commit()
+    assert db.session.get(Pedido, pedido_id).status == "Pago"
+    assert _mesa(7001) == "livre"
+    dia = pix.data_hora.date()
+    assert resumos_por_dia(dia)[0]["receita"] == 30.0
+
+    assert aplicar_status(pix, "refunded")
+    db.session.commit()
+    db.session.expire_all()
+    pedido = db.session.get(Pedido, pedido_id)
+    assert pedido.status == "Aguardando Pagamento" and pedido.saldo == 30
+    assert _mesa(7001) == "ocupada"
+    resumo = resumos_por_dia(dia)[0]
+    assert resumo["pagamentos"] == 0 and resumo["receita"] == 0.0
+    # O saldo reaberto pode ser pago de novo
+    assert _pagar(client, pedido_id, 30.0).status_code == 201
+    assert db.session.get(Pedido, pedido_id).status == "Pago"
+
+
+def test_divisao_em_partes_iguais_do_saldo(client, criar_pedido, gateway):
+    pedido_id = criar_pedido(7001, [("Pizza", 10.0, 1)], fechar=True)[0]["pedido_id"]
+    url = f"/api/pagamentos/pedido/{pedido_id}/divisao"
+    assert client.post(url, json={"partes": 3}).json["partes"] == [3.34, 3.33, 3.33]
+    _pagar(client, pedido_id, 4.0)
+    assert client.post(url, json={"partes": 2}).json["partes"] == [3.0, 3.0]
+    # PIX aguardando confirmação já reserva parte do saldo
+    client.post("/api/pagamentos/pix", json={"pedido_id": pedido_id, "valor": 2})
+    partes = client.post(url, json={"partes": 2}).json["partes"]
+    assert partes == [2.0, 2.0]
+    assert _pagar(client, pedido_id, partes[0]).status_code == 201
+    assert _pagar(client, pedido_id, partes[1]).status_code == 201
+    assert client.post(url, json={"partes": 0}).status_code == 400
+    assert client.post(url, json={}).status_code == 400
+
+
+def test_divisao_por_itens_rateia_servico(client, criar_pedido):
+    pedido, (pizza, suco) = criar_pedido(
+        7001, [("Pizza", 30.0, 1), ("Suco", 5.0, 2)], fechar=True, percentual_servico=10
+    )
+    pedido_id = pedido["pedido_id"]
+    url = f"/api/pagamentos/pedido/{pedido_id}/divisao"
+    resp = client.post(
+        url,
+        json={
+            "grupos": [
+                [{"item_id": pizza}],
+                [{"item_id": suco, "quantidade": 2}],
+            ]
+        },
+    )
+    assert resp.status_code == 200, resp.json
+    assert resp.json["partes"] == [33.0, 11.0] and resp.json["restante"] == 0.0
+
+    resp = client.post(url, json={"grupos": [[{"item_id": suco, "quantidade": 1}]]})
+    assert resp.json["partes"] == [5.5] and resp.json["restante"] == 38.5
+    resp = client.post(url, json={"grupos": [[{"item_id": suco, "quantidade": 3}]]})
+    assert resp.status_code == 400
+
+
+def test_divisao_por_itens_usa_preco_da_linha_e_exige_conta_sem_pagamentos(
+    client, criar_pedido
+):
+    pedido, (pizza, suco) = criar_pedido(
+        7001, [("Pizza", 30.0, 1), ("Suco", 5.0, 2)], fechar=True
+    )
+    pedido_id = pedido["pedido_id"]
+    url = f"/api/pagamentos/pedido/{pedido_id}/divisao"
+    grupos = {"grupos": [[{"item_id": pizza}], [{"item_id": suco, "quantidade": 2}]]}
+    # Preço alterado depois do fechamento não muda o que foi cobrado
+    client.put(f"/api/itens/{pizza}", json={"preco": 50.0})
+    assert client.post(url, json=grupos).json["partes"] == [30.0, 10.0]
+
+    _pagar(client, pedido_id, 10.0)
+    resp = client.post(url, json=grupos)
+    assert resp.status_code == 400
+    assert "partes iguais" in resp.json["error"]
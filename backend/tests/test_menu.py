@@ -48,3 +48,65 @@ def test_remover_item_inexistente(client):
     resp = client.delete("/api/itens/99999")
     assert resp.status_code == 404
     assert "error" in resp.json
+
+
+def test_listar_itens_etag_e_304(client, contar_consultas):
+    client.post("/api/itens", json={"nome": "Pudim", "preco": 7.0})
+    resp = client.get("/api/itens")
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+    with contar_consultas() as consultas:
+        resp2 = client.get("/api/itens", headers={"If-None-Match": etag})
+        resp3 = client.get("/api/itens")
+    assert resp2.status_code == 304
+    assert resp3.status_code == 200
+    assert resp3.json == resp.json
+    assert consultas == []
+
+
+def test_listar_itens_invalida_cache_ao_alterar_menu(client):
+    resp = client.post("/api/itens", json={"nome": "Mate", "preco": 4.0})
+    item_id = resp.json["item"]["item_id"]
+    etag = client.get("/api/itens").headers["ETag"]
+    client.put(f"/api/itens/{item_id}", json={"preco": 4.5})
+    resp2 = client.get("/api/itens", headers={"If-None-Match": etag})
+    assert resp2.status_code == 200
+    assert resp2.headers["ETag"] != etag
+    assert resp2.json["itens"][0]["preco"] == 4.5
+    client.delete(f"/api/itens/{item_id}")
+    assert client.get("/api/itens").json["itens"] == []
+
+
+def test_criar_e_listar_categorias(client):
+    resp = client.post("/api/categorias", json={"nome": "Saladas"})
+    assert resp.status_code == 201
+    categoria_id = resp.json["categoria"]["id"]
+    resp2 = client.get("/api/categorias")
+    assert [c["id"] for c in resp2.json["categorias"]] == [categoria_id]
+    resp3 = client.post("/api/categorias", json={"nome": "Saladas"})
+    assert resp3.status_code == 400
+
+
+def test_filtrar_itens_por_categoria_e_cardapio_agrupado(client):
+    bebidas = client.post("/api/categorias", json={"nome": "Bebidas"}).json
+    bebidas_id = bebidas["categoria"]["id"]
+    client.post(
+        "/api/itens", json={"nome": "Suco", "preco": 6.0, "categoria_id": bebidas_id}
+    )
+    client.post("/api/itens", json={"nome": "Brinde", "preco": 0.0})
+    resp = client.get(f"/api/itens?categoria={bebidas_id}")
+    assert [i["nome"] for i in resp.json["itens"]] == ["Suco"]
+    assert client.get("/api/itens?categoria=abc").status_code == 400
+    resp2 = client.get("/api/cardapio")
+    grupos = {
+        c["nome"]: [i["nome"] for i in c["itens"]] for c in resp2.json["categorias"]
+    }
+    assert grupos == {"Bebidas": ["Suco"], "Sem categoria": ["Brinde"]}
+
+
+def test_criar_item_categoria_inexistente(client):
+    resp = client.post(
+        "/api/itens", json={"nome": "X", "preco": 1.0, "categoria_id": 99999}
+    )
+    assert resp.status_code == 400
+    assert "error" in resp.json
@@ -0,0 +1,148 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+from database import db
+from models import Item
+from menu_import import importar_itens, ler_csv
+
+
+def _importar_csv(client, texto, **kwargs):
+    return client.post(
+        "/api/itens/importar",
+        data=texto.encode(),
+        content_type="text/csv",
+        **kwargs,
+    )
+
+
+def test_importa_csv_e_relata_linhas_invalidas(client):
+    categoria = client.post("/api/categorias", json={"nome": "Bebidas"}).json
+    categoria_id = categoria["categoria"]["id"]
+    texto = (
+        "sku,nome,descricao,preco,categoria_id\n"
+        f"BEB-1,Suco,Laranja,7.50,{categoria_id}\n"
+        "BEB-2,,Sem nome,5.00,\n"
+        "BEB-3,Água,,abc,\n"
+        "BEB-4,Chá,,4.00,99999\n"
+        "BEB-5,Café,,3.00,\n"
+    )
+    resp = _importar_csv(client, texto)
+    assert resp.status_code == 200, resp.json
+    assert (resp.json["criados"], resp.json["atualizados"]) == (2, 0)
+    assert resp.json["total_erros"] == 3
+    assert [(e["linha"], e["sku"]) for e in resp.json["erros"]] == [
+        (3, "BEB-2"),
+        (4, "BEB-3"),
+        (5, "BEB-4"),
+    ]
+    suco = Item.query.filter_by(sku="BEB-1").one()
+    assert (suco.nome, suco.preco, suco.categoria_id) == (
+        "Suco",
+        Decimal("7.50"),
+        categoria_id,
+    )
+
+
+def test_reimportacao_atualiza_pelo_sku_e_ajusta_pedidos_abertos(client):
+    _importar_csv(client, "sku,nome,preco\nPRT-1,Porção,30.00\n")
+    item_id = Item.query.filter_by(sku="PRT-1").one().item_id
+    client.post("/api/mesas", json={"numero": 9701, "capacidade": 4})
+    cliente = client.post("/api/cliente", json={"nome": "Lote", "mesa": 9701}).json
+    pedido = client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": cliente["cliente"]["cliente_id"],
+            "itens": [{"item_id": item_id, "quantidade": 2}],
+        },
+    ).json["pedido"]
+    resp = client.post(
+        "/api/itens/importar?formato=ndjson",
+        data=b'{"sku": "PRT-1", "nome": "Porcao grande", "preco": 35}\n',
+    )
+    assert (resp.json["criados"], resp.json["atualizados"]) == (0, 1)
+    assert Item.query.count() == 1
+    atualizado = client.get(f"/api/pedidos/{pedido['pedido_id']}").json["pedido"]
+    assert atualizado["total"] == 70.0
+
+
+def test_importa_ndjson_com_json_invalido(client):
+    corpo = (
+        b'{"sku": "A", "nome": "Item A", "preco": 1.5}\n'
+        b"\n"
+        b"{nao e json\n"
+        b'["lista"]\n'
+        b'{"sku": "B", "nome": "Item B", "preco": "2.00"}\n'
+    )
+    resp = client.post(
+        "/api/itens/importar", data=corpo, content_type="application/x-ndjson"
+    )
+    assert resp.json["criados"] == 2
+    assert [e["linha"] for e in resp.json["erros"]] == [3, 4]
+
+
+def test_lotes_e_sku_repetido(app):
+    linhas = ler_csv(
+        io.StringIO(
+            "sku,nome,preco\n"
+            + "".join(f"S{i},Item {i},{i}.00\n" for i in range(7))
+            + "S0,Item zero,9.00\n"
+        )
+    )
+    resultado = importar_itens(linhas, tamanho_lote=3)
+    # S0 volta em um lote posterior: atualiza o item criado no primeiro
+    assert (resultado["criados"], resultado["atualizados"]) == (7, 1)
+    assert db.session.scalar(db.select(Item.preco).where(Item.sku == "S0")) == Decimal(
+        "9.00"
+    )
+
+
+def test_importacao_invalida_cache_do_menu(client):
+    etag = client.get("/api/itens").headers["ETag"]
+    _importar_csv(client, "sku,nome,preco\nX,Novo,1.00\n")
+    resp = client.get("/api/itens", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert [item["sku"] for item in resp.json["itens"]] == ["X"]
+
+
+def test_formato_nao_suportado(client):
+    resp = client.post("/api/itens/importar", data=b"x", content_type="text/plain")
+    assert resp.status_code == 400
+
+
+def test_exporta_csv_e_ndjson(client):
+    _importar_csv(client, 'sku,nome,descricao,preco\nA,Item A,"com, vírgula",1.50\n')
+    client.post("/api/itens", json={"nome": "Sem SKU", "preco": 2.0})
+    resp = client.get("/api/itens/exportar")
+    assert resp.mimetype == "text/csv"
+    linhas = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+    assert [(linha["sku"], linha["descricao"]) for linha in linhas] == [
+        ("A", "com, vírgula"),
+        ("", ""),
+    ]
+    resp = client.get("/api/itens/exportar?formato=ndjson")
+    registros = [json.loads(linha) for linha in resp.get_data().splitlines()]
+    assert registros[0]["preco"] == 1.5
+    assert registros[1]["sku"] is None
+    # Reimportar a própria exportação não cria nada novo
+    reimportado = _importar_csv(
+        client, client.get("/api/itens/exportar").get_data(as_text=True)
+    )
+    assert reimportado.json["criados"] == 0
+    assert reimportado.json["atualizados"] == 1
+
+
+def test_sku_nao_se_repete_entre_itens(client):
+    primeiro = client.post("/api/itens", json={"sku": "A", "nome": "A", "preco": 1})
+    assert primeiro.json["item"]["sku"] == "A"
+    segundo = client.post("/api/itens", json={"sku": "B", "nome": "B", "preco": 1})
+    assert (
+        client.post(
+            "/api/itens", json={"sku": "A", "nome": "C", "preco": 1}
+        ).status_code
+        == 400
+    )
+    item_id = segundo.json["item"]["item_id"]
+    assert client.put(f"/api/itens/{item_id}", json={"sku": "A"}).status_code == 400
+    assert client.put(f"/api/itens/{item_id}", json={"sku": "B2"}).status_code == 200
@@ -66,6 +66,19 @@ def test_atualizar_status_pedido(client):
         },
     )
     pedido_id = pedido_resp.json["pedido"]["pedido_id"]
+    resp = client.put(f"/api/pedidos/{pedido_id}/status", json={"status": "Pronto"})
+    assert resp.status_code == 200, resp.json
+    assert resp.json["pedido"]["status"] == "Pronto"
+    # Com saldo em aberto o pedido só fica pago pelo registro do pagamento
+    resp = client.put(f"/api/pedidos/{pedido_id}/status", json={"status": "Pago"})
+    assert resp.status_code == 400
+    assert resp.json["saldo"] == 8.0
+
+    client.post(f"/api/pedidos/{pedido_id}/fechar")
+    client.post(
+        "/api/pagamentos",
+        json={"pedido_id": pedido_id, "metodo": "Dinheiro", "valor": 8.0},
+    )
     resp = client.put(f"/api/pedidos/{pedido_id}/status", json={"status": "Pago"})
     assert resp.status_code == 200, resp.json
     assert resp.json["pedido"]["status"].lower() == "pago"
@@ -151,3 +164,174 @@ def test_fechar_pedido_inexistente(client):
     resp = client.post("/api/pedidos/99999/fechar")
     assert resp.status_code == 404
     assert "error" in resp.json
+
+
+def criar_pedidos(client, primeira_mesa, quantidade_pedidos):
+    """Cria um cliente com um pedido fechado em mesas consecutivas e retorna os IDs."""
+    item_resp = client.post("/api/itens", json={"nome": "Pastel", "preco": 6.0})
+    item_id = item_resp.json["item"]["item_id"]
+    pedidos = []
+    for mesa_num in range(primeira_mesa, primeira_mesa + quantidade_pedidos):
+        client.post("/api/mesas", json={"numero": mesa_num, "capacidade": 4})
+        cliente_resp = client.post(
+            "/api/cliente", json={"nome": f"Cliente{mesa_num}", "mesa": mesa_num}
+        )
+        pedido_resp = client.post(
+            "/api/pedidos",
+            json={
+                "cliente_id": cliente_resp.json["cliente"]["cliente_id"],
+                "itens": [{"item_id": item_id, "quantidade": 1}],
+            },
+        )
+        pedidos.append(pedido_resp.json["pedido"]["pedido_id"])
+        client.post(f"/api/pedidos/{pedidos[-1]}/fechar")
+    return pedidos
+
+
+def test_listar_pedidos_paginado_por_cursor(client):
+    pedidos = criar_pedidos(client, 3100, 5)
+    vistos = []
+    cursor = None
+    while True:
+        url = "/api/pedidos?limite=2" + (f"&cursor={cursor}" if cursor else "")
+        resp = client.get(url)
+        assert resp.status_code == 200, resp.json
+        assert len(resp.json["pedidos"]) <= 2
+        vistos.extend(p["pedido_id"] for p in resp.json["pedidos"])
+        cursor = resp.json["proximo_cursor"]
+        if not cursor:
+            break
+    assert vistos == sorted(pedidos, reverse=True)
+
+
+def test_listar_pedidos_filtros(client):
+    pedidos = criar_pedidos(client, 3200, 2)
+    resp = client.get("/api/pedidos?mesa=3201&fechado=true")
+    assert resp.status_code == 200
+    assert [p["pedido_id"] for p in resp.json["pedidos"]] == [pedidos[1]]
+    resp = client.get("/api/pedidos?status=Cozinha")
+    assert resp.json["pedidos"] == []
+    resp = client.get("/api/pedidos?status=Cozinha,Aguardando Pagamento")
+    assert len(resp.json["pedidos"]) == 2
+    resp = client.get("/api/pedidos?de=2000-01-01&ate=2000-01-31")
+    assert resp.json["pedidos"] == []
+
+
+def test_listar_pedidos_parametros_invalidos(client):
+    assert client.get("/api/pedidos?cursor=invalido").status_code == 400
+    assert client.get("/api/pedidos?limite=0").status_code == 400
+    assert client.get("/api/pedidos?fechado=talvez").status_code == 400
+    assert client.get("/api/pedidos?de=ontem").status_code == 400
+
+
+def test_listar_pedidos_numero_fixo_de_consultas(client, contar_consultas):
+    criar_pedidos(client, 3300, 1)
+    with contar_consultas() as poucos:
+        client.get("/api/pedidos")
+    criar_pedidos(client, 3400, 4)
+    with contar_consultas() as muitos:
+        client.get("/api/pedidos")
+    assert len(muitos) == len(poucos)
+
+
+def test_criar_pedido_consolida_itens_repetidos(client):
+    client.post("/api/mesas", json={"numero": 3500, "capacidade": 2})
+    cliente_resp = client.post("/api/cliente", json={"nome": "Dup", "mesa": 3500})
+    cliente_id = cliente_resp.json["cliente"]["cliente_id"]
+    item_a = client.post("/api/itens", json={"nome": "Chopp", "preco": 9.5})
+    item_b = client.post("/api/itens", json={"nome": "Porção", "preco": 20.0})
+    id_a = item_a.json["item"]["item_id"]
+    id_b = item_b.json["item"]["item_id"]
+    resp = client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": cliente_id,
+            "itens": [
+                {"item_id": id_a, "quantidade": 1},
+                {"item_id": id_b, "quantidade": 1},
+                {"item_id": id_a, "quantidade": 2},
+            ],
+        },
+    )
+    assert resp.status_code == 201, resp.json
+    # Segunda rodada soma às linhas já existentes do pedido aberto
+    resp = client.post(
+        "/api/pedidos",
+        json={"cliente_id": cliente_id, "itens": [{"item_id": id_a, "quantidade": 1}]},
+    )
+    pedido = resp.json["pedido"]
+    quantidades = {linha["item_id"]: linha["quantidade"] for linha in pedido["itens"]}
+    assert quantidades == {id_a: 4, id_b: 1}
+    assert pedido["total"] == 58.0
+
+
+def test_criar_pedido_item_inexistente_nao_altera_pedido(client):
+    client.post("/api/mesas", json={"numero": 3501, "capacidade": 2})
+    cliente_resp = client.post("/api/cliente", json={"nome": "Inex", "mesa": 3501})
+    cliente_id = cliente_resp.json["cliente"]["cliente_id"]
+    item_id = client.post("/api/itens", json={"nome": "Gelo", "preco": 1.0}).json[
+        "item"
+    ]["item_id"]
+    resp = client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": cliente_id,
+            "itens": [
+                {"item_id": item_id, "quantidade": 1},
+                {"item_id": 99999, "quantidade": 1},
+            ],
+        },
+    )
+    assert resp.status_code == 404
+    assert client.get(f"/api/pedidos/cliente/{cliente_id}").json["pedidos"] == []
+
+
+def test_criar_pedido_rejeita_linhas_malformadas(client):
+    client.post("/api/mesas", json={"numero": 3503, "capacidade": 2})
+    cliente_resp = client.post("/api/cliente", json={"nome": "Malf", "mesa": 3503})
+    cliente_id = cliente_resp.json["cliente"]["cliente_id"]
+    item_id = client.post("/api/itens", json={"nome": "Água", "preco": 4.0}).json[
+        "item"
+    ]["item_id"]
+    for linha in (
+        {"item_id": item_id, "quantidade": True},
+        {"item_id": item_id},
+        {"quantidade": 1},
+        {"item_id": [item_id], "quantidade": 1},
+        item_id,
+    ):
+        resp = client.post(
+            "/api/pedidos", json={"cliente_id": cliente_id, "itens": [linha]}
+        )
+        assert resp.status_code == 400, linha
+    assert client.get(f"/api/pedidos/cliente/{cliente_id}").json["pedidos"] == []
+
+
+def test_criar_pedido_consultas_independem_do_numero_de_itens(client, contar_consultas):
+    client.post("/api/mesas", json={"numero": 3502, "capacidade": 2})
+    cliente_resp = client.post("/api/cliente", json={"nome": "Lote", "mesa": 3502})
+    cliente_id = cliente_resp.json["cliente"]["cliente_id"]
+    ids = [
+        client.post("/api/itens", json={"nome": f"Item{i}", "preco": 1.0}).json["item"][
+            "item_id"
+        ]
+        for i in range(20)
+    ]
+    client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": cliente_id,
+            "itens": [{"item_id": ids[0], "quantidade": 1}],
+        },
+    )
+    with contar_consultas() as consultas:
+        resp = client.post(
+            "/api/pedidos",
+            json={
+                "cliente_id": cliente_id,
+                "itens": [{"item_id": i, "quantidade": 1} for i in ids],
+            },
+        )
+    assert resp.status_code == 201
+    selects = [c for c in consultas if c.lstrip().upper().startswith("SELECT")]
+    assert len(selects) < 10
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+import socketio
+from flask import Flask
+
+from pubsub import BarramentoMemoria, GerenciadorFilaMemoria, criar_gerenciador
+
+
+class _Worker:
+    """Simula um worker do gunicorn: servidor próprio ligado ao barramento comum."""
+
+    def __init__(self, barramento):
+        self.servidor = socketio.Server(
+            async_mode="threading", client_manager=GerenciadorFilaMemoria(barramento)
+        )
+        self.servidor.manager_initialized = True
+        self.servidor.manager.initialize()  # inicia a thread que escuta a fila
+        self.recebidos = []
+        self.servidor._send_eio_packet = self._receber
+
+    def _receber(self, eio_sid, pacote_eio):
+        pacote = socketio.packet.Packet(encoded_packet=pacote_eio.data)
+        self.recebidos.append((eio_sid, *pacote.data))
+
+    def conectar(self, eio_sid, sala):
+        sid = self.servidor.manager.connect(eio_sid, "/")
+        self.servidor.manager.enter_room(sid, "/", sala, eio_sid=eio_sid)
+
+    def aguardar(self, quantidade, timeout=2.0):
+        limite = time.monotonic() + timeout
+        while len(self.recebidos) < quantidade and time.monotonic() < limite:
+            time.sleep(0.01)
+        return self.recebidos
+
+
+def test_emit_chega_a_sockets_de_outros_workers():
+    barramento = BarramentoMemoria()
+    workers = [_Worker(barramento) for _ in range(3)]
+    for i, worker in enumerate(workers):
+        worker.conectar(f"cozinha-{i}", "cozinha")
+
+    workers[0].servidor.emit("pedido_novo", {"seq": 1}, to="cozinha")
+
+    for i, worker in enumerate(workers):
+        assert worker.aguardar(1) == [(f"cozinha-{i}", "pedido_novo", {"seq": 1})]
+
+
+def test_emit_respeita_salas_entre_workers():
+    barramento = BarramentoMemoria()
+    origem, destino = _Worker(barramento), _Worker(barramento)
+    destino.conectar("tela-cozinha", "cozinha")
+    destino.conectar("tela-caixa", "caixa")
+
+    origem.servidor.emit("pagamento_recebido", {"seq": 2}, to="caixa")
+
+    assert destino.aguardar(1) == [("tela-caixa", "pagamento_recebido", {"seq": 2})]
+    assert destino.aguardar(2, timeout=0.2) == [
+        ("tela-caixa", "pagamento_recebido", {"seq": 2})
+    ]
+
+
+def test_barramentos_distintos_nao_se_misturam():
+    origem, outro = _Worker(BarramentoMemoria()), _Worker(BarramentoMemoria())
+    outro.conectar("tela", "cozinha")
+    origem.servidor.emit("pedido_novo", {"seq": 1}, to="cozinha")
+    assert outro.aguardar(1, timeout=0.2) == []
+
+
+def test_criar_gerenciador_conforme_configuracao():
+    app = Flask(__name__)
+    assert criar_gerenciador(app) is None
+    app.config["SOCKETIO_MESSAGE_QUEUE"] = "memoria://"
+    assert isinstance(criar_gerenciador(app), GerenciadorFilaMemoria)
+    app.config["SOCKETIO_MESSAGE_QUEUE"] = "redis://localhost:6379/0"
+    assert isinstance(criar_gerenciador(app), socketio.RedisManager)
+    app.config["SOCKETIO_MESSAGE_QUEUE"] = "amqp://localhost"
+    with pytest.raises(ValueError):
+        criar_gerenciador(app)
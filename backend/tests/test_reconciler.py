@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm.attributes import set_committed_value
+
+from database import db
+from models import Mesa, Pagamento, Pedido
+from payment.reconciler import intervalo_consulta, reconciliar_lote
+from payment.settlement import aplicar_status
+from rollups import resumos_por_dia
+
+
+@pytest.fixture
+def pix_pendente(client, criar_pedido):
+    """Retorna criar(mesa): pedido fechado com uma cobrança PIX pendente."""
+
+    def criar(mesa):
+        pedido_id = criar_pedido(mesa, fechar=True)[0]["pedido_id"]
+        resp = client.post("/api/pagamentos/pix", json={"pedido_id": pedido_id})
+        assert resp.status_code == 201, resp.json
+        return pedido_id
+
+    return criar
+
+
+def _depois(segundos):
+    return datetime.utcnow() + timedelta(seconds=segundos)
+
+
+def test_intervalo_comeca_curto_e_recua_ate_o_maximo():
+    intervalos = [intervalo_consulta(n) for n in range(10)]
+    assert intervalos[0] == 5.0 and intervalos[1] == 10.0
+    assert intervalos == sorted(intervalos)
+    assert intervalos[-1] == 300.0
+
+
+def test_reconciliacao_confirma_pix_sem_webhook(gateway, pix_pendente):
+    pedido_id = pix_pendente(6001)
+    # Ainda não venceu a primeira consulta
+    assert reconciliar_lote(lambda: gateway) == 0
+
+    gateway.status = "approved"
+    assert reconciliar_lote(lambda: gateway, agora=_depois(6)) == 1
+    db.session.expire_all()
+    assert Pagamento.query.filter_by(pedido_id=pedido_id).one().status == "aprovado"
+    assert db.session.get(Pedido, pedido_id).status == "Pago"
+    assert Mesa.query.filter_by(numero=6001).one().status == "livre"
+    # Confirmado: sai da reconciliação
+    assert reconciliar_lote(lambda: gateway, agora=_depois(3600)) == 0
+
+
+def test_pendente_e_reagendado_com_intervalo_crescente(gateway, pix_pendente):
+    pedido_id = pix_pendente(6002)
+    agora = _depois(6)
+    assert reconciliar_lote(lambda: gateway, agora=agora) == 1
+    pagamento = Pagamento.query.filter_by(pedido_id=pedido_id).one()
+    assert pagamento.consultas_gateway == 1
+    assert pagamento.proxima_consulta == agora + timedelta(seconds=10)
+    # Antes do novo prazo não consulta de novo
+    assert reconciliar_lote(lambda: gateway, agora=agora + timedelta(seconds=9)) == 0
+    assert reconciliar_lote(lambda: gateway, agora=agora + timedelta(seconds=10)) == 1
+
+
+def test_consultas_simultaneas_limitadas(gateway, pix_pendente):
+    for i in range(6):
+        pix_pendente(6100 + i)
+    gateway.atraso = 0.05
+    assert reconciliar_lote(lambda: gateway, agora=_depois(6), simultaneas=2) == 6
+    assert len(gateway.consultas) == 6
+    assert gateway.maximo_simultaneas <= 2
+
+
+def test_confirmacao_concorrente_aplica_efeitos_uma_vez(gateway, pix_pendente):
+    pedido_id = pix_pendente(6003)
+    pagamento = Pagamento.query.filter_by(pedido_id=pedido_id).one()
+    assert aplicar_status(pagamento, "approved")
+    db.session.commit()
+
+    # Outro worker (webhook) leu o mesmo pagamento antes da confirmação
+    set_committed_value(pagamento, "status", "pendente")
+    assert not aplicar_status(pagamento, "approved")
+    db.session.commit()
+    assert pagamento.status == "aprovado"
+    (resumo,) = resumos_por_dia(pagamento.data_hora.date())
+    assert resumo["pagamentos"] == 1
@@ -0,0 +1,189 @@
+from datetime import date, datetime, timedelta
+
+from database import db
+from models import Cliente, Item, Pagamento, Pedido, PedidoItem
+from reports import CAPACIDADE_CACHE_CONSOLIDADOS, relatorios_cache
+
+
+def _atendimento(mesa, aberto_em, minutos, valor, metodo, itens=1):
+    """Pedido fechado e pago `minutos` depois de aberto, com `itens` unidades."""
+    cliente = Cliente(nome=f"Mesa {mesa}", mesa=mesa)
+    item = Item.query.first() or Item(nome="Prato", preco=10)
+    pedido = Pedido(cliente=cliente, data_hora=aberto_em, fechado=True, total=valor)
+    db.session.add_all([cliente, item, pedido])
+    db.session.flush()
+    db.session.add(
+        PedidoItem(pedido_id=pedido.pedido_id, item_id=item.item_id, quantidade=itens)
+    )
+    db.session.add(
+        Pagamento(
+            pedido_id=pedido.pedido_id,
+            metodo=metodo,
+            valor=valor,
+            data_hora=aberto_em + timedelta(minutes=minutos),
+        )
+    )
+    db.session.commit()
+
+
+def _preparar():
+    # 2026-10-04 é um domingo
+    _atendimento(1, datetime(2026, 10, 4, 12, 0), 30, 100, "Pix", itens=2)
+    _atendimento(2, datetime(2026, 10, 4, 19, 0), 90, 50, "Dinheiro", itens=4)
+    _atendimento(1, datetime(2026, 10, 5, 12, 10), 60, 30, "Pix", itens=3)
+
+
+def _relatorio(client, nome, de="2026-10-01", ate="2026-10-07"):
+    resp = client.get(f"/api/relatorios/{nome}?de={de}&ate={ate}")
+    assert resp.status_code == 200, resp.json
+    return resp.json["dados"]
+
+
+def test_receita_por_dia_hora_e_dia_da_semana(client):
+    _preparar()
+    assert _relatorio(client, "receita_por_dia") == [
+        {"dia": "2026-10-04", "receita": 150.0, "pagamentos": 2},
+        {"dia": "2026-10-05", "receita": 30.0, "pagamentos": 1},
+    ]
+    assert _relatorio(client, "receita_por_hora") == [
+        {"hora": 12, "receita": 100.0, "pagamentos": 1},
+        {"hora": 13, "receita": 30.0, "pagamentos": 1},
+        {"hora": 20, "receita": 50.0, "pagamentos": 1},
+    ]
+    assert _relatorio(client, "receita_por_dia_semana") == [
+        {"dia_semana": 0, "nome": "domingo", "receita": 150.0, "pagamentos": 2},
+        {"dia_semana": 1, "nome": "segunda", "receita": 30.0, "pagamentos": 1},
+    ]
+
+
+def test_ticket_itens_giro_e_mix(client):
+    _preparar()
+    assert _relatorio(client, "ticket_medio") == {
+        "receita": 180.0,
+        "pagamentos": 3,
+        "pedidos_pagos": 3,
+        "ticket_medio": 60.0,
+    }
+    assert _relatorio(client, "itens_por_pedido") == {
+        "pedidos": 3,
+        "itens": 9,
+        "media_itens": 3.0,
+        "maximo_itens": 4,
+    }
+    giro = _relatorio(client, "giro_mesas")
+    assert giro["atendimentos"] == 3
+    assert giro["media_minutos"] == 60.0
+    assert giro["por_mesa"] == [
+        {"mesa": 1, "atendimentos": 2, "media_minutos": 45.0},
+        {"mesa": 2, "atendimentos": 1, "media_minutos": 90.0},
+    ]
+    assert _relatorio(client, "mix_pagamentos") == [
+        {"metodo": "Dinheiro", "pagamentos": 1, "receita": 50.0, "percentual": 27.78},
+        {"metodo": "Pix", "pagamentos": 2, "receita": 130.0, "percentual": 72.22},
+    ]
+
+
+def test_pagamentos_parciais_contam_um_pedido(client):
+    _atendimento(1, datetime(2026, 10, 4, 12, 0), 30, 60, "Pix")
+    pedido = Pedido.query.one()
+    db.session.add(
+        Pagamento(
+            pedido_id=pedido.pedido_id,
+            metodo="Dinheiro",
+            valor=40,
+            data_hora=datetime(2026, 10, 4, 13, 0),
+        )
+    )
+    db.session.commit()
+    assert _relatorio(client, "ticket_medio") == {
+        "receita": 100.0,
+        "pagamentos": 2,
+        "pedidos_pagos": 1,
+        "ticket_medio": 100.0,
+    }
+    # Permanência até o último pagamento
+    assert _relatorio(client, "giro_mesas")["por_mesa"] == [
+        {"mesa": 1, "atendimentos": 1, "media_minutos": 60.0}
+    ]
+
+
+def test_periodo_filtra_e_valida(client):
+    _preparar()
+    assert _relatorio(client, "ticket_medio", de="2026-10-05")["pagamentos"] == 1
+    assert client.get("/api/relatorios/inexistente").status_code == 404
+    resp = client.get("/api/relatorios/ticket_medio?de=2026-10-07&ate=2026-10-01")
+    assert resp.status_code == 400
+    resp = client.get("/api/relatorios/ticket_medio?de=2024-01-01&ate=2026-01-01")
+    assert resp.status_code == 400
+    assert "giro_mesas" in client.get("/api/relatorios").json["relatorios"]
+
+
+def test_periodo_consolidado_fica_em_cache(client, contar_consultas):
+    _preparar()
+    _relatorio(client, "ticket_medio")
+    with contar_consultas() as consultas:
+        assert _relatorio(client, "ticket_medio")["pagamentos"] == 3
+    assert consultas == []
+    # Consolidado: um pagamento novo de hoje não invalida o período antigo
+    _atendimento(3, datetime.utcnow(), 5, 10, "Pix")
+    assert _relatorio(client, "ticket_medio")["pagamentos"] == 3
+
+
+def test_estorno_de_dia_consolidado_invalida_o_cache(client):
+    from payment.settlement import aplicar_status
+
+    _preparar()
+    assert _relatorio(client, "ticket_medio")["pagamentos"] == 3
+    pagamento = Pagamento.query.filter_by(metodo="Dinheiro").one()
+    assert aplicar_status(pagamento, "refunded")
+    db.session.commit()
+    assert _relatorio(client, "ticket_medio") == {
+        "receita": 130.0,
+        "pagamentos": 2,
+        "pedidos_pagos": 2,
+        "ticket_medio": 65.0,
+    }
+
+
+def test_periodo_com_hoje_e_invalidado_por_novos_pagamentos(client, contar_consultas):
+    hoje = datetime.utcnow().date().isoformat()
+    assert _relatorio(client, "ticket_medio", de=hoje, ate=hoje)["pagamentos"] == 0
+    with contar_consultas() as consultas:
+        _relatorio(client, "ticket_medio", de=hoje, ate=hoje)
+    assert not any("pagamento" in consulta for consulta in consultas)
+    client.post("/api/mesas", json={"numero": 9901, "capacidade": 2})
+    cliente = client.post("/api/cliente", json={"nome": "Hoje", "mesa": 9901}).json
+    item = client.post("/api/itens", json={"nome": "Suco", "preco": 8.0}).json
+    pedido = client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": cliente["cliente"]["cliente_id"],
+            "itens": [{"item_id": item["item"]["item_id"], "quantidade": 1}],
+        },
+    ).json["pedido"]
+    client.post(f"/api/pedidos/{pedido['pedido_id']}/fechar")
+    client.post(
+        "/api/pagamentos",
+        json={"pedido_id": pedido["pedido_id"], "metodo": "Pix", "valor": 8.0},
+    )
+    assert _relatorio(client, "ticket_medio", de=hoje, ate=hoje) == {
+        "receita": 8.0,
+        "pagamentos": 1,
+        "pedidos_pagos": 1,
+        "ticket_medio": 8.0,
+    }
+
+
+def test_cache_consolidado_respeita_capacidade(app):
+    relatorios_cache.capacidade = 2
+    try:
+        antigo = date(2020, 1, 1)
+        for nome in ("a", "b", "c"):
+            relatorios_cache.obter(nome, antigo, antigo, lambda: nome.encode())
+        chamadas = []
+        corpo = relatorios_cache.obter(
+            "a", antigo, antigo, lambda: chamadas.append(1) or b"novo"
+        )
+        assert (corpo, chamadas) == (b"novo", [1])
+    finally:
+        relatorios_cache.capacidade = CAPACIDADE_CACHE_CONSOLIDADOS
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+import serializers
+from serializers import SerializadorPedidos, codificar_json
+
+
+def _pedido_com_itens(client, mesa):
+    client.post("/api/mesas", json={"numero": mesa, "capacidade": 2})
+    cliente = client.post("/api/cliente", json={"nome": "Serial", "mesa": mesa}).json
+    itens = [
+        client.post("/api/itens", json={"nome": nome, "preco": preco}).json["item"]
+        for nome, preco in (("Pastel", 8.5), ("Caldo", 12.0))
+    ]
+    return client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": cliente["cliente"]["cliente_id"],
+            "itens": [{"item_id": item["item_id"], "quantidade": 2} for item in itens],
+        },
+    ).json["pedido"]
+
+
+def test_resposta_igual_ao_to_dict(client):
+    from database import db
+    from models import Pedido
+
+    pedido_id = _pedido_com_itens(client, 8001)["pedido_id"]
+    esperado = db.session.get(Pedido, pedido_id).to_dict()
+    assert client.get(f"/api/pedidos/{pedido_id}").json["pedido"] == esperado
+    assert client.get("/api/pedidos").json["pedidos"] == [esperado]
+
+
+def test_campos_selecionados(client):
+    pedido_id = _pedido_com_itens(client, 8002)["pedido_id"]
+    resp = client.get("/api/pedidos?fields=pedido_id,status")
+    assert resp.json["pedidos"] == [{"pedido_id": pedido_id, "status": "Cozinha"}]
+    resp = client.get(f"/api/pedidos/{pedido_id}?fields=total,cliente")
+    assert resp.json["pedido"] == {
+        "total": 41.0,
+        "cliente": {"cliente_id": 1, "nome": "Serial", "mesa": 8002},
+    }
+
+
+def test_itens_referenciados_por_id(client):
+    pedido = _pedido_com_itens(client, 8003)
+    resp = client.get("/api/pedidos?itens=ref&fields=pedido_id,itens")
+    assert resp.status_code == 200
+    linhas = resp.json["pedidos"][0]["itens"]
+    assert all("item" not in linha for linha in linhas)
+    assert sorted(resp.json["itens"]) == sorted(
+        str(linha["item_id"]) for linha in pedido["itens"]
+    )
+    assert resp.json["itens"][str(linhas[0]["item_id"])]["nome"] == "Pastel"
+
+
+def test_campos_e_modo_invalidos(client):
+    assert client.get("/api/pedidos?fields=pedido_id,senha").status_code == 400
+    assert client.get("/api/pedidos?itens=tudo").status_code == 400
+    assert client.get("/api/pedidos/1?fields=xyz").status_code == 400
+    assert client.get("/api/pedidos/cliente/1?itens=tudo").status_code == 400
+
+
+def test_sem_itens_nem_cliente_usa_uma_consulta(client, contar_consultas):
+    _pedido_com_itens(client, 8004)
+    with contar_consultas() as consultas:
+        client.get("/api/pedidos?fields=pedido_id,status,total")
+    assert len(consultas) == 1
+    assert "cliente" not in consultas[0].split("FROM", 1)[1]
+
+
+def test_select_le_so_as_colunas_pedidas(client, contar_consultas):
+    _pedido_com_itens(client, 8005)
+    _pedido_com_itens(client, 8006)
+    with contar_consultas() as consultas:
+        resp = client.get("/api/pedidos?fields=status&limite=1")
+    colunas = consultas[0].split("FROM", 1)[0]
+    assert "status" in colunas
+    assert not any(nome in colunas for nome in ("desconto", "total", "fechado"))
+    assert resp.json["pedidos"] == [{"status": "Cozinha"}]
+    # O cursor continua disponível sem pedido_id/data_hora em ?fields=
+    cursor = resp.json["proximo_cursor"]
+    seguinte = client.get(f"/api/pedidos?fields=status&limite=1&cursor={cursor}")
+    assert seguinte.json == {"pedidos": [{"status": "Cozinha"}], "proximo_cursor": None}
+
+
+@pytest.mark.parametrize("com_orjson", [True, False])
+def test_codificar_json_com_e_sem_orjson(monkeypatch, com_orjson):
+    from datetime import datetime
+    from decimal import Decimal
+
+    if not com_orjson:
+        monkeypatch.setattr(serializers, "orjson", None)
+    dados = {"total": Decimal("1.50"), "quando": datetime(2026, 1, 2, 3, 4), 7: "ç"}
+    assert json.loads(codificar_json(dados)) == {
+        "total": 1.5,
+        "quando": "2026-01-02T03:04:00",
+        "7": "ç",
+    }
+
+
+def test_serializador_rejeita_campos_desconhecidos():
+    with pytest.raises(ValueError):
+        SerializadorPedidos(["pedido_id", "nada"])
@@ -0,0 +1,97 @@
+from database import db
+from models import Pedido
+from totals import contar_divergencias, recalcular_pedidos_abertos
+
+
+def test_totais_ao_adicionar_itens(client, criar_pedido):
+    pedido, ids = criar_pedido(9001, [("Item 10.10", 10.10, 3), ("Item 2.05", 2.05, 2)])
+    assert pedido["subtotal"] == 34.4
+    assert pedido["total"] == 34.4
+    pedido = client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": pedido["cliente_id"],
+            "itens": [{"item_id": ids[1], "quantidade": 1}],
+        },
+    ).json["pedido"]
+    assert pedido["subtotal"] == 36.45
+
+
+def test_desconto_e_taxa_de_servico(client, criar_pedido):
+    pedido, _ = criar_pedido(9002, [("Item 20.0", 20.0, 2)])
+    url = f"/api/pedidos/{pedido['pedido_id']}/ajustes"
+    resp = client.put(url, json={"desconto": 5, "percentual_servico": 10})
+    assert resp.status_code == 200, resp.json
+    assert resp.json["pedido"]["taxa_servico"] == 3.5
+    assert resp.json["pedido"]["total"] == 38.5
+    assert client.put(url, json={"desconto": 100}).status_code == 400
+    assert client.put(url, json={"percentual_servico": -1}).status_code == 400
+    assert client.put(url, json={}).status_code == 400
+    client.post(f"/api/pedidos/{pedido['pedido_id']}/fechar")
+    assert client.put(url, json={"desconto": 1}).status_code == 400
+
+
+def test_mudanca_de_preco_atualiza_so_pedidos_abertos(client, criar_pedido):
+    from models import EventoOutbox
+
+    aberto, ids = criar_pedido(9003, [("Item 10.0", 10.0, 2), ("Item 4.0", 4.0, 1)])
+    client.put(
+        f"/api/pedidos/{aberto['pedido_id']}/ajustes", json={"percentual_servico": 10}
+    )
+    fechado = client.post(
+        "/api/pedidos",
+        json={
+            "cliente_id": _novo_cliente(client, 9004),
+            "itens": [{"item_id": ids[0], "quantidade": 1}],
+        },
+    ).json["pedido"]
+    client.post(f"/api/pedidos/{fechado['pedido_id']}/fechar")
+    EventoOutbox.query.delete()
+    db.session.commit()
+
+    client.put(f"/api/itens/{ids[0]}", json={"preco": 12.5})
+
+    aberto = client.get(f"/api/pedidos/{aberto['pedido_id']}").json["pedido"]
+    assert aberto["subtotal"] == 29.0
+    assert aberto["taxa_servico"] == 2.9
+    assert aberto["total"] == 31.9
+    assert (
+        client.get(f"/api/pedidos/{fechado['pedido_id']}").json["pedido"]["total"]
+        == 10.0
+    )
+    assert [e.pedido_id for e in EventoOutbox.query] == [aberto["pedido_id"]]
+
+
+def test_remover_item_desconta_dos_pedidos_abertos(client, criar_pedido):
+    pedido, ids = criar_pedido(9005, [("Item 7.0", 7.0, 2), ("Item 3.0", 3.0, 1)])
+    client.delete(f"/api/itens/{ids[0]}")
+    pedido = client.get(f"/api/pedidos/{pedido['pedido_id']}").json["pedido"]
+    assert pedido["subtotal"] == 3.0
+    assert [linha["item_id"] for linha in pedido["itens"]] == [ids[1]]
+
+
+def test_recalculo_em_lote_corrige_divergencias(app, client, criar_pedido):
+    pedido, _ = criar_pedido(9006, [("Item 6.0", 6.0, 2)])
+    db.session.execute(
+        db.update(Pedido)
+        .where(Pedido.pedido_id == pedido["pedido_id"])
+        .values(subtotal=1, total=1)
+    )
+    db.session.commit()
+    assert contar_divergencias() == 1
+
+    resultado = app.test_cli_runner().invoke(args=["recalcular-totais", "--verificar"])
+    assert "divergente: 1" in resultado.output
+    assert contar_divergencias() == 1
+
+    assert recalcular_pedidos_abertos() == 1
+    db.session.commit()
+    assert contar_divergencias() == 0
+    pedido = client.get(f"/api/pedidos/{pedido['pedido_id']}").json["pedido"]
+    assert (pedido["subtotal"], pedido["total"]) == (12.0, 12.0)
+
+
+def _novo_cliente(client, mesa):
+    client.post("/api/mesas", json={"numero": mesa, "capacidade": 2})
+    resp = client.post("/api/cliente", json={"nome": "Outro", "mesa": mesa})
+    return resp.json["cliente"]["cliente_id"]
@@ -0,0 +1,206 @@
+import hashlib
+import hmac
+
+import pytest
+
+from database import db
+from models import Mesa, Pagamento, Pedido
+from payment.reconciler import consultar_status
+from payment.webhooks import (
+    ArmazenamentoFilaRedis,
+    ConjuntoTTL,
+    FilaCheia,
+    FilaWebhooks,
+    fila_webhooks,
+)
+
+
+class RedisFalso:
+    """Subconjunto de comandos do Redis usado pela fila de webhooks."""
+
+    def __init__(self):
+        self.dados = {}
+
+    def set(self, chave, valor, nx=False, ex=None):
+        if nx and chave in self.dados:
+            return None
+        self.dados[chave] = valor
+        return True
+
+    def delete(self, *chaves):
+        return sum(self.dados.pop(chave, None) is not None for chave in chaves)
+
+    def scan_iter(self, match):
+        return [chave for chave in self.dados if chave.startswith(match.rstrip("*"))]
+
+    def rpush(self, chave, membro):
+        self.dados.setdefault(chave, []).append(membro)
+        return len(self.dados[chave])
+
+    def lrem(self, chave, quantidade, membro):
+        lista = self.dados.get(chave, [])
+        lista.reverse()
+        lista.remove(membro)
+        lista.reverse()
+        return 1
+
+    def lpop(self, chave, quantidade):
+        lista = self.dados.get(chave, [])
+        retirados, lista[:quantidade] = lista[:quantidade], []
+        return retirados or None
+
+    def llen(self, chave):
+        return len(self.dados.get(chave, []))
+
+
+def _notificar(client, gateway_id, **kwargs):
+    return client.post(
+        "/api/pagamentos/webhook",
+        json={
+            "type": "payment",
+            "action": "payment.updated",
+            "data": {"id": gateway_id},
+        },
+        **kwargs,
+    )
+
+
+def test_conjunto_ttl_expira_chaves():
+    agora = [0.0]
+    vistos = ConjuntoTTL(10, relogio=lambda: agora[0])
+    assert vistos.adicionar("a")
+    assert not vistos.adicionar("a")
+    agora[0] = 11
+    assert "a" not in vistos
+    assert vistos.adicionar("a")
+
+
+def test_webhook_enfileira_e_deduplica(client):
+    assert _notificar(client, "123").json == {"enfileirado": True}
+    assert _notificar(client, "123").json == {"enfileirado": False}
+    assert len(fila_webhooks) == 1
+
+
+def test_webhook_invalido_ou_de_outro_tipo(client):
+    assert client.post("/api/pagamentos/webhook", json={}).status_code == 400
+    resp = client.post(
+        "/api/pagamentos/webhook", json={"type": "merchant_order", "data": {"id": "9"}}
+    )
+    assert resp.status_code == 200 and resp.json == {"enfileirado": False}
+    assert len(fila_webhooks) == 0
+
+
+def test_webhook_com_fila_cheia_pede_reenvio(client, monkeypatch):
+    monkeypatch.setattr("routes.webhooks.fila_webhooks", FilaWebhooks(capacidade=1))
+    assert _notificar(client, "1").status_code == 200
+    assert _notificar(client, "2").status_code == 503
+
+
+def test_fila_no_redis_deduplica_entre_workers():
+    redis = RedisFalso()
+    worker_a, worker_b = FilaWebhooks(capacidade=2), FilaWebhooks(capacidade=2)
+    for fila in (worker_a, worker_b):
+        fila._armazenamento = ArmazenamentoFilaRedis(redis, 2, 600)
+    assert worker_a.enfileirar("payment", 1)
+    # O reenvio que cai em outro worker continua repetido
+    assert not worker_b.enfileirar("payment", 1)
+    assert worker_b.enfileirar("payment", 2)
+    with pytest.raises(FilaCheia):
+        worker_a.enfileirar("payment", 3)
+    assert len(worker_a) == len(worker_b) == 2
+    assert worker_b.retirar_lote(10) == [("payment", "1"), ("payment", "2")]
+    # A notificação recusada por capacidade pode ser reenviada
+    assert worker_a.enfileirar("payment", 3)
+    worker_a.limpar()
+    assert len(worker_b) == 0 and worker_b.enfileirar("payment", 1)
+
+
+def test_webhook_valida_assinatura(client, app, monkeypatch):
+    monkeypatch.setitem(app.config, "MERCADOPAGO_WEBHOOK_SECRET", "segredo")
+    manifesto = "id:123;request-id:req-1;ts:1700000000;"
+    v1 = hmac.new(b"segredo", manifesto.encode(), hashlib.sha256).hexdigest()
+    invalida = {"x-signature": "ts=1700000000,v1=00", "x-request-id": "req-1"}
+    assert _notificar(client, "123", headers=invalida).status_code == 401
+    valida = {"x-signature": f"ts=1700000000,v1={v1}", "x-request-id": "req-1"}
+    assert _notificar(client, "123", headers=valida).status_code == 200
+
+
+def test_pix_confirmado_pelo_webhook_paga_pedido_e_libera_mesa(
+    client, gateway, criar_pedido, drenar_eventos
+):
+    pedido_id = criar_pedido(5001, fechar=True)[0]["pedido_id"]
+    resp = client.post("/api/pagamentos/pix", json={"pedido_id": pedido_id})
+    assert resp.status_code == 201, resp.json
+    assert resp.json["qr_code"] == "000201..."
+    assert resp.json["pagamento"]["status"] == "pendente"
+    assert db.session.get(Pedido, pedido_id).status != "Pago"
+
+    gateway.status = "approved"
+    _notificar(client, f"mp-{pedido_id}")
+    assert fila_webhooks.processar_lote(lambda: gateway) == 1
+
+    db.session.expire_all()
+    pagamento = Pagamento.query.filter_by(pedido_id=pedido_id).one()
+    assert pagamento.status == "aprovado"
+    assert db.session.get(Pedido, pedido_id).status == "Pago"
+    assert Mesa.query.filter_by(numero=5001).one().status == "livre"
+    # Reenvios do gateway após a confirmação não geram nova consulta
+    assert _notificar(client, f"mp-{pedido_id}").json == {"enfileirado": False}
+    assert gateway.consultas == [f"mp-{pedido_id}"]
+    drenar_eventos()
+
+
+def test_pix_ainda_pendente_aceita_reenvio(client, gateway, criar_pedido):
+    pedido_id = criar_pedido(5001, fechar=True)[0]["pedido_id"]
+    client.post("/api/pagamentos/pix", json={"pedido_id": pedido_id})
+    _notificar(client, f"mp-{pedido_id}")
+    fila_webhooks.processar_lote(lambda: gateway)
+    assert _notificar(client, f"mp-{pedido_id}").json == {"enfileirado": True}
+
+
+def test_pix_recusado_permite_pagar_de_outra_forma(client, gateway, criar_pedido):
+    pedido_id = criar_pedido(5001, fechar=True)[0]["pedido_id"]
+    client.post("/api/pagamentos/pix", json={"pedido_id": pedido_id})
+    gateway.status = "rejected"
+    _notificar(client, f"mp-{pedido_id}")
+    fila_webhooks.processar_lote(lambda: gateway)
+    db.session.expire_all()
+    assert Pagamento.query.filter_by(pedido_id=pedido_id).one().status == "recusado"
+
+    resp = client.post(
+        "/api/pagamentos",
+        json={"pedido_id": pedido_id, "metodo": "Dinheiro", "valor": 30.0},
+    )
+    assert resp.status_code == 201, resp.json
+    assert resp.json["pagamento"]["status"] == "aprovado"
+    assert db.session.get(Pedido, pedido_id).status == "Pago"
+
+
+def test_lote_de_webhooks_consulta_gateway_sem_transacao_aberta(
+    client, gateway, criar_pedido, contar_consultas, monkeypatch
+):
+    pedidos = [criar_pedido(5100 + i, fechar=True)[0]["pedido_id"] for i in range(3)]
+    for pedido_id in pedidos:
+        client.post("/api/pagamentos/pix", json={"pedido_id": pedido_id})
+        _notificar(client, f"mp-{pedido_id}")
+    gateway.status = "approved"
+    transacao_aberta = []
+
+    def consultar(gateway_, gateway_ids, *args):
+        transacao_aberta.append(db.session().in_transaction())
+        return consultar_status(gateway_, gateway_ids, *args)
+
+    monkeypatch.setattr("payment.webhooks.consultar_status", consultar)
+    with contar_consultas() as consultas:
+        assert fila_webhooks.processar_lote(lambda: gateway) == 3
+    assert transacao_aberta == [False]
+    # Uma leitura dos ids antes do HTTP e uma dos pagamentos ao aplicar
+    selects = [c for c in consultas if c.lstrip().upper().startswith("SELECT")]
+    assert len([s for s in selects if "FROM pagamento" in s]) == 2
+    assert sorted(gateway.consultas) == sorted(f"mp-{p}" for p in pedidos)
+
+
+def test_pix_sem_gateway_configurado(client, criar_pedido):
+    pedido_id = criar_pedido(5001, fechar=True)[0]["pedido_id"]
+    resp = client.post("/api/pagamentos/pix", json={"pedido_id": pedido_id})
+    assert resp.status_code == 503
@@ -0,0 +1,175 @@
+"""
+Motor de totais dos pedidos.
+
+Cada pedido guarda subtotal (soma das linhas), desconto, percentual e valor
+da taxa de serviço e o total. Toda alteração passa por este módulo:
+
+- linhas adicionadas/removidas ajustam o subtotal pela variação, sem reler
+  as demais linhas do pedido;
+- mudança de preço de um item ajusta, em um único UPDATE, apenas os pedidos
+  abertos que contêm aquele item (e o preço unitário das linhas deles);
+- recalcular_pedidos_abertos refaz os totais de todos os pedidos abertos a
+  partir das linhas em um único comando SQL (comando `recalcular-totais`).
+
+Pedidos fechados não são alterados: o total deles é o que foi cobrado.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from sqlalchemy import case, func, select, update
+
+from database import db
+from models import Item, Pedido, PedidoItem
+
+CENTAVO = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+
+def arredondar(valor):
+    """Arredonda para centavos (meio para cima)."""
+    return Decimal(str(valor)).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+
+def recalcular_pedido(pedido):
+    """Recalcula taxa de serviço e total do pedido a partir do subtotal e desconto."""
+    base = max(
+        arredondar(pedido.subtotal or 0) - arredondar(pedido.desconto or 0), ZERO
+    )
+    pedido.taxa_servico = arredondar(
+        base * Decimal(str(pedido.percentual_servico or 0)) / 100
+    )
+    pedido.total = base + pedido.taxa_servico
+
+
+def aplicar_linhas(pedido, variacoes):
+    """
+    Aplica ao pedido variações de linhas: `variacoes` mapeia item_id ->
+    (variação de quantidade, preço unitário). Quantidades negativas removem.
+    """
+    variacao = sum(
+        (arredondar(preco) * quantidade for quantidade, preco in variacoes.values()),
+        ZERO,
+    )
+    pedido.subtotal = arredondar(pedido.subtotal or 0) + variacao
+    recalcular_pedido(pedido)
+
+
+def definir_ajustes(pedido, desconto=None, percentual_servico=None):
+    """Altera desconto e/ou percentual de serviço. Lança ValueError se inválidos."""
+    if desconto is not None:
+        desconto = arredondar(desconto)
+        if desconto < 0 or desconto > arredondar(pedido.subtotal or 0):
+            raise ValueError("desconto deve estar entre 0 e o subtotal do pedido")
+        pedido.desconto = desconto
+    if percentual_servico is not None:
+        percentual_servico = Decimal(str(percentual_servico))
+        if percentual_servico < 0 or percentual_servico > 100:
+            raise ValueError("percentual_servico deve estar entre 0 e 100")
+        pedido.percentual_servico = percentual_servico
+    recalcular_pedido(pedido)
+
+
+def _valores_derivados(subtotal):
+    """Expressões SQL de taxa e total para um subtotal (coluna ou expressão)."""
+    base = subtotal - Pedido.desconto
+    base = case((base < 0, 0), else_=base)
+    taxa = func.round(base * Pedido.percentual_servico / 100, 2)
+    return {
+        "subtotal": subtotal,
+        "taxa_servico": taxa,
+        "total": base + taxa,
+        # UPDATEs em massa também avançam a versão (concorrência otimista)
+        "versao": Pedido.versao + 1,
+    }
+
+
+def _pedidos_abertos_com_item(item_id):
+    return select(PedidoItem.pedido_id).where(PedidoItem.item_id == item_id)
+
+
+def variar_preco_item(item_id, variacao):
+    """
+    Soma `variacao` x quantidade ao subtotal dos pedidos abertos que contêm o
+    item, em um único UPDATE. Retorna os ids dos pedidos afetados.
+    """
+    variacao = arredondar(variacao)
+    filtro = (
+        Pedido.fechado.is_(False),
+        Pedido.pedido_id.in_(_pedidos_abertos_com_item(item_id)),
+    )
+    afetados = db.session.scalars(select(Pedido.pedido_id).where(*filtro)).all()
+    if not afetados or variacao == 0:
+        return afetados
+    quantidade = (
+        select(PedidoItem.quantidade)
+        .where(PedidoItem.pedido_id == Pedido.pedido_id, PedidoItem.item_id == item_id)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(Pedido)
+        .where(Pedido.pedido_id.in_(afetados))
+        .values(_valores_derivados(Pedido.subtotal + quantidade * variacao))
+        .execution_options(synchronize_session="fetch")
+    )
+    db.session.execute(
+        update(PedidoItem)
+        .where(PedidoItem.item_id == item_id, PedidoItem.pedido_id.in_(afetados))
+        .values(preco_unitario=PedidoItem.preco_unitario + variacao)
+        .execution_options(synchronize_session=False)
+    )
+    return afetados
+
+
+def remover_item_dos_pedidos(item):
+    """Desconta dos pedidos abertos as linhas do item antes de ele ser removido."""
+    return variar_preco_item(item.item_id, -Decimal(str(item.preco)))
+
+
+def _subtotal_pelas_linhas():
+    return func.coalesce(
+        select(func.sum(PedidoItem.quantidade * Item.preco))
+        .join(Item, Item.item_id == PedidoItem.item_id)
+        .where(PedidoItem.pedido_id == Pedido.pedido_id)
+        .scalar_subquery(),
+        0,
+    )
+
+
+def recalcular_pedidos_abertos():
+    """
+    Refaz subtotal, taxa e total de todos os pedidos abertos em um único UPDATE
+    (e o preço unitário das linhas deles, pelo cardápio).
+    """
+    db.session.execute(
+        update(PedidoItem)
+        .where(
+            PedidoItem.pedido_id.in_(
+                select(Pedido.pedido_id).where(Pedido.fechado.is_(False))
+            )
+        )
+        .values(
+            preco_unitario=select(Item.preco)
+            .where(Item.item_id == PedidoItem.item_id)
+            .scalar_subquery()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    resultado = db.session.execute(
+        update(Pedido)
+        .where(Pedido.fechado.is_(False))
+        .values(_valores_derivados(_subtotal_pelas_linhas()))
+        .execution_options(synchronize_session=False)
+    )
+    return resultado.rowcount
+
+
+def contar_divergencias():
+    """Quantidade de pedidos abertos cujo subtotal armazenado difere das linhas."""
+    return db.session.scalar(
+        select(func.count())
+        .select_from(Pedido)
+        .where(
+            Pedido.fechado.is_(False),
+            func.abs(Pedido.subtotal - _subtotal_pelas_linhas()) >= CENTAVO,
+        )
+    )
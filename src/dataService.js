@@ -79,6 +79,15 @@ export const pedidoService = {
       body: JSON.stringify({ cliente_id: clienteId, itens }),
     });
   },
+  /**
+   * Lista uma página de pedidos que atendem aos filtros (status, fechado, mesa, de, ate).
+   * Devolve { pedidos, proximo_cursor }; passe o cursor para carregar a página seguinte.
+   */
+  async listarPedidos(filtros = {}, cursor = null) {
+    const params = new URLSearchParams(filtros);
+    if (cursor) params.set('cursor', cursor);
+    return fetchJson(`${API_BASE_URL}/api/pedidos?${params}`);
+  },
   async obterPedido(pedidoId) {
     return fetchJson(`${API_BASE_URL}/api/pedidos/${pedidoId}`);
   },
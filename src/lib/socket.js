@@ -6,6 +6,75 @@ import { io } from 'socket.io-client';
 const socket = io('http://localhost:5001', {
   transports: ['websocket'],
   autoConnect: true,
+  // Telas da equipe se identificam com o token; sem ele só entram nas salas do cliente
+  auth: { token: import.meta.env.VITE_TOKEN_EQUIPE },
 });
 
-export default socket; 
\ No newline at end of file
+/**
+ * Último número de sequência recebido do feed. Ao reconectar, o cliente pede
+ * ao servidor apenas os eventos posteriores ("retomar"); se o servidor não os
+ * tiver mais, ele responde com "resincronizar" e a tela deve recarregar os dados.
+ */
+let ultimoSeq = null;
+
+/**
+ * Salas (rooms) em que esta aba entrou. O servidor só envia a cada socket os
+ * eventos das salas dele; ao reconectar, as salas são refeitas antes do "retomar".
+ */
+const salas = new Map();
+
+/**
+ * entrarSala: Inscreve o socket em uma sala do servidor.
+ * @param {string} tipo - 'mesa', 'cliente', 'cozinha', 'caixa' ou 'estabelecimento'
+ * @param {number} [id] - Número da mesa ou ID do cliente (para 'mesa' e 'cliente')
+ * @param {number} [clienteId] - ID do cliente que ocupa a mesa (telas do cliente, sem token da equipe)
+ * @returns {function} Função que sai da sala
+ */
+export function entrarSala(tipo, id, clienteId) {
+  const chave = id === undefined ? tipo : `${tipo}:${id}`;
+  const sala = clienteId === undefined ? { tipo, id } : { tipo, id, cliente_id: clienteId };
+  salas.set(chave, sala);
+  socket.emit('entrar_sala', sala);
+  return () => {
+    salas.delete(chave);
+    socket.emit('sair_sala', { tipo, id });
+  };
+}
+
+socket.onAny((_evento, dados) => {
+  if (dados && typeof dados.seq === 'number' && (ultimoSeq === null || dados.seq > ultimoSeq)) {
+    ultimoSeq = dados.seq;
+  }
+});
+
+socket.io.on('reconnect', () => {
+  salas.forEach((sala) => socket.emit('entrar_sala', sala));
+  if (ultimoSeq !== null) {
+    socket.emit('retomar', { seq: ultimoSeq });
+  }
+});
+
+/**
+ * aplicarDeltaPedido: Aplica um delta recebido do feed (pedido_novo/pedido_atualizado) ao pedido local.
+ * @param {object|undefined} pedido - Estado atual do pedido (undefined se ainda não conhecido)
+ * @param {object} delta - Payload do evento: { completo, campos, itens, itens_removidos }
+ */
+export function aplicarDeltaPedido(pedido, delta) {
+  const base = delta.completo || !pedido ? { itens: [] } : pedido;
+  const itens = new Map((base.itens || []).map((linha) => [linha.item_id, linha]));
+  delta.itens.forEach((linha) => itens.set(linha.item_id, linha));
+  delta.itens_removidos.forEach((itemId) => itens.delete(itemId));
+  return { ...base, ...delta.campos, itens: [...itens.values()] };
+}
+
+// Eventos de linha (pedido_item_atualizado) trazem só a linha alterada
+export function aplicarLinhaPedido(pedido, linha) {
+  return {
+    ...pedido,
+    itens: (pedido.itens || []).map((atual) =>
+      atual.item_id === linha.item_id ? { ...atual, ...linha } : atual
+    ),
+  };
+}
+
+export default socket;
@@ -1,21 +1,23 @@
 import { useState, useEffect, useCallback } from 'react';
 import { pedidoService } from '../dataService';
 
+// Só as comandas em aberto; pedidos fechados ficam no histórico
+const FILTROS = { fechado: 'false' };
+
 export function useOrders() {
   const [orders, setOrders] = useState([]);
+  const [cursor, setCursor] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
 
   const fetchOrders = useCallback(async () => {
     setLoading(true);
     setError(null);
     try {
-      const response = await fetch('/api/pedidos');
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
-      }
-      const data = await response.json();
-      setOrders(data.pedidos || []);
+      const pagina = await pedidoService.listarPedidos(FILTROS);
+      setOrders(pagina.pedidos || []);
+      setCursor(pagina.proximo_cursor);
     } catch (err) {
       setError(err.message);
     } finally {
@@ -23,6 +25,21 @@ export function useOrders() {
     }
   }, []);
 
+  const loadMoreOrders = async () => {
+    if (!cursor) return;
+    setLoadingMore(true);
+    setError(null);
+    try {
+      const pagina = await pedidoService.listarPedidos(FILTROS, cursor);
+      setOrders((prev) => [...prev, ...(pagina.pedidos || [])]);
+      setCursor(pagina.proximo_cursor);
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchOrders();
   }, [fetchOrders]);
@@ -62,8 +79,11 @@ export function useOrders() {
   return {
     orders,
     loading,
+    loadingMore,
+    hasMore: Boolean(cursor),
     error,
     fetchOrders,
+    loadMoreOrders,
     updateOrderStatus,
     closeOrder,
   };
@@ -42,41 +42,28 @@ const Dashboard = () => {
       setLoading(true);
       setError(null);
 
-      // Buscar dados de pedidos
-      const ordersResponse = await fetch('/api/pedidos');
-      const ordersData = await ordersResponse.json();
-      const orders = ordersData.pedidos || [];
+      // Totais do dia vêm dos resumos diários; só os pedidos recentes são listados
+      const [resumoResponse, recentResponse] = await Promise.all([
+        fetch('/api/dashboard/resumo'),
+        fetch('/api/pedidos?limite=5'),
+      ]);
+      if (!resumoResponse.ok) {
+        throw new Error(`HTTP error! status: ${resumoResponse.status}`);
+      }
+      const resumo = await resumoResponse.json();
+      const recentOrders = recentResponse.ok
+        ? (await recentResponse.json()).pedidos || []
+        : [];
 
-      // Buscar dados de pagamentos
-      const paymentsResponse = await fetch('/api/pagamentos');
-      const paymentsData = await paymentsResponse.json();
-      const payments = paymentsData.pagamentos || [];
-
-      // Buscar dados de mesas
-      const tablesResponse = await fetch('/api/mesas');
-      const tablesData = await tablesResponse.json();
-      const tables = tablesData.mesas || [];
-
-      // Calcular estatísticas
-      const totalRevenue = payments
-        .filter(p => p.status === 'confirmado')
-        .reduce((sum, p) => sum + parseFloat(p.valor), 0);
-
-      const totalOrders = orders.length;
-      const activeTables = tables.filter(t => t.status === 'ocupada').length;
-      const pendingPayments = payments.filter(p => p.status === 'pendente').length;
-
-      // Pedidos recentes (últimos 5)
-      const recentOrders = orders
-        .sort((a, b) => new Date(b.data_criacao) - new Date(a.data_criacao))
-        .slice(0, 5);
-
-      // Itens mais vendidos (mockado por enquanto - precisa implementar endpoint)
-      const topItems = [
-        { nome: 'X-Burger', vendas: 25, receita: 647.50 },
-        { nome: 'Batata Frita', vendas: 18, receita: 286.20 },
-        { nome: 'Refrigerante', vendas: 32, receita: 220.80 }
-      ];
+      const totalRevenue = resumo.receita;
+      const totalOrders = resumo.pedidos;
+      const activeTables = resumo.mesas_ocupadas;
+      const pendingPayments = resumo.pagamentos_pendentes;
+      const topItems = resumo.mais_vendidos.map((item) => ({
+        nome: item.nome,
+        vendas: item.quantidade,
+        receita: item.receita,
+      }));
 
       setStats({
         totalRevenue,
@@ -173,7 +160,7 @@ const Dashboard = () => {
           <CardContent>
             <div className="text-2xl font-bold">{stats.totalOrders}</div>
             <p className="text-xs text-muted-foreground">
-              Pedidos ativos
+              Hoje
             </p>
           </CardContent>
         </Card>
@@ -48,7 +48,9 @@ const formatPrice = (price) => {
  * Sugestão: extrair modal de detalhes para componente separado se crescer.
  */
 const Orders = () => {
-  const { orders, loading, error, updateOrderStatus, closeOrder } = useOrders();
+  const {
+    orders, loading, loadingMore, hasMore, error, updateOrderStatus, closeOrder, loadMoreOrders,
+  } = useOrders();
   const [filter, setFilter] = useState('all');
   const [selectedOrder, setSelectedOrder] = useState(null);
 
@@ -292,6 +294,13 @@ const Orders = () => {
                 <p className="text-muted-foreground">Nenhum pedido encontrado</p>
               </div>
             )}
+            {hasMore && (
+              <div className="text-center">
+                <Button variant="outline" onClick={loadMoreOrders} disabled={loadingMore}>
+                  {loadingMore ? 'Carregando...' : 'Carregar mais'}
+                </Button>
+              </div>
+            )}
           </div>
         </CardContent>
       </Card>
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
-import socket from '../../lib/socket';
+import socket, { aplicarDeltaPedido, aplicarLinhaPedido, entrarSala } from '../../lib/socket';
 import { Notification } from '../../components/ui/Notification';
+import { pedidoService } from '../../dataService';
 
 const notificationSound = new Audio('/notification.mp3');
 
@@ -18,13 +19,14 @@ const statusOptionsCard = [
   'Entregue',
 ];
 
-const fetchPedidos = async () => {
+const hojeIso = () => new Date().toISOString().slice(0, 10);
+
+// O painel mostra o movimento do dia; páginas mais antigas são carregadas sob demanda
+const fetchPedidos = async (cursor = null) => {
   try {
-    const res = await fetch('http://localhost:5001/api/pedidos');
-    const data = await res.json();
-    return data.pedidos || [];
+    return await pedidoService.listarPedidos({ de: hojeIso() }, cursor);
   } catch {
-    return [];
+    return { pedidos: [], proximo_cursor: null };
   }
 };
 
@@ -51,44 +53,89 @@ const BackofficeOrders = () => {
   const [statusFiltro, setStatusFiltro] = useState('Todos');
   const [busca, setBusca] = useState('');
   const [updating, setUpdating] = useState({});
+  const [cursor, setCursor] = useState(null);
+  const [carregandoMais, setCarregandoMais] = useState(false);
+
+  const carregarPrimeiraPagina = () => {
+    fetchPedidos().then((pagina) => {
+      setPedidos(pagina.pedidos || []);
+      setCursor(pagina.proximo_cursor);
+    });
+  };
+
+  const carregarMais = () => {
+    setCarregandoMais(true);
+    fetchPedidos(cursor)
+      .then((pagina) => {
+        setPedidos(prev => [...prev, ...(pagina.pedidos || [])]);
+        setCursor(pagina.proximo_cursor);
+      })
+      .finally(() => setCarregandoMais(false));
+  };
 
   useEffect(() => {
-    fetchPedidos().then(setPedidos);
-    const handleNovo = (pedido) => {
+    carregarPrimeiraPagina();
+    // Os eventos de pedido trazem apenas o delta (campos e linhas alterados)
+    const handleNovo = (delta) => {
       setPedidos((prev) => {
-        const idx = prev.findIndex(p => p.pedido_id === pedido.pedido_id);
+        const idx = prev.findIndex(p => p.pedido_id === delta.pedido_id);
         if (idx !== -1) {
           // Atualiza pedido existente
           const updated = [...prev];
-          updated[idx] = pedido;
+          updated[idx] = aplicarDeltaPedido(prev[idx], delta);
           return updated;
         } else {
           // Adiciona novo pedido no início
-          return [pedido, ...prev];
+          return [aplicarDeltaPedido(undefined, delta), ...prev];
         }
       });
-      setNotification({ message: `Novo pedido #${pedido.pedido_id}`, type: 'info' });
+      setNotification({ message: `Novo pedido #${delta.pedido_id}`, type: 'info' });
       notificationSound.play();
     };
-    const handleAtualizado = (pedido) => {
-      setPedidos((prev) => prev.map(p => p.pedido_id === pedido.pedido_id ? pedido : p));
-      setNotification({ message: `Pedido #${pedido.pedido_id} atualizado: ${pedido.status}`, type: 'success' });
+    const handleAtualizado = (delta) => {
+      setPedidos((prev) => prev.map(p => p.pedido_id === delta.pedido_id ? aplicarDeltaPedido(p, delta) : p));
+      const status = delta.campos.status ? `: ${delta.campos.status}` : '';
+      setNotification({ message: `Pedido #${delta.pedido_id} atualizado${status}`, type: 'success' });
       notificationSound.play();
     };
+    const handleLinha = (linha) => {
+      setPedidos((prev) => prev.map(p => p.pedido_id === linha.pedido_id ? aplicarLinhaPedido(p, linha) : p));
+    };
+    const handleResincronizar = () => {
+      carregarPrimeiraPagina();
+    };
+    // Pagamentos parciais são comuns: o pedido só fica pago quando o saldo zera
     const handlePagamento = (pagamento) => {
+      const quitado = pagamento.saldo_pedido <= 0;
       setPedidos((prev) => prev.map(p =>
-        p.pedido_id === pagamento.pedido_id ? { ...p, status: 'Pago' } : p
+        p.pedido_id === pagamento.pedido_id
+          ? {
+              ...p,
+              valor_pago: (p.valor_pago || 0) + pagamento.valor,
+              saldo: pagamento.saldo_pedido,
+              ...(quitado ? { status: 'Pago' } : {}),
+            }
+          : p
       ));
-      setNotification({ message: `Pagamento confirmado para o pedido #${pagamento.pedido_id}`, type: 'success' });
+      const message = quitado
+        ? `Pagamento confirmado para o pedido #${pagamento.pedido_id}`
+        : `Pagamento parcial no pedido #${pagamento.pedido_id} (saldo R$ ${pagamento.saldo_pedido.toFixed(2)})`;
+      setNotification({ message, type: 'success' });
       notificationSound.play();
     };
     socket.on('pedido_novo', handleNovo);
     socket.on('pedido_atualizado', handleAtualizado);
+    socket.on('pedido_item_atualizado', handleLinha);
     socket.on('pagamento_recebido', handlePagamento);
+    socket.on('resincronizar', handleResincronizar);
+    const sairSala = entrarSala('estabelecimento');
     return () => {
+      sairSala();
       socket.off('pedido_novo', handleNovo);
       socket.off('pedido_atualizado', handleAtualizado);
+      socket.off('pedido_item_atualizado', handleLinha);
       socket.off('pagamento_recebido', handlePagamento);
+      socket.off('resincronizar', handleResincronizar);
     };
   }, []);
 
@@ -186,6 +233,17 @@ const BackofficeOrders = () => {
           </li>
         ))}
       </ul>
+      {cursor && (
+        <div className="mt-4 text-center">
+          <button
+            onClick={carregarMais}
+            disabled={carregandoMais}
+            className={`px-4 py-2 rounded font-medium border border-blue-600 text-blue-600 hover:bg-blue-100 ${carregandoMais ? 'opacity-60 cursor-wait' : ''}`}
+          >
+            {carregandoMais ? 'Carregando...' : 'Carregar mais'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
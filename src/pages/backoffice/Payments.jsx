@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import socket from '../../lib/socket';
+import socket, { entrarSala } from '../../lib/socket';
 import { Notification } from '../../components/ui/Notification';
 
 const notificationSound = new Audio('/notification.mp3');
@@ -18,7 +18,9 @@ const BackofficePayments = () => {
       notificationSound.play();
     };
     socket.on('pagamento_recebido', handlePagamento);
+    const sairSala = entrarSala('caixa');
     return () => {
+      sairSala();
       socket.off('pagamento_recebido', handlePagamento);
     };
   }, []);
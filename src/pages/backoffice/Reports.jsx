@@ -1,15 +1,113 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
+
+const hojeIso = () => new Date().toISOString().slice(0, 10);
+const diasAtrasIso = (dias) => new Date(Date.now() - dias * 86400000).toISOString().slice(0, 10);
+
+const formatarReais = (valor) => `R$ ${Number(valor || 0).toFixed(2)}`;
 
 /**
  * BackofficeReports: Página de relatórios do backoffice (vendas, pedidos, exportação).
+ * Os relatórios são agregados no backend (/api/relatorios/<nome>).
  */
 const BackofficeReports = () => {
+  const [de, setDe] = useState(diasAtrasIso(29));
+  const [ate, setAte] = useState(hojeIso());
+  const [relatorios, setRelatorios] = useState({});
+  const [erro, setErro] = useState(null);
+
+  useEffect(() => {
+    const nomes = ['ticket_medio', 'itens_por_pedido', 'giro_mesas', 'mix_pagamentos', 'receita_por_dia'];
+    const periodo = `de=${de}&ate=${ate}`;
+    let cancelado = false;
+    setErro(null);
+    Promise.all(
+      nomes.map((nome) =>
+        fetch(`/api/relatorios/${nome}?${periodo}`).then(async (res) => {
+          const corpo = await res.json();
+          if (!res.ok) throw new Error(corpo.error || 'Erro ao carregar relatório');
+          return [nome, corpo.dados];
+        })
+      )
+    )
+      .then((resultados) => {
+        if (!cancelado) setRelatorios(Object.fromEntries(resultados));
+      })
+      .catch((e) => {
+        if (!cancelado) setErro(e.message);
+      });
+    return () => {
+      cancelado = true;
+    };
+  }, [de, ate]);
+
+  const { ticket_medio: ticket, itens_por_pedido: itens, giro_mesas: giro } = relatorios;
+
   return (
     <div className="p-6">
       <h1 className="text-2xl font-bold mb-4">Relatórios</h1>
-      <p>Gere relatórios de vendas, pedidos e ocupação de mesas. Exporte para CSV/PDF.</p>
+      <div className="flex flex-wrap gap-4 items-end mb-6">
+        <label className="flex flex-col text-sm">
+          De
+          <input type="date" value={de} onChange={(e) => setDe(e.target.value)} className="border rounded p-1" />
+        </label>
+        <label className="flex flex-col text-sm">
+          Até
+          <input type="date" value={ate} onChange={(e) => setAte(e.target.value)} className="border rounded p-1" />
+        </label>
+        <a className="text-blue-600 underline text-sm" href={`/api/export/pedidos?de=${de}&ate=${ate}`}>
+          Exportar pedidos (CSV)
+        </a>
+        <a className="text-blue-600 underline text-sm" href={`/api/export/pagamentos?de=${de}&ate=${ate}`}>
+          Exportar pagamentos (CSV)
+        </a>
+      </div>
+      {erro && <p className="text-red-600 mb-4">{erro}</p>}
+      <div className="grid grid-cols-1 sm:grid-cols-4 gap-4 mb-6">
+        <div className="bg-white rounded shadow p-4">
+          <div className="text-sm text-gray-500">Receita</div>
+          <div className="text-xl font-bold">{formatarReais(ticket?.receita)}</div>
+        </div>
+        <div className="bg-white rounded shadow p-4">
+          <div className="text-sm text-gray-500">Ticket médio</div>
+          <div className="text-xl font-bold">{formatarReais(ticket?.ticket_medio)}</div>
+        </div>
+        <div className="bg-white rounded shadow p-4">
+          <div className="text-sm text-gray-500">Itens por pedido</div>
+          <div className="text-xl font-bold">{itens?.media_itens ?? 0}</div>
+        </div>
+        <div className="bg-white rounded shadow p-4">
+          <div className="text-sm text-gray-500">Permanência média</div>
+          <div className="text-xl font-bold">{giro?.media_minutos ?? 0} min</div>
+        </div>
+      </div>
+      <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
+        <section className="bg-white rounded shadow p-4">
+          <h2 className="font-semibold mb-2">Formas de pagamento</h2>
+          <ul className="text-sm space-y-1">
+            {(relatorios.mix_pagamentos || []).map((linha) => (
+              <li key={linha.metodo} className="flex justify-between">
+                <span>{linha.metodo}</span>
+                <span>
+                  {formatarReais(linha.receita)} ({linha.percentual}%)
+                </span>
+              </li>
+            ))}
+          </ul>
+        </section>
+        <section className="bg-white rounded shadow p-4">
+          <h2 className="font-semibold mb-2">Receita por dia</h2>
+          <ul className="text-sm space-y-1">
+            {(relatorios.receita_por_dia || []).map((linha) => (
+              <li key={linha.dia} className="flex justify-between">
+                <span>{linha.dia}</span>
+                <span>{formatarReais(linha.receita)}</span>
+              </li>
+            ))}
+          </ul>
+        </section>
+      </div>
     </div>
   );
 };
 
-export default BackofficeReports; 
\ No newline at end of file
+export default BackofficeReports;